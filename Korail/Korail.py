@@ -1,342 +1,1035 @@
-from datetime import datetime, timedelta, timezone
-import json
-from functools import reduce
-from .KorailExceptions.KorailExceptions import (
-    KorailError, NoResultsError, SoldOutError, NeedToLoginError
-)
-from .KorailConstants.KorailConstants import KORAIL_URLS
-
-from .KorailClass.KorailClass import (
-    Train, Ticket, Passenger, AdultPassenger,
-    ChildPassenger, SeniorPassenger, TrainType,
-    ReserveOption, Reservation, KorailSession
-)
-
-class Korail(KorailSession):
-
-    def __init__(self, korail_id, korail_pw, auto_login=True, want_feedback=False):
-        super(Korail, self).__init__(korail_id, korail_pw, auto_login)
-        self.want_feedback = want_feedback
-
-    def _result_check(self, j):
-        if self.want_feedback:
-            print(j["h_msg_txt"])
-
-        if j["strResult"] == "FAIL":
-            h_msg_cd = j.get("h_msg_cd", None)
-            h_msg_txt = j.get("h_msg_txt", None)
-            matched_error = []
-            for error in (NoResultsError, NeedToLoginError, SoldOutError):
-                if h_msg_cd in error.codes:
-                    matched_error.append(error)
-            if matched_error:
-                raise matched_error[0](h_msg_cd)
-            else:
-                raise KorailError(h_msg_txt, h_msg_cd)
-        else:
-            return True
-
-    def search_train_allday(
-        self,
-        dep,
-        arr,
-        date=None,
-        time=None,
-        train_type=TrainType.ALL,
-        passengers=None,
-        available_only=False,
-    ):
-        min1 = timedelta(minutes=1)
-        all_trains = []
-        last_time = time
-        for i in range(15):
-            try:
-                trains = self.search_train(
-                    dep, arr, date, last_time, train_type, passengers, True
-                )
-                all_trains.extend(trains)
-                t = datetime.strptime(all_trains[-1].dep_time, "%H%M%S") + min1
-                last_time = t.strftime("%H%M%S")
-            except NoResultsError:
-                break
-
-        if available_only:
-            all_trains = list(filter(lambda x: x.seat_available(), all_trains))
-
-        if len(all_trains) == 0:
-            print("No results")
-
-        # # 기차 정보 출력에 번호 추가
-        # for index, train in enumerate(all_trains, start=1):
-        #     print(f"{index:02d}. {train}")
-
-        return all_trains
-
-
-    def search_train(
-        self,
-        dep,
-        arr,
-        date=None,
-        time=None,
-        train_type=TrainType.ALL,
-        passengers=None,
-        available_only=False,
-    ):
-        kst = timezone(timedelta(hours=9))
-        if date is None:
-            date = datetime.utcnow().astimezone(kst).strftime("%Y%m%d")
-        if time is None:
-            time = datetime.utcnow().astimezone(kst).strftime("%H%M%S")
-
-        if passengers is None:
-            passengers = [AdultPassenger()]
-
-        passengers = Passenger.reduce(passengers)
-
-        adult_count = reduce(
-            lambda a, b: a + b.count,
-            list(filter(lambda x: isinstance(x, AdultPassenger), passengers)),
-            0,
-        )
-        child_count = reduce(
-            lambda a, b: a + b.count,
-            list(filter(lambda x: isinstance(x, ChildPassenger), passengers)),
-            0,
-        )
-        senior_count = reduce(
-            lambda a, b: a + b.count,
-            list(filter(lambda x: isinstance(x, SeniorPassenger), passengers)),
-            0,
-        )
-
-        url = KORAIL_URLS["search_schedule"]
-        data = {
-            "Device": self._device,
-            "radJobId": "1",
-            "selGoTrain": train_type,
-            "txtCardPsgCnt": "0",
-            "txtGdNo": "",
-            "txtGoAbrdDt": date,  # '20140803',
-            "txtGoEnd": arr,
-            "txtGoHour": time,  # '071500',
-            "txtGoStart": dep,
-            "txtJobDv": "",
-            "txtMenuId": "11",
-            "txtPsgFlg_1": adult_count,  # 어른
-            "txtPsgFlg_2": child_count,  # 어린이
-            "txtPsgFlg_3": senior_count,  # 경로
-            "txtPsgFlg_4": "0",  # 장애인1
-            "txtPsgFlg_5": "0",  # 장애인2
-            "txtSeatAttCd_2": "000",
-            "txtSeatAttCd_3": "000",
-            "txtSeatAttCd_4": "015",
-            "txtTrnGpCd": train_type,
-            "Version": self._version,
-        }
-
-        r = self._session.get(url, params=data)
-        j = json.loads(r.text)
-
-        try:
-            if self._result_check(j):
-                train_infos = j["trn_infos"]["trn_info"]
-                # print("표조회결과: ", train_infos)
-                trains = []
-
-                for info in train_infos:
-                    print(info)
-                    trains.append(Train(info))
-
-                if available_only:
-                    trains = list(filter(lambda x: x.seat_available(), trains))
-
-                if len(trains) == 0:
-                    print("No results found.")
-
-                return trains
-        except KorailError as error:
-            print(f"기차 검색에 실패하였습니다. 원인: {error}")
-            return []
-
-
-    def reserve(self, train, passengers=None, option=ReserveOption.GENERAL_FIRST):
-        seat_type = None
-        if train.seat_available() is False:
-            raise SoldOutError()
-        elif option == ReserveOption.GENERAL_ONLY:
-            if train.general_seat_available():
-                seat_type = "1"
-            else:
-                raise SoldOutError()
-        elif option == ReserveOption.SPECIAL_ONLY:
-            if train.special_seat_available():
-                seat_type = "2"
-            else:
-                raise SoldOutError()
-        elif option == ReserveOption.GENERAL_FIRST:
-            if train.general_seat_available():
-                seat_type = "1"
-            else:
-                seat_type = "2"
-        elif option == ReserveOption.SPECIAL_FIRST:
-            if train.special_seat_available():
-                seat_type = "2"
-            else:
-                seat_type = "1"
-
-        if passengers is None:
-            passengers = [AdultPassenger()]
-
-        passengers = Passenger.reduce(passengers)
-        cnt = reduce(lambda x, y: x + y.count, passengers, 0)
-        url = KORAIL_URLS["ticket_reservation"]
-        data = {
-            "Device": self._device,
-            "Version": self._version,
-            "Key": self._key,
-            "txtGdNo": "",
-            "txtJobId": "1101",
-            "txtTotPsgCnt": cnt,
-            "txtSeatAttCd1": "000",
-            "txtSeatAttCd2": "000",
-            "txtSeatAttCd3": "000",
-            "txtSeatAttCd4": "015",
-            "txtSeatAttCd5": "000",
-            "hidFreeFlg": "N",
-            "txtStndFlg": "N",
-            "txtMenuId": "11",
-            "txtSrcarCnt": "0",
-            "txtJrnyCnt": "1",
-            # 이하 여정정보1
-            "txtJrnySqno1": "001",
-            "txtJrnyTpCd1": "11",
-            "txtDptDt1": train.dep_date,
-            "txtDptRsStnCd1": train.dep_code,
-            "txtDptTm1": train.dep_time,
-            "txtArvRsStnCd1": train.arr_code,
-            "txtTrnNo1": train.train_number,
-            "txtRunDt1": train.run_date,
-            "txtTrnClsfCd1": train.train_type,
-            "txtPsrmClCd1": seat_type,
-            "txtTrnGpCd1": train.train_group,
-            "txtChgFlg1": "",
-            # 이하 여정정보2
-            "txtJrnySqno2": "",
-            "txtJrnyTpCd2": "",
-            "txtDptDt2": "",
-            "txtDptRsStnCd2": "",
-            "txtDptTm2": "",
-            "txtArvRsStnCd2": "",
-            "txtTrnNo2": "",
-            "txtRunDt2": "",
-            "txtTrnClsfCd2": "",
-            "txtPsrmClCd2": "",
-            "txtChgFlg2": "",
-            # 이하 txtTotPsgCnt 만큼 반복
-            # 'txtPsgTpCd1'    : '1',   #손님 종류 (어른, 어린이)
-            # 'txtDiscKndCd1'  : '000', #할인 타입 (경로, 동반유아, 군장병 등..)
-            # 'txtCompaCnt1'   : '1',   #인원수
-            # 'txtCardCode_1'  : '',
-            # 'txtCardNo_1'    : '',
-            # 'txtCardPw_1'    : '',
-        }
-
-        index = 1
-        for psg in passengers:
-            data.update(psg.get_dict(index))
-            index += 1
-
-        r = self._session.get(url, params=data)
-        j = json.loads(r.text)
-        if self._result_check(j):
-            rsv_id = j["h_pnr_no"]
-            rsvlist = list(filter(lambda x: x.rsv_id == rsv_id, self.reservations()))
-            if len(rsvlist) == 1:
-                return rsvlist[0]
-
-    def tickets(self):
-        url = KORAIL_URLS["my_ticket_list"]
-        data = {
-            "Device": self._device,
-            "Version": self._version,
-            "Key": self._key,
-            "txtIndex": "1",
-            "h_page_no": "1",
-            "txtDeviceId": "",
-            "h_abrd_dt_from": "",
-            "h_abrd_dt_to": "",
-        }
-
-        r = self._session.get(url, params=data)
-        j = json.loads(r.text)
-        try:
-            if self._result_check(j):
-                ticket_infos = j["reservation_list"]
-
-                tickets = []
-
-                for info in ticket_infos:
-                    ticket = Ticket(info)
-                    url = KORAIL_URLS["my_ticket_seat"]
-                    data = {
-                        "Device": self._device,
-                        "Version": self._version,
-                        "Key": self._key,
-                        "h_orgtk_wct_no": ticket.sale_info1,
-                        "h_orgtk_ret_sale_dt": ticket.sale_info2,
-                        "h_orgtk_sale_sqno": ticket.sale_info3,
-                        "h_orgtk_ret_pwd": ticket.sale_info4,
-                    }
-                    r = self._session.get(url, params=data)
-                    j = json.loads(r.text)
-                    if self._result_check(j):
-                        seat = j["ticket_infos"]["ticket_info"][0]["tk_seat_info"][0]
-                        ticket.seat_no = seat["h_seat_no"]
-                        ticket.seat_no_end = None
-
-                    tickets.append(ticket)
-
-                return tickets
-        except NoResultsError:
-            return []
-
-
-    def reservations(self):
-        url = KORAIL_URLS["my_reservation_list"]
-        data = {
-            "Device": self._device,
-            "Version": self._version,
-            "Key": self._key,
-        }
-        r = self._session.get(url, params=data)
-        j = json.loads(r.text)
-        try:
-            if self._result_check(j):
-                rsv_infos = j["jrny_infos"]["jrny_info"]
-
-                reserves = []
-
-                for info in rsv_infos:
-                    for tinfo in info["train_infos"]["train_info"]:
-                        reserves.append(Reservation(tinfo))
-                return reserves
-        except NoResultsError:
-            return []
-
-    def cancel(self, rsv):
-        assert isinstance(rsv, Reservation)
-        url = KORAIL_URLS["cancel"]
-        data = {
-            "Device": self._device,
-            "Version": self._version,
-            "Key": self._key,
-            "txtPnrNo": rsv.rsv_id,
-            "txtJrnySqno": rsv.journey_no,
-            "txtJrnyCnt": rsv.journey_cnt,
-            "hidRsvChgNo": rsv.rsv_chg_no,
-        }
-        r = self._session.get(url, data=data)
-        j = json.loads(r.text)
-        if self._result_check(j):
-            return True
+import logging
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from types import MappingProxyType
+from urllib.parse import urlencode
+from .KorailDecode.KorailDecode import RESULT_FIELDS, iter_json_array
+from .KorailExceptions.KorailExceptions import (
+    KorailError, NoResultsError, SoldOutError, NeedToLoginError, ServerBusyError
+)
+
+from .KorailClass.KorailClass import (
+    Train, Ticket, Passenger, AdultPassenger,
+    ChildPassenger, SeniorPassenger, PassengerSet, TrainType,
+    ReserveOption, Reservation, KorailSession, SearchResult, DateSummary, BatchResult
+)
+
+logger = logging.getLogger(__name__)
+
+KST = timezone(timedelta(hours=9))
+
+
+def _by_rsv_id(reservations):
+    # 한 여정의 구간들은 예약번호가 같다; 첫 구간을 남긴다.
+    by_id = {}
+    for reservation in reservations:
+        by_id.setdefault(reservation.rsv_id, reservation)
+    return by_id
+
+
+def _expiring(reservations, before):
+    """Reservations whose purchase deadline is at or before `before`: a
+    datetime (naive means KST), a timedelta from now, or None for now.
+    Reservations without a deadline (waiting list) are never expiring."""
+    if before is None or isinstance(before, timedelta):
+        before = datetime.now(KST) + (before or timedelta())
+    elif before.tzinfo is None:
+        before = before.replace(tzinfo=KST)
+    expiring = []
+    for reservation in reservations:
+        try:
+            deadline = datetime.strptime(
+                reservation.buy_limit_date + reservation.buy_limit_time, "%Y%m%d%H%M%S"
+            ).replace(tzinfo=KST)
+        except (TypeError, ValueError):
+            continue
+        if deadline <= before:
+            expiring.append(reservation)
+    return expiring
+
+
+def _fill_date_time(date, time):
+    now = datetime.utcnow().astimezone(KST)
+    if date is None:
+        date = now.strftime("%Y%m%d")
+    if time is None:
+        time = now.strftime("%H%M%S")
+    return date, time
+
+
+def _time_windows(time, count):
+    """Split [time, 24:00) into `count` (start, end) windows; the last end is None."""
+    start = int(time[:2]) * 3600 + int(time[2:4]) * 60 + int(time[4:6] or 0)
+    step = max((24 * 3600 - start) // count, 60)
+    bounds = [start + step * i for i in range(count) if start + step * i < 24 * 3600]
+    bounds = ["%02d%02d%02d" % (b // 3600, b // 60 % 60, b % 60) for b in bounds]
+    return list(zip(bounds, bounds[1:] + [None]))
+
+
+def _merge_trains(pages):
+    merged = {}
+    for trains in pages:
+        for train in trains:
+            merged.setdefault(train.key(), train)
+    return sorted(merged.values(), key=lambda x: (x.dep_date, x.dep_time))
+
+
+def _as_table(trains):
+    # numpy 는 TrainTable 을 쓸 때만 불러온다.
+    from .KorailTable.KorailTable import TrainTable
+    return TrainTable.from_trains(trains)
+
+
+def _wanted(train, available_only, train_types):
+    if train_types is not None and train.train_type not in train_types:
+        return False
+    return not available_only or train.seat_available()
+
+
+# 매 요청마다 바뀌지 않는 폼 필드. 요청마다 복사해서 바뀌는 값만 채운다.
+_SEARCH_FORM = MappingProxyType({
+    "radJobId": "1",
+    "txtCardPsgCnt": "0",
+    "txtGdNo": "",
+    "txtJobDv": "",
+    "txtMenuId": "11",
+    "txtPsgFlg_4": "0",  # 장애인1
+    "txtPsgFlg_5": "0",  # 장애인2
+    "txtSeatAttCd_2": "000",
+    "txtSeatAttCd_3": "000",
+    "txtSeatAttCd_4": "015",
+})
+
+_RESERVE_FORM = MappingProxyType({
+    "txtGdNo": "",
+    "txtJobId": "1101",
+    "txtSeatAttCd1": "000",
+    "txtSeatAttCd2": "000",
+    "txtSeatAttCd3": "000",
+    "txtSeatAttCd4": "015",
+    "txtSeatAttCd5": "000",
+    "hidFreeFlg": "N",
+    "txtStndFlg": "N",
+    "txtMenuId": "11",
+    "txtSrcarCnt": "0",
+    "txtChgFlg1": "",
+    # 이하 여정정보2
+    "txtJrnySqno2": "",
+    "txtJrnyTpCd2": "",
+    "txtDptDt2": "",
+    "txtDptRsStnCd2": "",
+    "txtDptTm2": "",
+    "txtArvRsStnCd2": "",
+    "txtTrnNo2": "",
+    "txtRunDt2": "",
+    "txtTrnClsfCd2": "",
+    "txtPsrmClCd2": "",
+    "txtChgFlg2": "",
+})
+
+
+def _search_fields(device, version, dep, arr, date, train_type, passengers):
+    return {
+        "Device": device,
+        "Version": version,
+        "selGoTrain": train_type,
+        "txtTrnGpCd": train_type,
+        "txtGoAbrdDt": date,  # '20140803'
+        "txtGoStart": dep,
+        "txtGoEnd": arr,
+        "txtPsgFlg_1": passengers.adult_count,  # 어른
+        "txtPsgFlg_2": passengers.child_count,  # 어린이
+        "txtPsgFlg_3": passengers.senior_count,  # 경로
+    }
+
+
+@lru_cache(maxsize=256)
+def _search_prefix(device, version, dep, arr, date, train_type, passengers):
+    fields = dict(_SEARCH_FORM)
+    fields.update(_search_fields(device, version, dep, arr, date, train_type, passengers))
+    return urlencode(fields) + "&"
+
+
+def _find_items(j, key):
+    # 스트리밍 중에 배열을 못 찾은 성공 응답도 같은 결과를 돌려준다.
+    for value in j.values():
+        if isinstance(value, dict):
+            if isinstance(value.get(key), list):
+                return value[key]
+            found = _find_items(value, key)
+            if found:
+                return found
+    return []
+
+
+def _next_page_time(trains):
+    t = datetime.strptime(trains[-1].dep_time, "%H%M%S") + timedelta(minutes=1)
+    return t.strftime("%H%M%S")
+
+
+def _next_time(trains, last_time):
+    """The departure time of the page after `trains`, or None when paging
+    would not move past `last_time`: a server that repeats a page, or a
+    train after 23:59 (`_next_page_time` wraps to the next morning)."""
+    next_time = _next_page_time(trains)
+    return next_time if next_time > last_time else None
+
+
+class Korail(KorailSession):
+
+    def __init__(
+        self,
+        korail_id,
+        korail_pw,
+        auto_login=True,
+        want_feedback=False,
+        cache=None,
+        station_db=None,
+        session_store=None,
+        auto_relogin=True,
+        base_url=None,
+        metrics=None,
+        json_loads=None,
+        policy=None,
+        recorder=None,
+        transport=None,
+    ):
+        super(Korail, self).__init__(
+            korail_id,
+            korail_pw,
+            auto_login,
+            session_store,
+            auto_relogin,
+            base_url,
+            metrics,
+            json_loads,
+            policy,
+            transport,
+        )
+        self.want_feedback = want_feedback
+        self.cache = cache
+        self.station_db = station_db
+        self.recorder = recorder
+        self._ticket_seat_cache = {}
+
+    def _check_stations(self, *names):
+        # 역 이름이 틀리면 서버에 묻기 전에 InvalidStationError 를 낸다.
+        if self.station_db is not None:
+            self.station_db.validate(*names)
+
+    def _result_check(self, j):
+        if self.want_feedback:
+            print(j["h_msg_txt"])
+
+        if j["strResult"] == "FAIL":
+            h_msg_cd = j.get("h_msg_cd", None)
+            h_msg_txt = j.get("h_msg_txt", None)
+            matched_error = []
+            for error in (NoResultsError, NeedToLoginError, SoldOutError):
+                if h_msg_cd in error.codes:
+                    matched_error.append(error)
+            if matched_error:
+                raise matched_error[0](h_msg_cd)
+            elif h_msg_cd in self.policy.transient_codes:
+                raise ServerBusyError(h_msg_cd)
+            else:
+                raise KorailError(h_msg_txt, h_msg_cd)
+        else:
+            return True
+
+    def _stream_items(self, method, url, params, key):
+        """Yield the objects of the `key` array of a response as they are
+        parsed. Responses without it go through `_result_check`, with the
+        same one-time re-login on P058 as `_request`."""
+        sent_key = params.get("Key") if isinstance(params, dict) else None
+        fields = dict.fromkeys(RESULT_FIELDS)
+        j = yield from iter_json_array(
+            self._stream(method, url, params, fields=fields), key, self._json_loads, fields
+        )
+        if j is not None and self._needs_relogin(sent_key, j):
+            params["Key"] = self._key
+            fields = dict.fromkeys(RESULT_FIELDS)
+            j = yield from iter_json_array(
+                self._stream(method, url, params, fields=fields), key, self._json_loads, fields
+            )
+        if j is not None and self._result_check(j):
+            yield from _find_items(j, key)
+
+    def iter_search_train(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+    ):
+        """Like `search_train`, but yields each `Train` as soon as its row
+        has been read from the response body."""
+        self._check_stations(dep, arr)
+        date, time = _fill_date_time(date, time)
+        url, query = self._search_query(
+            dep, arr, date, time, train_type, passengers
+        )
+        try:
+            for info in self._stream_items("GET", url, query, "trn_info"):
+                train = Train(info)
+                if not available_only or train.seat_available():
+                    yield train
+        except NoResultsError:
+            return
+
+    def _search_page(self, dep, arr, date, time, train_type, passengers):
+        url, query = self._search_query(
+            dep, arr, date, time, train_type, passengers
+        )
+        j = self._request("GET", url, params=query)
+        if self._result_check(j):
+            return self._parse_trains(j)
+
+    def _search_window(self, dep, arr, date, start, end, train_type, passengers, max_pages=15):
+        """Page through [start, end) in at most `max_pages` round trips, as
+        long as each page starts later than the one before. NoResultsError
+        on the first page means nothing departs at or after `start`."""
+        trains = self._search_page(dep, arr, date, start, train_type, passengers)
+        last_time = start
+        for i in range(max_pages - 1):
+            if not trains or (end is not None and trains[-1].dep_time >= end):
+                break
+            last_time = _next_time(trains, last_time)
+            if last_time is None:
+                break
+            try:
+                page = self._search_page(
+                    dep, arr, date, last_time, train_type, passengers
+                )
+            except NoResultsError:
+                break
+            if not page:
+                break
+            trains.extend(page)
+
+        if end is not None:
+            trains = [x for x in trains if x.dep_time < end]
+        return trains
+
+    def search_train_allday(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+        windows=None,
+        max_age=None,
+        as_table=False,
+    ):
+        """Search every train of the day from `time`.
+
+        By default the day is paged sequentially (up to 15 round trips).
+        With `windows=N` the rest of the day is split into N time windows
+        which are fetched concurrently (each paged up to 15 round trips)
+        and merged by `Train.key()`.
+        `as_table=True` returns a columnar `TrainTable` instead of a list.
+        """
+        self._check_stations(dep, arr)
+        date, time = _fill_date_time(date, time)
+        all_trains = self._cached(
+            "search_train_allday",
+            (dep, arr, date, time, train_type, passengers),
+            max_age,
+            lambda: self._search_allday(
+                dep, arr, date, time, train_type, passengers, windows
+            ),
+        )
+
+        if available_only:
+            all_trains = all_trains.filter(lambda x: x.seat_available())
+
+        if len(all_trains) == 0:
+            logger.debug("No results: %s~%s %s", dep, arr, date)
+
+        # # 기차 정보 출력에 번호 추가
+        # for index, train in enumerate(all_trains, start=1):
+        #     print(f"{index:02d}. {train}")
+
+        if as_table:
+            return _as_table(all_trains)
+        return all_trains
+
+    def _search_allday(self, dep, arr, date, time, train_type, passengers, windows):
+        result = SearchResult()
+        if windows:
+            all_trains = self._search_windows(
+                dep, arr, date, time, train_type, passengers, windows
+            )
+        else:
+            all_trains = []
+            for trains in self._iter_pages(dep, arr, date, time, train_type, passengers):
+                all_trains.extend(trains)
+        result.extend(all_trains)
+        return result
+
+    def _iter_pages(self, dep, arr, date, time, train_type, passengers, max_pages=15, pace=None):
+        last_time = time
+        for i in range(max_pages):
+            if pace is not None and pace() is False:
+                return
+            try:
+                trains = self._search_page(
+                    dep, arr, date, last_time, train_type, passengers
+                )
+            except NoResultsError:
+                return
+            if not trains:
+                return
+            yield trains
+            last_time = _next_time(trains, last_time)
+            if last_time is None:
+                return
+
+    def iter_trains_allday(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+        until=None,
+        train_types=None,
+        max_pages=15,
+        pace=None,
+    ):
+        """Yield the day's trains page by page, fetching the next page only
+        when the consumer asks for more.
+
+        `until` (HHMMSS) is the latest departure wanted: once a page goes
+        past it no further pages are requested. `train_types` keeps only
+        those `Train.train_type` codes and `available_only` only trains with
+        seats. `pace` is called before every page request, e.g. a
+        `TokenBucket.acquire`; returning False ends the walk.
+        """
+        self._check_stations(dep, arr)
+        date, time = _fill_date_time(date, time)
+        for trains in self._iter_pages(dep, arr, date, time, train_type, passengers, max_pages, pace):
+            for train in trains:
+                if until is not None and train.dep_time > until:
+                    return
+                if _wanted(train, available_only, train_types):
+                    yield train
+
+    def _search_windows(self, dep, arr, date, time, train_type, passengers, windows):
+        bounds = _time_windows(time, windows)
+        pages = []
+        with ThreadPoolExecutor(max_workers=len(bounds)) as executor:
+            futures = [
+                executor.submit(
+                    self._search_window, dep, arr, date, start, end, train_type, passengers
+                )
+                for start, end in bounds
+            ]
+            for i, future in enumerate(futures):
+                try:
+                    pages.append(future.result())
+                except NoResultsError:
+                    # 이후 시간대에도 열차가 없다.
+                    for rest in futures[i + 1:]:
+                        rest.cancel()
+                    break
+        return _merge_trains(pages)
+
+    def search_range(
+        self,
+        dep,
+        arr,
+        start_date,
+        end_date,
+        time="000000",
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+        windows=4,
+        max_workers=8,
+    ):
+        """Search every date from `start_date` to `end_date` (inclusive).
+
+        Each date is split into `windows` time windows and all (date, window)
+        searches share one pool of `max_workers` threads. A `DateSummary` is
+        yielded as soon as all windows of its date are done, so dates arrive
+        in completion order, not calendar order.
+        """
+        self._check_stations(dep, arr)
+        first = datetime.strptime(start_date, "%Y%m%d")
+        last = datetime.strptime(end_date, "%Y%m%d")
+        dates = [
+            (first + timedelta(days=i)).strftime("%Y%m%d")
+            for i in range((last - first).days + 1)
+        ]
+        bounds = _time_windows(time, windows)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {}
+            for date in dates:
+                for index, (start, end) in enumerate(bounds):
+                    future = executor.submit(
+                        self._search_window, dep, arr, date, start, end, train_type, passengers
+                    )
+                    futures[future] = (date, index)
+            by_date = {}
+            for future, (date, index) in futures.items():
+                by_date.setdefault(date, []).append(future)
+
+            pending = {date: len(bounds) for date in dates}
+            pages = {date: [] for date in dates}
+            for future in as_completed(futures):
+                date, index = futures[future]
+                try:
+                    pages[date].append(future.result())
+                except CancelledError:
+                    pass
+                except NoResultsError:
+                    # 이 시간대 이후로는 열차가 없으니 뒤 시간대는 건너뛴다.
+                    for rest in by_date[date][index + 1:]:
+                        rest.cancel()
+                pending[date] -= 1
+                if pending[date] == 0:
+                    trains = _merge_trains(pages.pop(date))
+                    if available_only:
+                        trains = [x for x in trains if x.seat_available()]
+                    yield DateSummary(date, trains)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _search_query(self, dep, arr, date, time, train_type, passengers):
+        """The ScheduleView URL and its encoded query string.
+
+        Everything except the departure time is encoded once per
+        (route, date, train type, passengers) and reused across polls.
+        """
+        date, time = _fill_date_time(date, time)
+        prefix = _search_prefix(
+            self._device, self._version, dep, arr, date, train_type, PassengerSet.of(passengers)
+        )
+        return self._urls["search_schedule"], prefix + urlencode({"txtGoHour": time})
+
+    def _parse_trains(self, j, available_only=False):
+        train_infos = j["trn_infos"]["trn_info"]
+        # print("표조회결과: ", train_infos)
+        trains = []
+
+        for info in train_infos:
+            trains.append(Train(info))
+
+        # 좌석 이력은 available_only 로 거르기 전의 전체 응답을 남긴다.
+        result = SearchResult(trains)
+        if self.recorder is not None:
+            self.recorder.record(result)
+
+        if available_only:
+            result = result.filter(lambda x: x.seat_available())
+
+        return result
+
+    def _cached(self, kind, args, max_age, loader):
+        if self.cache is None:
+            return loader()
+        url, query = self._search_query(*args)
+        result = self.cache.get((kind, query), loader, max_age)
+        # 호출한 쪽이 목록을 정렬하거나 고쳐도 캐시된 결과는 그대로 둔다.
+        return SearchResult(result, result.fetched_at)
+
+    def _search(self, dep, arr, date=None, time=None, train_type=TrainType.ALL,
+                passengers=None, max_age=None):
+        """`search_train` minus its error handling: validates the stations,
+        goes through the cache and the recorder, and raises `KorailError`s
+        to the caller (`KorailPool` benches accounts on them)."""
+        self._check_stations(dep, arr)
+        date, time = _fill_date_time(date, time)
+        return self._cached(
+            "search_train",
+            (dep, arr, date, time, train_type, passengers),
+            max_age,
+            lambda: self._search_page(dep, arr, date, time, train_type, passengers),
+        )
+
+    def search_train(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+        max_age=None,
+        as_table=False,
+    ):
+        """Search trains departing after `time`.
+
+        Returns a `SearchResult`, or a `TrainTable` with `as_table=True`.
+        When the client has a `cache`, `max_age` (seconds) bounds how old a
+        cached result may be; `max_age=0` forces an upstream call.
+        """
+        try:
+            trains = self._search(dep, arr, date, time, train_type, passengers, max_age)
+        except NoResultsError as error:
+            logger.debug("기차 검색 결과가 없습니다. 원인: %s", error)
+            trains = SearchResult()
+        except KorailError as error:
+            logger.warning("기차 검색에 실패하였습니다. 원인: %s", error)
+            trains = SearchResult()
+
+        if available_only:
+            trains = trains.filter(lambda x: x.seat_available())
+
+        if as_table:
+            return _as_table(trains)
+        return trains
+
+    def _seat_type(self, train, option):
+        seat_type = None
+        if train.seat_available() is False:
+            raise SoldOutError()
+        elif option == ReserveOption.GENERAL_ONLY:
+            if train.general_seat_available():
+                seat_type = "1"
+            else:
+                raise SoldOutError()
+        elif option == ReserveOption.SPECIAL_ONLY:
+            if train.special_seat_available():
+                seat_type = "2"
+            else:
+                raise SoldOutError()
+        elif option == ReserveOption.GENERAL_FIRST:
+            if train.general_seat_available():
+                seat_type = "1"
+            else:
+                seat_type = "2"
+        elif option == ReserveOption.SPECIAL_FIRST:
+            if train.special_seat_available():
+                seat_type = "2"
+            else:
+                seat_type = "1"
+        return seat_type
+
+    def _reserve_params(self, train, passengers, option):
+        # Itinerary 면 구간마다 여정정보 블록(txt*1, txt*2)을 채운다.
+        legs = getattr(train, "legs", (train,))
+        if len(legs) > 2:
+            raise ValueError("A reservation holds at most two journeys")
+
+        passengers = PassengerSet.of(passengers)
+        url = self._urls["ticket_reservation"]
+        data = dict(_RESERVE_FORM)
+        data.update({
+            "Device": self._device,
+            "Version": self._version,
+            "Key": self._key,
+            "txtTotPsgCnt": passengers.total,
+            "txtJrnyCnt": str(len(legs)),
+        })
+        for index, leg in enumerate(legs, 1):
+            data.update({
+                f"txtJrnySqno{index}": f"{index:03d}",
+                f"txtJrnyTpCd{index}": "11",
+                f"txtDptDt{index}": leg.dep_date,
+                f"txtDptRsStnCd{index}": leg.dep_code,
+                f"txtDptTm{index}": leg.dep_time,
+                f"txtArvRsStnCd{index}": leg.arr_code,
+                f"txtTrnNo{index}": leg.train_number,
+                f"txtRunDt{index}": leg.run_date,
+                f"txtTrnClsfCd{index}": leg.train_type,
+                f"txtPsrmClCd{index}": self._seat_type(leg, option),
+                f"txtTrnGpCd{index}": leg.train_group,
+            })
+        # 이하 txtTotPsgCnt 만큼 반복 (txtPsgTpCd1, txtDiscKndCd1, txtCompaCnt1, ...)
+        data.update(passengers.form())
+        return url, data
+
+    def _reservation_from_response(self, train, j, seat_count):
+        # TicketReservation 응답에 예약 정보가 다 있으면 목록을 다시 조회하지 않는다.
+        price = j.get("h_rsv_amt", j.get("h_tot_rsv_amt"))
+        if not (j.get("h_pnr_no") and j.get("h_ntisu_lmt_dt") and j.get("h_ntisu_lmt_tm") and price):
+            return None
+        legs = getattr(train, "legs", (train,))
+        return Reservation.from_train(legs[0], {
+            "h_pnr_no": j["h_pnr_no"],
+            "h_ntisu_lmt_dt": j["h_ntisu_lmt_dt"],
+            "h_ntisu_lmt_tm": j["h_ntisu_lmt_tm"],
+            "h_rsv_amt": price,
+            "h_tot_seat_cnt": j.get("h_tot_seat_cnt", seat_count),
+            "txtJrnyCnt": f"{len(legs):02d}",
+        })
+
+    def _reserve_once(self, train, passengers, option):
+        # (예약, 예약번호) -- 응답만으로 예약을 만들 수 없으면 예약은 None
+        url, data = self._reserve_params(train, passengers, option)
+        j = self._request("GET", url, params=data)
+        if self._result_check(j):
+            reservation = self._reservation_from_response(train, j, data["txtTotPsgCnt"])
+            return reservation, j["h_pnr_no"]
+        return None, None
+
+    def reserve(self, train, passengers=None, option=ReserveOption.GENERAL_FIRST):
+        """Reserve `train`, or every leg of an `Itinerary` in one reservation.
+
+        For an itinerary the returned `Reservation` describes the first leg;
+        its `rsv_id` covers the whole journey and `price` is the total.
+        """
+        reservation, rsv_id = self._reserve_once(train, passengers, option)
+        if reservation is not None or rsv_id is None:
+            return reservation
+
+        rsvlist = list(filter(lambda x: x.rsv_id == rsv_id, self.reservations()))
+        if rsvlist:
+            return rsvlist[0]
+
+    def _run_batch(self, call, items, max_workers):
+        def run(item):
+            try:
+                return BatchResult(item, call(item))
+            except KorailError as e:
+                return BatchResult(item, error=e)
+
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+            return list(executor.map(run, items))
+
+    def reserve_many(
+        self,
+        trains,
+        passengers=None,
+        option=ReserveOption.GENERAL_FIRST,
+        max_workers=4,
+    ):
+        """Reserve every train (or `Itinerary`) in `trains` on up to
+        `max_workers` threads.
+
+        Returns one `BatchResult` per train, in order. Reservations the
+        server did not describe in full are looked up with a single
+        `reservations()` call for the whole batch.
+        """
+        def reserve(train):
+            reservation, rsv_id = self._reserve_once(train, passengers, option)
+            # 예약번호만 받은 항목은 배치가 끝난 뒤 한꺼번에 채운다.
+            return reservation if reservation is not None else rsv_id
+
+        results = self._run_batch(reserve, list(trains), max_workers)
+        if any(isinstance(x.value, str) for x in results):
+            by_id = _by_rsv_id(self.reservations())
+            for result in results:
+                if isinstance(result.value, str):
+                    result.value = by_id.get(result.value)
+        return results
+
+    @staticmethod
+    def _cancel_targets(items, reservations):
+        # 예약번호(str)는 한 번 받은 예약 목록에서 Reservation 으로 바꾼다.
+        by_id = _by_rsv_id(reservations)
+        return [x if isinstance(x, Reservation) else by_id.get(x) for x in items]
+
+    @staticmethod
+    def _cancel_results(items, targets, done):
+        results = []
+        for item, target in zip(items, targets):
+            if target is None:
+                results.append(BatchResult(item, error=NoResultsError("P100")))
+            else:
+                result = done[target.rsv_id]
+                results.append(BatchResult(item, result.value, result.error))
+        return results
+
+    def cancel_many(self, reservations, max_workers=4):
+        """Cancel `Reservation`s or reservation ids on up to `max_workers`
+        threads; returns one `BatchResult` per item, in order.
+
+        Ids are resolved with a single `reservations()` call and an unknown
+        id fails with `NoResultsError`. Entries sharing a reservation id
+        (the legs of one journey) are cancelled once.
+        """
+        items = list(reservations)
+        known = () if all(isinstance(x, Reservation) for x in items) else self.reservations()
+        targets = self._cancel_targets(items, known)
+        unique = _by_rsv_id(x for x in targets if x is not None)
+        done = {x.item.rsv_id: x for x in self._run_batch(self.cancel, list(unique.values()), max_workers)}
+        return self._cancel_results(items, targets, done)
+
+    def sweep_expiring(self, before=None, max_workers=4):
+        """Cancel every unpaid reservation whose purchase deadline falls
+        before `before`.
+
+        `before` is a datetime (naive means KST), a timedelta from now, or
+        None for now. The reservations are fetched once; returns the
+        `cancel_many` results of the swept ones.
+        """
+        return self.cancel_many(_expiring(self.reservations(), before), max_workers)
+
+    def reserve_any(
+        self,
+        candidates,
+        passengers=None,
+        option=ReserveOption.GENERAL_FIRST,
+        concurrent=True,
+        max_workers=4,
+        keep=1,
+    ):
+        """Reserve the first of `candidates` that succeeds.
+
+        Candidates are tried in order, or raced on `max_workers` threads with
+        `concurrent=True`. At most `keep` reservations are kept; any extra
+        hold that succeeds during the race is cancelled (a failed cancel is
+        logged, never raised). Returns the kept reservations and re-raises
+        the last error if none succeeded. An error that is not a
+        `KorailError` stops the race, cancels every hold and is re-raised.
+        """
+        candidates = list(candidates)
+        kept = []
+        error = SoldOutError()
+
+        if not concurrent:
+            for train in candidates:
+                try:
+                    reservation = self.reserve(train, passengers, option)
+                except KorailError as e:
+                    error = e
+                    continue
+                except Exception:
+                    self._cancel_surplus(kept)
+                    raise
+                if reservation is not None:
+                    kept.append(reservation)
+                    if len(kept) >= keep:
+                        break
+        else:
+            extra = []
+            failure = None
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(candidates)))) as executor:
+                futures = [
+                    executor.submit(self.reserve, train, passengers, option)
+                    for train in candidates
+                ]
+                for future in as_completed(futures):
+                    try:
+                        reservation = future.result()
+                    except CancelledError:
+                        continue
+                    except KorailError as e:
+                        error = e
+                        continue
+                    except Exception as e:
+                        # 예상치 못한 오류는 남은 시도를 멈추고, 이미 보낸 요청이
+                        # 잡은 예약까지 모두 취소한 뒤 다시 던진다.
+                        if failure is None:
+                            failure = e
+                            for rest in futures:
+                                rest.cancel()
+                        continue
+                    if reservation is None:
+                        continue
+                    if len(kept) < keep and failure is None:
+                        kept.append(reservation)
+                        if len(kept) >= keep:
+                            for rest in futures:
+                                rest.cancel()
+                    else:
+                        extra.append(reservation)
+
+            if failure is not None:
+                self._cancel_surplus(kept + extra)
+                raise failure
+            # 남는 예약을 취소하다 실패해도 이미 잡은 예약은 돌려준다.
+            self._cancel_surplus(extra)
+
+        if not kept:
+            raise error
+        return kept
+
+    def _cancel_surplus(self, reservations):
+        for reservation in reservations:
+            try:
+                self.cancel(reservation)
+            except Exception as e:
+                logger.warning("남는 예약 %s 취소에 실패하였습니다. 원인: %s", reservation.rsv_id, e)
+
+    def _tickets_params(self, page=1, date_from=None, date_to=None):
+        url = self._urls["my_ticket_list"]
+        data = {
+            "Device": self._device,
+            "Version": self._version,
+            "Key": self._key,
+            "txtIndex": "1",
+            "h_page_no": str(page),
+            "txtDeviceId": "",
+            "h_abrd_dt_from": date_from or "",
+            "h_abrd_dt_to": date_to or "",
+        }
+        return url, data
+
+    def _ticket_seat_params(self, ticket):
+        url = self._urls["my_ticket_seat"]
+        data = {
+            "Device": self._device,
+            "Version": self._version,
+            "Key": self._key,
+            "h_orgtk_wct_no": ticket.sale_info1,
+            "h_orgtk_ret_sale_dt": ticket.sale_info2,
+            "h_orgtk_sale_sqno": ticket.sale_info3,
+            "h_orgtk_ret_pwd": ticket.sale_info4,
+        }
+        return url, data
+
+    def _apply_ticket_seat(self, ticket, j):
+        if self._result_check(j):
+            seat = j["ticket_infos"]["ticket_info"][0]["tk_seat_info"][0]
+            self._ticket_seat_cache[ticket.get_ticket_no()] = seat["h_seat_no"]
+            ticket.seat_no = seat["h_seat_no"]
+            ticket.seat_no_end = None
+
+    def _apply_cached_ticket_seat(self, ticket):
+        seat_no = self._ticket_seat_cache.get(ticket.get_ticket_no())
+        if seat_no is None:
+            return False
+        ticket.seat_no = seat_no
+        ticket.seat_no_end = None
+        return True
+
+    def _load_ticket_seat(self, ticket):
+        url, data = self._ticket_seat_params(ticket)
+        self._apply_ticket_seat(ticket, self._request("GET", url, params=data))
+        return ticket
+
+    def tickets(self, lazy_seat=False, max_workers=8):
+        """List tickets with their seat numbers.
+
+        Seat lookups (`SelTicketInfo`) run on up to `max_workers` threads and
+        are cached per `Ticket.get_ticket_no()`. With `lazy_seat=True` the
+        lookup is deferred until `seat_no` is first read.
+        """
+        try:
+            tickets = self._ticket_page(1)
+        except NoResultsError:
+            return []
+        return self._load_ticket_seats(tickets, lazy_seat, max_workers)
+
+    def _ticket_page(self, page, date_from=None, date_to=None):
+        url, data = self._tickets_params(page, date_from, date_to)
+        j = self._request("GET", url, params=data)
+        if self._result_check(j):
+            return [Ticket(info) for info in j["reservation_list"]]
+        return []
+
+    def _load_ticket_seats(self, tickets, lazy_seat, max_workers):
+        pending = []
+        for ticket in tickets:
+            if self._apply_cached_ticket_seat(ticket):
+                continue
+            if lazy_seat:
+                ticket._seat_loader = self._load_ticket_seat
+            else:
+                pending.append(ticket)
+
+        if pending:
+            workers = max(1, min(max_workers, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self._load_ticket_seat, pending))
+        return tickets
+
+    def iter_tickets(self, date_from=None, date_to=None, lazy_seat=False, max_workers=8, max_pages=None):
+        """Yield every ticket boarding between `date_from` and `date_to`
+        (YYYYMMDD, inclusive; None leaves that side open), page by page.
+
+        The filters are sent to the server, the next page is fetched while
+        the current one is consumed, and only those two pages are held, so
+        memory stays bounded for any history. The walk ends on
+        `NoResultsError`, after `max_pages`, or when the server answers a
+        page with tickets it already sent. Seats load as in `tickets`.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = 1
+            upcoming = executor.submit(self._ticket_page, page, date_from, date_to)
+            seen = set()
+            try:
+                while upcoming is not None:
+                    try:
+                        tickets = upcoming.result()
+                    except NoResultsError:
+                        return
+                    numbers = {x.get_ticket_no() for x in tickets}
+                    # h_page_no 를 무시하는 서버가 같은 쪽을 다시 주면 멈춘다.
+                    if not tickets or numbers <= seen:
+                        return
+                    seen = numbers
+                    page += 1
+                    upcoming = None
+                    if max_pages is None or page <= max_pages:
+                        upcoming = executor.submit(self._ticket_page, page, date_from, date_to)
+                    yield from self._load_ticket_seats(tickets, lazy_seat, max_workers)
+            finally:
+                if upcoming is not None:
+                    upcoming.cancel()
+
+    def _reservations_params(self):
+        url = self._urls["my_reservation_list"]
+        data = {
+            "Device": self._device,
+            "Version": self._version,
+            "Key": self._key,
+        }
+        return url, data
+
+    def _parse_reservations(self, j):
+        rsv_infos = j["jrny_infos"]["jrny_info"]
+
+        reserves = []
+
+        for info in rsv_infos:
+            for tinfo in info["train_infos"]["train_info"]:
+                reserves.append(Reservation(tinfo))
+        return reserves
+
+    def iter_reservations(self):
+        """Like `reservations`, yielding each `Reservation` as it is parsed."""
+        url, data = self._reservations_params()
+        try:
+            for info in self._stream_items("GET", url, data, "jrny_info"):
+                for tinfo in info["train_infos"]["train_info"]:
+                    yield Reservation(tinfo)
+        except NoResultsError:
+            return
+
+    def reservations(self):
+        url, data = self._reservations_params()
+        j = self._request("GET", url, params=data)
+        try:
+            if self._result_check(j):
+                return self._parse_reservations(j)
+        except NoResultsError:
+            return []
+
+    def _cancel_params(self, rsv):
+        assert isinstance(rsv, Reservation)
+        url = self._urls["cancel"]
+        data = {
+            "Device": self._device,
+            "Version": self._version,
+            "Key": self._key,
+            "txtPnrNo": rsv.rsv_id,
+            "txtJrnySqno": rsv.journey_no,
+            "txtJrnyCnt": rsv.journey_cnt,
+            "hidRsvChgNo": rsv.rsv_chg_no,
+        }
+        return url, data
+
+    def cancel(self, rsv):
+        url, data = self._cancel_params(rsv)
+        j = self._request("GET", url, params=data)
+        if self._result_check(j):
+            return True
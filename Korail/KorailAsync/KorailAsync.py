@@ -0,0 +1,716 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from ..Korail import (
+    Korail, logger, _as_table, _by_rsv_id, _expiring, _fill_date_time, _merge_trains, _next_time,
+    _time_windows, _wanted
+)
+from ..KorailExceptions.KorailExceptions import (
+    KorailError, NoResultsError, NeedToLoginError, SoldOutError, NetworkError, ServerBusyError
+)
+from ..KorailConstants.KorailConstants import DEFAULT_USER_AGENT
+from ..KorailMetrics.KorailMetrics import endpoint_name
+from ..KorailTransport.KorailTransport import Transport
+from ..KorailClass.KorailClass import (
+    BatchResult, DateSummary, Reservation, SearchResult, Ticket, TrainType, ReserveOption
+)
+
+
+_SYNC_REFUSED = "AsyncKorail sends requests with aiohttp; await its coroutine methods"
+
+
+class _AiohttpCookies(Transport):
+    """The `transport` of an `AsyncKorail`. Requests go through aiohttp, so
+    `request()` refuses instead of running a synchronous path; cookies are
+    those of the aiohttp session, so a `session_store` saves and restores
+    them like with any other transport."""
+
+    def __init__(self, korail):
+        self._korail = korail
+        self._pending = []
+
+    def request(self, method, url, params=None, data=None, timeout=None, stream=False):
+        raise NotImplementedError(_SYNC_REFUSED)
+
+    def _jar(self):
+        client = getattr(self._korail, "_client", None)
+        return client.cookie_jar if client is not None else None
+
+    def cookies(self):
+        jar = self._jar()
+        if jar is None:
+            return list(self._pending)
+        return [
+            {"name": c.key, "value": c.value, "domain": c["domain"], "path": c["path"] or "/"}
+            for c in jar
+        ]
+
+    def set_cookie(self, name, value, domain="", path="/"):
+        # 세션 저장소에서 되살린 쿠키는 aiohttp 세션이 열릴 때까지 들고 있는다.
+        self._pending.append({"name": name, "value": value, "domain": domain, "path": path})
+        jar = self._jar()
+        if jar is not None:
+            self.apply(jar)
+
+    def apply(self, jar):
+        from http.cookies import SimpleCookie
+
+        for cookie in self._pending:
+            morsel = SimpleCookie()
+            morsel[cookie["name"]] = cookie["value"]
+            morsel[cookie["name"]]["domain"] = cookie["domain"]
+            morsel[cookie["name"]]["path"] = cookie["path"]
+            jar.update_cookies(morsel)
+        self._pending = []
+
+
+class AsyncKorail(Korail):
+    """asyncio client over a bounded keep-alive aiohttp pool.
+
+    `pool_size` caps open connections, `max_concurrency` caps requests in flight.
+    `cache`, `station_db`, `session_store` and `auto_relogin` work as in
+    `Korail`; the client logs in on `async with` unless a stored session
+    was restored. Only the coroutine methods are supported: the inherited
+    synchronous request path raises `NotImplementedError`.
+    """
+
+    def __init__(
+        self,
+        korail_id,
+        korail_pw,
+        want_feedback=False,
+        pool_size=100,
+        max_concurrency=100,
+        keepalive_timeout=30,
+        base_url=None,
+        metrics=None,
+        json_loads=None,
+        policy=None,
+        recorder=None,
+        cache=None,
+        station_db=None,
+        session_store=None,
+        auto_relogin=True,
+    ):
+        super().__init__(
+            korail_id,
+            korail_pw,
+            auto_login=False,
+            want_feedback=want_feedback,
+            cache=cache,
+            station_db=station_db,
+            session_store=session_store,
+            auto_relogin=auto_relogin,
+            base_url=base_url,
+            metrics=metrics,
+            json_loads=json_loads,
+            policy=policy,
+            recorder=recorder,
+            # 요청은 모두 aiohttp 로 보내므로 동기 HTTP 스택은 만들지 않는다.
+            transport=_AiohttpCookies(self),
+        )
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.keepalive_timeout = keepalive_timeout
+        self._client = None
+        self._semaphore = None
+        self._async_login_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.open()
+        if not self.is_login:
+            await self.login()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        if self._client is not None:
+            return
+        try:
+            import aiohttp
+        except ImportError as e:
+            raise ImportError("AsyncKorail requires aiohttp: pip install aiohttp") from e
+
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size, keepalive_timeout=self.keepalive_timeout
+        )
+        self._client = aiohttp.ClientSession(
+            connector=connector, headers={"User-Agent": DEFAULT_USER_AGENT}
+        )
+        self.transport.apply(self._client.cookie_jar)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        self.stop_key_refresher()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _send(self, method, url, params=None, data=None):
+        if self._client is None:
+            await self.open()
+        endpoint = endpoint_name(url)
+        return await self.policy.call_async(
+            endpoint, lambda timeout: self._send_once(method, url, params, data, endpoint, timeout)
+        )
+
+    def _stream(self, method, url, params=None, data=None, chunk_size=16384, fields=None):
+        raise NotImplementedError(_SYNC_REFUSED)
+
+    async def _fetch(self, method, url, params, data, timeout):
+        import aiohttp
+
+        if isinstance(params, str):
+            # 이미 인코딩된 쿼리 문자열(_search_query)은 다시 인코딩하지 않는다.
+            from yarl import URL
+            url, params = URL(f"{url}?{params}", encoded=True), None
+        try:
+            async with self._semaphore:
+                async with self._client.request(
+                    method, url, params=params, data=data,
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                ) as r:
+                    body = await r.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise NetworkError(str(error) or error.__class__.__name__) from error
+        if r.status >= 500:
+            raise NetworkError(f"HTTP {r.status}", r.status)
+        if r.status == 429:
+            raise ServerBusyError(r.status)
+        return r.status, body
+
+    async def _send_once(self, method, url, params, data, endpoint, timeout):
+        metrics = self.metrics
+        if metrics is None:
+            status, body = await self._fetch(method, url, params, data, timeout)
+            return self._json_loads(body)
+
+        with metrics.span(endpoint):
+            started = time.perf_counter()
+            try:
+                status, body = await self._fetch(method, url, params, data, timeout)
+                j = self._json_loads(body)
+            except Exception as error:
+                metrics.record_error(endpoint, method, started, error)
+                raise
+            metrics.record_response(endpoint, method, started, body, status, j)
+        return j
+
+    async def _request(self, method, url, params=None, data=None):
+        form = params if params is not None else data
+        sent_key = form.get("Key") if isinstance(form, dict) else None
+        j = await self._send(method, url, params, data)
+
+        if (
+            self.auto_relogin
+            and sent_key is not None
+            and j.get("h_msg_cd") in NeedToLoginError.codes
+            and await self._relogin(sent_key)
+        ):
+            form["Key"] = self._key
+            j = await self._send(method, url, params, data)
+        return j
+
+    async def _relogin(self, expired_key):
+        async with self._async_login_lock:
+            if self._key != expired_key and self.is_login:
+                return True
+            return (await self.login())[0]
+
+    async def login(self, korail_id=None, korail_pw=None):
+        url, data = self._login_params(korail_id, korail_pw)
+        j = await self._send("POST", url, data=data)
+
+        if self._apply_login(j):
+            if self.session_store is not None:
+                await asyncio.to_thread(self.session_store.save, self.korail_id, self._session_state())
+            return True, self._client
+        else:
+            return False, None
+
+    async def logout(self):
+        try:
+            await self._send("GET", self._urls["logout"])
+        except ValueError:
+            # 로그아웃 응답이 JSON 이 아니어도 로그아웃은 끝난 것으로 본다.
+            pass
+        self.is_login = False
+        if self.session_store is not None:
+            await asyncio.to_thread(self.session_store.delete, self.korail_id)
+
+    def start_key_refresher(self, interval=600):
+        """Log in again every `interval` seconds on a task of the running
+        event loop (call it from a coroutine); `close()` stops it."""
+        self.stop_key_refresher()
+
+        async def refresh():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    async with self._async_login_lock:
+                        await self.login()
+                except Exception:
+                    # 실패해도 요청 시점의 P058 재로그인이 남아 있다.
+                    pass
+
+        self._refresher = asyncio.get_running_loop().create_task(refresh())
+        return self._refresher
+
+    def stop_key_refresher(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    async def _cached(self, kind, args, max_age, loader):
+        if self.cache is None:
+            return await loader()
+        url, query = self._search_query(*args)
+        result = await self.cache.get_async((kind, query), loader, max_age)
+        return SearchResult(result, result.fetched_at)
+
+    async def _search(self, dep, arr, date=None, time=None, train_type=TrainType.ALL,
+                      passengers=None, max_age=None):
+        self._check_stations(dep, arr)
+        date, time = _fill_date_time(date, time)
+        return await self._cached(
+            "search_train",
+            (dep, arr, date, time, train_type, passengers),
+            max_age,
+            lambda: self._search_page(dep, arr, date, time, train_type, passengers),
+        )
+
+    async def search_train(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+        max_age=None,
+        as_table=False,
+    ):
+        """Coroutine counterpart of `Korail.search_train`."""
+        try:
+            trains = await self._search(dep, arr, date, time, train_type, passengers, max_age)
+        except NoResultsError as error:
+            logger.debug("기차 검색 결과가 없습니다. 원인: %s", error)
+            trains = SearchResult()
+        except KorailError as error:
+            logger.warning("기차 검색에 실패하였습니다. 원인: %s", error)
+            trains = SearchResult()
+
+        if available_only:
+            trains = trains.filter(lambda x: x.seat_available())
+
+        if as_table:
+            return _as_table(trains)
+        return trains
+
+    async def iter_search_train(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+    ):
+        """`async for` counterpart of `Korail.iter_search_train`. The body
+        is read whole before the trains are yielded; aiohttp responses are
+        not decoded row by row."""
+        self._check_stations(dep, arr)
+        try:
+            trains = await self._search_page(dep, arr, date, time, train_type, passengers)
+        except NoResultsError:
+            return
+        for train in trains:
+            if not available_only or train.seat_available():
+                yield train
+
+    async def _search_page(self, dep, arr, date, time, train_type, passengers):
+        url, query = self._search_query(
+            dep, arr, date, time, train_type, passengers
+        )
+        j = await self._request("GET", url, params=query)
+        if self._result_check(j):
+            return self._parse_trains(j)
+
+    async def _search_window(self, dep, arr, date, start, end, train_type, passengers, max_pages=15):
+        trains = await self._search_page(dep, arr, date, start, train_type, passengers)
+        last_time = start
+        for i in range(max_pages - 1):
+            if not trains or (end is not None and trains[-1].dep_time >= end):
+                break
+            last_time = _next_time(trains, last_time)
+            if last_time is None:
+                break
+            try:
+                page = await self._search_page(
+                    dep, arr, date, last_time, train_type, passengers
+                )
+            except NoResultsError:
+                break
+            if not page:
+                break
+            trains.extend(page)
+
+        if end is not None:
+            trains = [x for x in trains if x.dep_time < end]
+        return trains
+
+    async def search_train_allday(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+        windows=None,
+        max_age=None,
+        as_table=False,
+    ):
+        """Coroutine counterpart of `Korail.search_train_allday`; `windows`
+        run concurrently on the event loop."""
+        self._check_stations(dep, arr)
+        date, time = _fill_date_time(date, time)
+        all_trains = await self._cached(
+            "search_train_allday",
+            (dep, arr, date, time, train_type, passengers),
+            max_age,
+            lambda: self._search_allday(
+                dep, arr, date, time, train_type, passengers, windows
+            ),
+        )
+
+        if available_only:
+            all_trains = all_trains.filter(lambda x: x.seat_available())
+
+        if as_table:
+            return _as_table(all_trains)
+        return all_trains
+
+    async def _search_allday(self, dep, arr, date, time, train_type, passengers, windows):
+        result = SearchResult()
+        if windows:
+            all_trains = await self._search_windows(
+                dep, arr, date, time, train_type, passengers, windows
+            )
+        else:
+            all_trains = []
+            async for trains in self._iter_pages(dep, arr, date, time, train_type, passengers):
+                all_trains.extend(trains)
+        result.extend(all_trains)
+        return result
+
+    async def _iter_pages(self, dep, arr, date, time, train_type, passengers, max_pages=15, pace=None):
+        last_time = time
+        for i in range(max_pages):
+            if pace is not None and await pace() is False:
+                return
+            try:
+                trains = await self._search_page(
+                    dep, arr, date, last_time, train_type, passengers
+                )
+            except NoResultsError:
+                return
+            if not trains:
+                return
+            yield trains
+            last_time = _next_time(trains, last_time)
+            if last_time is None:
+                return
+
+    async def iter_trains_allday(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+        until=None,
+        train_types=None,
+        max_pages=15,
+        pace=None,
+    ):
+        """`async for` counterpart of `Korail.iter_trains_allday`; `pace` is
+        awaited before every page request, e.g. `TokenBucket.acquire_async`."""
+        self._check_stations(dep, arr)
+        date, time = _fill_date_time(date, time)
+        pages = self._iter_pages(dep, arr, date, time, train_type, passengers, max_pages, pace)
+        try:
+            async for trains in pages:
+                for train in trains:
+                    if until is not None and train.dep_time > until:
+                        return
+                    if _wanted(train, available_only, train_types):
+                        yield train
+        finally:
+            await pages.aclose()
+
+    async def _search_windows(self, dep, arr, date, time, train_type, passengers, windows):
+        tasks = [
+            asyncio.ensure_future(
+                self._search_window(dep, arr, date, start, end, train_type, passengers)
+            )
+            for start, end in _time_windows(time, windows)
+        ]
+        pages = []
+        try:
+            for task in tasks:
+                try:
+                    pages.append(await task)
+                except NoResultsError:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+        return _merge_trains(pages)
+
+    async def search_range(
+        self,
+        dep,
+        arr,
+        start_date,
+        end_date,
+        time="000000",
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+        windows=4,
+    ):
+        """`async for` counterpart of `Korail.search_range`: every date runs
+        its `windows` concurrently (bounded by `max_concurrency`) and a
+        `DateSummary` is yielded as each date completes."""
+        self._check_stations(dep, arr)
+        first = datetime.strptime(start_date, "%Y%m%d")
+        last = datetime.strptime(end_date, "%Y%m%d")
+        dates = [
+            (first + timedelta(days=i)).strftime("%Y%m%d")
+            for i in range((last - first).days + 1)
+        ]
+
+        async def summary(date):
+            trains = await self._search_windows(dep, arr, date, time, train_type, passengers, windows)
+            if available_only:
+                trains = [x for x in trains if x.seat_available()]
+            return DateSummary(date, trains)
+
+        tasks = [asyncio.ensure_future(summary(date)) for date in dates]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _reserve_once(self, train, passengers, option):
+        url, data = self._reserve_params(train, passengers, option)
+        j = await self._request("GET", url, params=data)
+        if self._result_check(j):
+            reservation = self._reservation_from_response(train, j, data["txtTotPsgCnt"])
+            return reservation, j["h_pnr_no"]
+        return None, None
+
+    async def reserve(self, train, passengers=None, option=ReserveOption.GENERAL_FIRST):
+        reservation, rsv_id = await self._reserve_once(train, passengers, option)
+        if reservation is not None or rsv_id is None:
+            return reservation
+
+        rsvlist = list(filter(lambda x: x.rsv_id == rsv_id, await self.reservations()))
+        if rsvlist:
+            return rsvlist[0]
+
+    async def _run_batch(self, call, items, max_workers):
+        limit = asyncio.Semaphore(max(1, max_workers))
+
+        async def run(item):
+            async with limit:
+                try:
+                    return BatchResult(item, await call(item))
+                except KorailError as e:
+                    return BatchResult(item, error=e)
+
+        return list(await asyncio.gather(*map(run, items)))
+
+    async def reserve_many(
+        self,
+        trains,
+        passengers=None,
+        option=ReserveOption.GENERAL_FIRST,
+        max_workers=4,
+    ):
+        async def reserve(train):
+            reservation, rsv_id = await self._reserve_once(train, passengers, option)
+            return reservation if reservation is not None else rsv_id
+
+        results = await self._run_batch(reserve, list(trains), max_workers)
+        if any(isinstance(x.value, str) for x in results):
+            by_id = _by_rsv_id(await self.reservations())
+            for result in results:
+                if isinstance(result.value, str):
+                    result.value = by_id.get(result.value)
+        return results
+
+    async def cancel_many(self, reservations, max_workers=4):
+        items = list(reservations)
+        known = () if all(isinstance(x, Reservation) for x in items) else await self.reservations()
+        targets = self._cancel_targets(items, known)
+        unique = _by_rsv_id(x for x in targets if x is not None)
+        done = {x.item.rsv_id: x for x in await self._run_batch(self.cancel, list(unique.values()), max_workers)}
+        return self._cancel_results(items, targets, done)
+
+    async def sweep_expiring(self, before=None, max_workers=4):
+        return await self.cancel_many(_expiring(await self.reservations(), before), max_workers)
+
+    async def reserve_any(
+        self,
+        candidates,
+        passengers=None,
+        option=ReserveOption.GENERAL_FIRST,
+        concurrent=True,
+        max_workers=4,
+        keep=1,
+    ):
+        """Reserve the first of `candidates` that succeeds.
+
+        As `Korail.reserve_any`: at most `max_workers` reservations are in
+        flight (one at a time with `concurrent=False`) and no new one is
+        sent once `keep` are held.
+        """
+        slots = asyncio.Semaphore(max(1, max_workers) if concurrent else 1)
+        stop = asyncio.Event()
+        held = []
+        kept = []
+        extra = []
+        error = SoldOutError()
+        failure = None
+
+        async def attempt(train):
+            async with slots:
+                # 필요한 만큼 잡았거나 예상치 못한 오류가 난 뒤에는 보내지 않는다.
+                if stop.is_set():
+                    return None
+                try:
+                    reservation = await self.reserve(train, passengers, option)
+                except KorailError:
+                    raise
+                except Exception:
+                    stop.set()
+                    raise
+                if reservation is not None:
+                    held.append(reservation)
+                    if len(held) >= keep:
+                        stop.set()
+                return reservation
+
+        tasks = [asyncio.ensure_future(attempt(train)) for train in candidates]
+        # 이미 보낸 예약 요청은 끊지 않고 기다렸다가 남는 예약을 취소한다.
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                reservation = await next_done
+            except KorailError as e:
+                error = e
+                continue
+            except Exception as e:
+                if failure is None:
+                    failure = e
+                continue
+            if reservation is None:
+                continue
+            if len(kept) < keep and failure is None:
+                kept.append(reservation)
+            else:
+                extra.append(reservation)
+
+        if failure is not None:
+            await self._cancel_surplus(kept + extra)
+            raise failure
+        # 남는 예약을 취소하다 실패해도 이미 잡은 예약은 돌려준다.
+        await self._cancel_surplus(extra)
+
+        if not kept:
+            raise error
+        return kept
+
+    async def _cancel_surplus(self, reservations):
+        for reservation in reservations:
+            try:
+                await self.cancel(reservation)
+            except Exception as e:
+                logger.warning("남는 예약 %s 취소에 실패하였습니다. 원인: %s", reservation.rsv_id, e)
+
+    async def _load_ticket_seat(self, ticket):
+        url, data = self._ticket_seat_params(ticket)
+        self._apply_ticket_seat(ticket, await self._request("GET", url, params=data))
+        return ticket
+
+    async def _ticket_page(self, page, date_from=None, date_to=None):
+        url, data = self._tickets_params(page, date_from, date_to)
+        j = await self._request("GET", url, params=data)
+        if self._result_check(j):
+            tickets = [Ticket(info) for info in j["reservation_list"]]
+            pending = [x for x in tickets if not self._apply_cached_ticket_seat(x)]
+            await asyncio.gather(*map(self._load_ticket_seat, pending))
+            return tickets
+        return []
+
+    async def tickets(self):
+        try:
+            return await self._ticket_page(1)
+        except NoResultsError:
+            return []
+
+    async def iter_tickets(self, date_from=None, date_to=None, max_pages=None):
+        page = 1
+        upcoming = asyncio.ensure_future(self._ticket_page(page, date_from, date_to))
+        seen = set()
+        try:
+            while upcoming is not None:
+                try:
+                    tickets = await upcoming
+                except NoResultsError:
+                    return
+                numbers = {x.get_ticket_no() for x in tickets}
+                if not tickets or numbers <= seen:
+                    return
+                seen = numbers
+                page += 1
+                upcoming = None
+                if max_pages is None or page <= max_pages:
+                    upcoming = asyncio.ensure_future(self._ticket_page(page, date_from, date_to))
+                for ticket in tickets:
+                    yield ticket
+        finally:
+            if upcoming is not None:
+                upcoming.cancel()
+
+    async def iter_reservations(self):
+        """`async for` counterpart of `Korail.iter_reservations`; the body
+        is read whole first."""
+        for reservation in await self.reservations():
+            yield reservation
+
+    async def reservations(self):
+        url, data = self._reservations_params()
+        j = await self._request("GET", url, params=data)
+        try:
+            if self._result_check(j):
+                return self._parse_reservations(j)
+        except NoResultsError:
+            return []
+
+    async def cancel(self, rsv):
+        url, data = self._cancel_params(rsv)
+        j = await self._request("GET", url, params=data)
+        if self._result_check(j):
+            return True
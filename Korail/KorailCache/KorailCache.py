@@ -0,0 +1,188 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_MISS = object()
+
+
+def _sizeof(value):
+    size = sys.getsizeof(value)
+    for item in value:
+        size += sys.getsizeof(item)
+        attrs = getattr(item, "__dict__", None)
+        if attrs is None:
+            attrs = {
+                name: getattr(item, name, None)
+                for cls in type(item).__mro__
+                for name in getattr(cls, "__slots__", ())
+            }
+        size += sum(sys.getsizeof(v) for v in attrs.values())
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "size")
+
+    def __init__(self, value, stored_at, size):
+        self.value = value
+        self.stored_at = stored_at
+        self.size = size
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SearchCache:
+    """Thread-safe TTL + LRU cache for search results.
+
+    Entries live for `ttl` seconds. Up to `stale_ttl` seconds past that an
+    entry is still served while a single background refresh runs. Size is
+    bounded by `max_entries` and, optionally, an estimated `max_bytes`.
+    Concurrent misses for the same key share one upstream call;
+    `get_async` does the same for coroutine loaders on an event loop.
+    """
+
+    def __init__(self, ttl=5.0, max_entries=1024, max_bytes=None, stale_ttl=0.0,
+                 sizeof=_sizeof, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.sizeof = sizeof
+        self.clock = clock
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, loader, max_age=None):
+        """Return the cached value for `key`, calling `loader()` on a miss.
+
+        `max_age` (seconds) rejects entries older than that, e.g. `max_age=0`
+        always goes upstream. Stale entries are never served when `max_age`
+        is given.
+        """
+        found = self._lookup(key, max_age)
+        if found is _MISS:
+            return self._load(key, loader)
+        value, refresh = found
+        if refresh:
+            threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+        return value
+
+    async def get_async(self, key, loader, max_age=None):
+        """`get` for a coroutine function `loader`. Concurrent misses on the
+        event loop share one call; a stale entry is refreshed on a task."""
+        import asyncio
+
+        found = self._lookup(key, max_age)
+        if found is _MISS:
+            return await asyncio.shield(self._load_async(key, loader))
+        value, refresh = found
+        if refresh:
+            self._load_async(key, loader)
+        return value
+
+    def _lookup(self, key, max_age):
+        # (값, 갱신할지) 또는 _MISS. 적중과 실패도 여기서 센다.
+        with self._lock:
+            # max_age=0 은 시계 해상도와 상관없이 늘 새로 받는다.
+            entry = self._entries.get(key) if max_age != 0 else None
+            if entry is not None:
+                age = self.clock() - entry.stored_at
+                if max_age is None or age <= max_age:
+                    if age <= self.ttl:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry.value, False
+                    if max_age is None and age <= self.ttl + self.stale_ttl:
+                        # 갱신이 이미 돌고 있어도 기다리지 않고 이전 값을 준다.
+                        self.hits += 1
+                        return entry.value, key not in self._inflight and key not in self._tasks
+            self.misses += 1
+        return _MISS
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.bytes = 0
+            else:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self.bytes -= entry.size
+
+    def _refresh(self, key, loader):
+        try:
+            self._load(key, loader)
+        except Exception:
+            # 갱신에 실패하면 기존 항목을 TTL 이 끝날 때까지 그대로 쓴다.
+            pass
+
+    def _load_async(self, key, loader):
+        import asyncio
+
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(loader())
+            task.add_done_callback(lambda done: self._loaded(key, done))
+        return task
+
+    def _loaded(self, key, task):
+        del self._tasks[key]
+        # 실패한 갱신은 버린다. 기다리던 쪽은 shield 를 거쳐 같은 예외를 받는다.
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    def _load(self, key, loader):
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self._store(key, flight.value)
+            return flight.value
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+
+    def _store(self, key, value):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.size
+            self._entries[key] = _Entry(value, self.clock(), size)
+            self.bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
@@ -1,293 +1,730 @@
-import itertools
-from functools import reduce
-import json
-import requests
-
-from ..KorailConstants.KorailConstants import (
-    EMAIL_REGEX, PHONE_NUMBER_REGEX, KORAIL_URLS, DEFAULT_USER_AGENT, InputFlag
-)
-
-
-class Schedule:
-    def __init__(self, data):
-        self.train_type = data.get("h_trn_clsf_cd")
-        self.train_name = data.get("h_trn_clsf_nm")
-        self.train_group = data.get("h_trn_gp_cd")
-        self.train_number = data.get("h_trn_no")
-        self.delay_time = data.get("h_expct_dlay_hr")
-
-        self.dep_station_name = data.get("h_dpt_rs_stn_nm")
-        self.dep_code = data.get("h_dpt_rs_stn_cd")
-        self.dep_date = data.get("h_dpt_dt")
-        self.dep_time = data.get("h_dpt_tm")
-
-        self.arr_station_name = data.get("h_arv_rs_stn_nm")
-        self.arr_code = data.get("h_arv_rs_stn_cd")
-        self.arr_date = data.get("h_arv_dt")
-        self.arr_time = data.get("h_arv_tm")
-
-        self.run_date = data.get("h_run_dt")
-
-    def __repr__(self):
-        dep_time = f"{self.dep_time[:2]}:{self.dep_time[2:4]}"
-        arr_time = f"{self.arr_time[:2]}:{self.arr_time[2:4]}"
-
-        dep_date = f"{int(self.dep_date[4:6])}월 {int(self.dep_date[6:])}일"
-
-        repr_str = f"[{self.train_name}] {dep_date}, {self.dep_station_name}~{self.arr_station_name}({dep_time}~{arr_time})"
-        return repr_str
-
-class Train(Schedule):
-    def __init__(self, data):
-        super().__init__(data)
-        self.reserve_possible = data.get("h_rsv_psb_flg")
-        self.reserve_possible_price = data.get("h_rsv_psb_nm")
-        self.special_possible_price = data.get("h_spe_rsv_psb_nm")
-
-        self.special_seat_state = data.get("h_spe_rsv_nm")
-        self.general_seat_state = data.get("h_gen_rsv_nm")
-
-    def __repr__(self):
-        repr_str = super().__repr__()
-
-        if self.reserve_possible_price is not None or self.special_possible_price:
-            seats_info = []
-            special_price = self.special_possible_price.replace('\n', ' ')
-            reserve_price = self.reserve_possible_price.replace('\n', ' ')
-
-            if self.special_seat_available():
-                seats_info.append(f"특실: {special_price}, {self.special_seat_state}")
-
-            if self.general_seat_available():
-                seats_info.append(f"일반실: {reserve_price}, {self.general_seat_state}")
-
-            repr_str += ', ' + ', '.join(seats_info).rstrip(', ')
-
-        return repr_str
-
-    def special_seat_available(self):
-        return self.special_seat_state == "매진" or self.special_seat_state == "-"
-
-    def general_seat_available(self):
-        return self.general_seat_state == "매진" or self.general_seat_state == "-"
-
-    def seat_available(self):
-        return self.general_seat_available() or self.special_seat_available()
-
-class TrainType:
-    KTX = "100"  # "KTX, KTX-산천",
-    SAEMAEUL = "101"  # "새마을호",
-    MUGUNGHWA = "102"  # "무궁화호",
-    TONGGUEN = "103"  # "통근열차",
-    NURIRO = "102"  # "누리로",
-    ALL = "109"  # "전체",
-    AIRPORT = "105"  # "공항직통",
-    KTX_SANCHEON = "100"  # "KTX-산천",
-    ITX_SAEMAEUL = "101"  # "ITX-새마을",
-    ITX_CHEONGCHUN = "104"  # "ITX-청춘",
-
-    def __init__(self):
-        raise NotImplementedError("Do not make instance.")
-
-class ReserveOption:
-    GENERAL_FIRST = "GENERAL_FIRST"  # 일반실 우선
-    GENERAL_ONLY = "GENERAL_ONLY"  # 일반실만
-    SPECIAL_FIRST = "SPECIAL_FIRST"  # 특실 우선
-    SPECIAL_ONLY = "SPECIAL_ONLY"  # 특실만
-
-    def __init__(self):
-        raise NotImplementedError("Do not make instance.")
-
-class Ticket(Train):
-    def __init__(self, data):
-        raw_data = data["ticket_list"][0]["train_info"][0]
-        super().__init__(raw_data)
-
-        self.seat_no_end = raw_data.get("h_seat_no_end")
-        self.seat_no_count = int(raw_data.get("h_seat_cnt", 0))
-
-        self.buyer_name = raw_data.get("h_buy_ps_nm")
-        self.sale_date = raw_data.get("h_orgtk_sale_dt")
-        self.sale_info1 = raw_data.get("h_orgtk_wct_no")
-        self.sale_info2 = raw_data.get("h_orgtk_ret_sale_dt")
-        self.sale_info3 = raw_data.get("h_orgtk_sale_sqno")
-        self.sale_info4 = raw_data.get("h_orgtk_ret_pwd")
-        self.price = int(raw_data.get("h_rcvd_amt", 0))
-
-        self.car_no = raw_data.get("h_srcar_no")
-        self.seat_no = raw_data.get("h_seat_no")
-
-    def __repr__(self):
-        repr_str = super().__repr__()
-
-        repr_str += f" => {self.car_no}호"
-
-        if self.seat_no_count != 1:
-            repr_str += f" {self.seat_no}~{self.seat_no_end}"
-        else:
-            repr_str += f" {self.seat_no}"
-
-        repr_str += f", {self.price}원"
-
-        return repr_str
-
-    def get_ticket_no(self):
-        return "-".join(map(str, (self.sale_info1, self.sale_info2, self.sale_info3, self.sale_info4)))
-
-class Passenger:
-    def __init__(self, typecode, count=1, discount_type="000", card="", card_no="", card_pw=""):
-        self.typecode = typecode
-        self.count = count
-        self.discount_type = discount_type
-        self.card = card
-        self.card_no = card_no
-        self.card_pw = card_pw
-
-    @staticmethod
-    def reduce(passenger_list):
-        """Reduce passenger's list."""
-        if list(filter(lambda x: not isinstance(x, Passenger), passenger_list)):
-            raise TypeError("Passengers must be based on Passenger")
-
-        groups = itertools.groupby(passenger_list, lambda x: x.group_key())
-        return list(
-            filter(
-                lambda x: x.count > 0,
-                [reduce(lambda a, b: a + b, g) for k, g in groups],
-            )
-        )
-
-    def __add__(self, other):
-        assert isinstance(other, self.__class__)
-        if self.group_key() == other.group_key():
-            return self.__class__(
-                typecode=self.typecode,
-                count=self.count + other.count,
-                discount_type=self.discount_type,
-                card=self.card,
-                card_no=self.card_no,
-                card_pw=self.card_pw,
-            )
-        else:
-            raise TypeError(
-                "other's group_key(%s) is not equal to self's group_key(%s)."
-                % (other.group_key(), self.group_key())
-            )
-
-    def group_key(self):
-        return f"{self.typecode}_{self.discount_type}_{self.card}_{self.card_no}_{self.card_pw}"
-
-    def get_dict(self, index):
-        assert isinstance(index, int)
-        index = str(index)
-        return {
-            "txtPsgTpCd" + index: self.typecode,
-            "txtDiscKndCd" + index: self.discount_type,
-            "txtCompaCnt" + index: self.count,
-            "txtCardCode_" + index: self.card,
-            "txtCardNo_" + index: self.card_no,
-            "txtCardPw_" + index: self.card_pw,
-        }
-
-class AdultPassenger(Passenger):
-    def __init__(self, count=1, discount_type="000", card="", card_no="", card_pw=""):
-        super().__init__("1", count, discount_type, card, card_no, card_pw)
-
-class ChildPassenger(Passenger):
-    def __init__(self, count=1, discount_type="000", card="", card_no="", card_pw=""):
-        super().__init__("3", count, discount_type, card, card_no, card_pw)
-
-class SeniorPassenger(Passenger):
-    def __init__(self, count=1, discount_type="131", card="", card_no="", card_pw=""):
-        super().__init__("1", count, discount_type, card, card_no, card_pw)
-
-class Reservation(Train):
-    def __init__(self, data):
-        super().__init__(data)
-        self.dep_date = data.get("h_run_dt")
-        self.arr_date = data.get("h_run_dt")
-
-        self.rsv_id = data.get("h_pnr_no")
-        self.seat_no_count = int(data.get("h_tot_seat_cnt"))
-        self.buy_limit_date = data.get("h_ntisu_lmt_dt")
-        self.buy_limit_time = data.get("h_ntisu_lmt_tm")
-        self.price = int(data.get("h_rsv_amt"))
-        self.journey_no = data.get("txtJrnySqno", "001")
-        self.journey_cnt = data.get("txtJrnyCnt", "01")
-        self.rsv_chg_no = data.get("hidRsvChgNo", "00000")
-
-    def __repr__(self):
-        repr_str = super().__repr__()
-
-        repr_str += f", {self.price}원({self.seat_no_count}석)"
-
-        buy_limit_time = f"{self.buy_limit_time[:2]}:{self.buy_limit_time[2:4]}"
-        buy_limit_date = f"{int(self.buy_limit_date[4:6])}월 {int(self.buy_limit_date[6:])}일"
-
-        repr_str += f", 구입기한 {buy_limit_date} {buy_limit_time}"
-
-        return repr_str
-
-class KorailSession:
-
-    def __init__(self, korail_id, korail_pw, auto_login=True):
-        self._session = requests.Session()
-        self._session.headers.update({"User-Agent": DEFAULT_USER_AGENT})
-        self.korail_id = korail_id
-        self.korail_pw = korail_pw
-        self._device = "AD"
-        self._version = "190617001"
-        self._key = "korail1234567890"
-        self.membership_number = None
-        self.name = None
-        self.email = None
-        self.is_login = False
-
-        if auto_login:
-            self.login(korail_id, korail_pw)
-
-    def login(self, korail_id=None, korail_pw=None):
-        if korail_id is None:
-            korail_id = self.korail_id
-        else:
-            self.korail_id = korail_id
-
-        if korail_pw is None:
-            korail_pw = self.korail_pw
-        else:
-            self.korail_pw = korail_pw
-
-        if EMAIL_REGEX.match(korail_id):
-            txt_input_flg = InputFlag.EMAIL.value
-        elif PHONE_NUMBER_REGEX.match(korail_id):
-            txt_input_flg = InputFlag.PHONE_NUMBER.value
-        else:
-            txt_input_flg = InputFlag.MEMBERSHIP_NUMBER.value
-
-        url = KORAIL_URLS["login"]
-        data = {
-            "Device": self._device,
-            "Version": "150718001",
-            "txtInputFlg": txt_input_flg,
-            "txtMemberNo": korail_id,
-            "txtPwd": korail_pw,
-        }
-
-        r = self._session.post(url, data=data)
-        j = json.loads(r.text)
-
-        if j["strResult"] == "SUCC" and j.get("strMbCrdNo") is not None:
-            self._key = j["Key"]
-            self.membership_number = j["strMbCrdNo"]
-            self.name = j["strCustNm"]
-            self.email = j["strEmailAdr"]
-            self.is_login = True
-            return True, self._session
-        else:
-            self.is_login = False
-            return False, None
-
-    def logout(self):
-        url = KORAIL_URLS["logout"]
-        self._session.get(url)
-        self.is_login = False
+import copy
+import re
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+
+from ..KorailExceptions.KorailExceptions import (
+    KorailError, NeedToLoginError, NetworkError, ServerBusyError
+)
+from ..KorailPolicy.KorailPolicy import RequestPolicy
+from ..KorailTransport.KorailTransport import RequestsTransport
+from ..KorailMetrics.KorailMetrics import RequestEvent, endpoint_name
+from ..KorailDecode.KorailDecode import json_loads as default_json_loads
+from ..KorailConstants.KorailConstants import (
+    EMAIL_REGEX, PHONE_NUMBER_REGEX, KORAIL_URLS, korail_urls, InputFlag
+)
+
+
+PRICE_REGEX = re.compile(r"(\d[\d,]*)\s*원")
+
+def parse_price(text):
+    """'예약하기\n59,800원' -> 59800, or None if there is no price."""
+    match = PRICE_REGEX.search(text or "")
+    if match is None:
+        return None
+    return int(match.group(1).replace(",", ""))
+
+def _field_loader(fields):
+    """Compile `self.<attr> = get(<key>)` for every (attr, key) in `fields` once."""
+    lines = ["def _load(self, get):"]
+    lines += [f"    self.{attr} = get({key!r})" for attr, key in fields]
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["_load"]
+
+class Schedule:
+    _fields = (
+        ("train_type", "h_trn_clsf_cd"),
+        ("train_name", "h_trn_clsf_nm"),
+        ("train_group", "h_trn_gp_cd"),
+        ("train_number", "h_trn_no"),
+        ("delay_time", "h_expct_dlay_hr"),
+
+        ("dep_station_name", "h_dpt_rs_stn_nm"),
+        ("dep_code", "h_dpt_rs_stn_cd"),
+        ("dep_date", "h_dpt_dt"),
+        ("dep_time", "h_dpt_tm"),
+
+        ("arr_station_name", "h_arv_rs_stn_nm"),
+        ("arr_code", "h_arv_rs_stn_cd"),
+        ("arr_date", "h_arv_dt"),
+        ("arr_time", "h_arv_tm"),
+
+        ("run_date", "h_run_dt"),
+    )
+    __slots__ = tuple(attr for attr, key in _fields)
+    _load = _field_loader(_fields)
+
+    def __init__(self, data):
+        self._load(data.get)
+
+    def __repr__(self):
+        dep_time = f"{self.dep_time[:2]}:{self.dep_time[2:4]}"
+        arr_time = f"{self.arr_time[:2]}:{self.arr_time[2:4]}"
+
+        dep_date = f"{int(self.dep_date[4:6])}월 {int(self.dep_date[6:])}일"
+
+        repr_str = f"[{self.train_name}] {dep_date}, {self.dep_station_name}~{self.arr_station_name}({dep_time}~{arr_time})"
+        return repr_str
+
+    def key(self):
+        return self.train_number, self.dep_date, self.dep_time
+
+class Train(Schedule):
+    _train_fields = (
+        ("reserve_possible", "h_rsv_psb_flg"),
+        ("reserve_possible_price", "h_rsv_psb_nm"),
+        ("special_possible_price", "h_spe_rsv_psb_nm"),
+
+        ("special_seat_state", "h_spe_rsv_nm"),
+        ("general_seat_state", "h_gen_rsv_nm"),
+    )
+    __slots__ = tuple(attr for attr, key in _train_fields)
+    _fields = Schedule._fields + _train_fields
+    _load = _field_loader(_fields)
+
+    def __repr__(self):
+        repr_str = super().__repr__()
+
+        if self.reserve_possible_price is not None or self.special_possible_price:
+            seats_info = []
+            special_price = self.special_possible_price.replace('\n', ' ')
+            reserve_price = self.reserve_possible_price.replace('\n', ' ')
+
+            if self.special_seat_available():
+                seats_info.append(f"특실: {special_price}, {self.special_seat_state}")
+
+            if self.general_seat_available():
+                seats_info.append(f"일반실: {reserve_price}, {self.general_seat_state}")
+
+            repr_str += ', ' + ', '.join(seats_info).rstrip(', ')
+
+        return repr_str
+
+    def special_seat_available(self):
+        return self.special_seat_state not in (None, "매진", "-")
+
+    def general_seat_available(self):
+        return self.general_seat_state not in (None, "매진", "-")
+
+    def seat_available(self):
+        return self.general_seat_available() or self.special_seat_available()
+
+class SearchResult(list):
+    """List of trains that remembers when it was fetched from Korail."""
+
+    def __init__(self, trains=(), fetched_at=None):
+        super().__init__(trains)
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def filter(self, predicate):
+        return SearchResult(filter(predicate, self), self.fetched_at)
+
+class DateSummary:
+    """Trains found for one date plus the figures used to compare dates."""
+
+    def __init__(self, date, trains):
+        self.date = date
+        self.trains = trains
+        available = [x for x in trains if x.seat_available()]
+        self.count = len(trains)
+        self.available_count = len(available)
+        self.earliest_available = min(
+            available, key=lambda x: (x.dep_date, x.dep_time), default=None
+        )
+        self.cheapest = None
+        self.cheapest_fare = None
+        for train in available:
+            fares = []
+            if train.general_seat_available():
+                fares.append(parse_price(train.reserve_possible_price))
+            if train.special_seat_available():
+                fares.append(parse_price(train.special_possible_price))
+            fares = [x for x in fares if x is not None]
+            if fares and (self.cheapest_fare is None or min(fares) < self.cheapest_fare):
+                self.cheapest, self.cheapest_fare = train, min(fares)
+
+    def __repr__(self):
+        earliest = self.earliest_available.dep_time[:4] if self.earliest_available else "-"
+        return (f"<DateSummary {self.date}: {self.available_count}/{self.count} available, "
+                f"earliest {earliest}, cheapest {self.cheapest_fare}>")
+
+def train_datetime(date, time):
+    """'20231010', '063000' -> datetime(2023, 10, 10, 6, 30)"""
+    return datetime.strptime(date + time, "%Y%m%d%H%M%S")
+
+class Itinerary:
+    """A journey of one or more trains, each leg leaving from the station
+    the previous one arrives at. `Korail.reserve` books all legs as one
+    reservation."""
+
+    __slots__ = ("legs", "departure", "arrival")
+
+    def __init__(self, legs):
+        self.legs = tuple(legs)
+        first, last = self.legs[0], self.legs[-1]
+        self.departure = train_datetime(first.dep_date, first.dep_time)
+        self.arrival = train_datetime(last.arr_date, last.arr_time)
+
+    @property
+    def duration(self):
+        return self.arrival - self.departure
+
+    @property
+    def transfers(self):
+        return len(self.legs) - 1
+
+    @property
+    def transfer_stations(self):
+        return [x.arr_station_name for x in self.legs[:-1]]
+
+    def transfer_waits(self):
+        """Time spent at each transfer station."""
+        return [
+            train_datetime(b.dep_date, b.dep_time) - train_datetime(a.arr_date, a.arr_time)
+            for a, b in zip(self.legs, self.legs[1:])
+        ]
+
+    def seat_available(self):
+        return all(x.seat_available() for x in self.legs)
+
+    def key(self):
+        return tuple(x.key() for x in self.legs)
+
+    def __repr__(self):
+        return " → ".join(map(repr, self.legs))
+
+class TrainType:
+    KTX = "100"  # "KTX, KTX-산천",
+    SAEMAEUL = "101"  # "새마을호",
+    MUGUNGHWA = "102"  # "무궁화호",
+    TONGGUEN = "103"  # "통근열차",
+    NURIRO = "102"  # "누리로",
+    ALL = "109"  # "전체",
+    AIRPORT = "105"  # "공항직통",
+    KTX_SANCHEON = "100"  # "KTX-산천",
+    ITX_SAEMAEUL = "101"  # "ITX-새마을",
+    ITX_CHEONGCHUN = "104"  # "ITX-청춘",
+
+    def __init__(self):
+        raise NotImplementedError("Do not make instance.")
+
+class ReserveOption:
+    GENERAL_FIRST = "GENERAL_FIRST"  # 일반실 우선
+    GENERAL_ONLY = "GENERAL_ONLY"  # 일반실만
+    SPECIAL_FIRST = "SPECIAL_FIRST"  # 특실 우선
+    SPECIAL_ONLY = "SPECIAL_ONLY"  # 특실만
+
+    def __init__(self):
+        raise NotImplementedError("Do not make instance.")
+
+class Ticket(Train):
+    _ticket_fields = (
+        ("seat_no_end", "h_seat_no_end"),
+
+        ("buyer_name", "h_buy_ps_nm"),
+        ("sale_date", "h_orgtk_sale_dt"),
+        ("sale_info1", "h_orgtk_wct_no"),
+        ("sale_info2", "h_orgtk_ret_sale_dt"),
+        ("sale_info3", "h_orgtk_sale_sqno"),
+        ("sale_info4", "h_orgtk_ret_pwd"),
+
+        ("car_no", "h_srcar_no"),
+        ("_seat_no", "h_seat_no"),
+    )
+    __slots__ = tuple(attr for attr, key in _ticket_fields) + (
+        "seat_no_count", "price", "_seat_loader"
+    )
+    _fields = Train._fields + _ticket_fields
+    _load = _field_loader(_fields)
+
+    def __init__(self, data):
+        raw_data = data["ticket_list"][0]["train_info"][0]
+        super().__init__(raw_data)
+
+        self.seat_no_count = int(raw_data.get("h_seat_cnt", 0))
+        self.price = int(raw_data.get("h_rcvd_amt", 0))
+        self._seat_loader = None
+
+    @property
+    def seat_no(self):
+        # 좌석 조회를 미룬 경우 처음 읽을 때 한 번만 조회한다. 조회가 실패하면
+        # loader 를 남겨 두어 다음에 읽을 때 다시 조회한다.
+        loader = self._seat_loader
+        if loader is not None:
+            loader(self)
+            self._seat_loader = None
+        return self._seat_no
+
+    @seat_no.setter
+    def seat_no(self, value):
+        self._seat_loader = None
+        self._seat_no = value
+
+    def __repr__(self):
+        repr_str = super().__repr__()
+
+        repr_str += f" => {self.car_no}호"
+
+        if self.seat_no_count != 1:
+            repr_str += f" {self.seat_no}~{self.seat_no_end}"
+        else:
+            repr_str += f" {self.seat_no}"
+
+        repr_str += f", {self.price}원"
+
+        return repr_str
+
+    def get_ticket_no(self):
+        return "-".join(map(str, (self.sale_info1, self.sale_info2, self.sale_info3, self.sale_info4)))
+
+class Passenger:
+    def __init__(self, typecode, count=1, discount_type="000", card="", card_no="", card_pw=""):
+        self.typecode = typecode
+        self.count = count
+        self.discount_type = discount_type
+        self.card = card
+        self.card_no = card_no
+        self.card_pw = card_pw
+
+    @staticmethod
+    def reduce(passenger_list):
+        """Reduce passenger's list."""
+        if list(filter(lambda x: not isinstance(x, Passenger), passenger_list)):
+            raise TypeError("Passengers must be based on Passenger")
+
+        # 같은 종류의 승객은 순서와 상관없이 하나로 합친다.
+        merged = {}
+        for passenger in passenger_list:
+            key = (passenger.__class__, passenger.group_key())
+            merged[key] = merged[key] + passenger if key in merged else passenger
+        return [x for x in merged.values() if x.count > 0]
+
+    def __add__(self, other):
+        assert isinstance(other, self.__class__)
+        if self.group_key() == other.group_key():
+            # 하위 클래스는 typecode 를 받지 않으므로 복사해서 인원수만 바꾼다.
+            merged = copy.copy(self)
+            merged.count = self.count + other.count
+            return merged
+        else:
+            raise TypeError(
+                "other's group_key(%s) is not equal to self's group_key(%s)."
+                % (other.group_key(), self.group_key())
+            )
+
+    def group_key(self):
+        return f"{self.typecode}_{self.discount_type}_{self.card}_{self.card_no}_{self.card_pw}"
+
+    def get_dict(self, index):
+        assert isinstance(index, int)
+        index = str(index)
+        return {
+            "txtPsgTpCd" + index: self.typecode,
+            "txtDiscKndCd" + index: self.discount_type,
+            "txtCompaCnt" + index: self.count,
+            "txtCardCode_" + index: self.card,
+            "txtCardNo_" + index: self.card_no,
+            "txtCardPw_" + index: self.card_pw,
+        }
+
+class AdultPassenger(Passenger):
+    def __init__(self, count=1, discount_type="000", card="", card_no="", card_pw=""):
+        super().__init__("1", count, discount_type, card, card_no, card_pw)
+
+class ChildPassenger(Passenger):
+    def __init__(self, count=1, discount_type="000", card="", card_no="", card_pw=""):
+        super().__init__("3", count, discount_type, card, card_no, card_pw)
+
+class SeniorPassenger(Passenger):
+    def __init__(self, count=1, discount_type="131", card="", card_no="", card_pw=""):
+        super().__init__("1", count, discount_type, card, card_no, card_pw)
+
+class PassengerSet:
+    """An immutable, merged group of passengers.
+
+    Counts and the reservation form fields are computed once, and equal sets
+    hash alike, so a set can key cached request encodings.
+    """
+
+    __slots__ = ("_passengers", "_key", "_form", "adult_count", "child_count",
+                 "senior_count", "total")
+
+    def __init__(self, passengers=None):
+        if passengers is None:
+            passengers = [AdultPassenger()]
+        merged = tuple(Passenger.reduce(list(passengers)))
+        self._passengers = merged
+        self._key = tuple(sorted(
+            (x.__class__.__name__, x.group_key(), x.count) for x in merged
+        ))
+        self._form = None
+        self.adult_count = sum(x.count for x in merged if isinstance(x, AdultPassenger))
+        self.child_count = sum(x.count for x in merged if isinstance(x, ChildPassenger))
+        self.senior_count = sum(x.count for x in merged if isinstance(x, SeniorPassenger))
+        self.total = sum(x.count for x in merged)
+
+    @classmethod
+    def of(cls, passengers):
+        """`passengers` as a PassengerSet; a PassengerSet is returned as is."""
+        if isinstance(passengers, cls):
+            return passengers
+        return cls(passengers)
+
+    def form(self):
+        """The txtPsgTpCd1.. fields of the reservation form."""
+        if self._form is None:
+            form = {}
+            for index, passenger in enumerate(self._passengers, 1):
+                form.update(passenger.get_dict(index))
+            self._form = MappingProxyType(form)
+        return self._form
+
+    def __iter__(self):
+        return iter(self._passengers)
+
+    def __len__(self):
+        return len(self._passengers)
+
+    def __eq__(self, other):
+        return isinstance(other, PassengerSet) and self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return (f"<PassengerSet 어른 {self.adult_count}, 어린이 {self.child_count}, "
+                f"경로 {self.senior_count}>")
+
+class Reservation(Train):
+    _reservation_fields = (
+        ("dep_date", "h_run_dt"),
+        ("arr_date", "h_run_dt"),
+
+        ("rsv_id", "h_pnr_no"),
+        ("buy_limit_date", "h_ntisu_lmt_dt"),
+        ("buy_limit_time", "h_ntisu_lmt_tm"),
+    )
+    __slots__ = (
+        "rsv_id", "seat_no_count", "buy_limit_date", "buy_limit_time",
+        "price", "journey_no", "journey_cnt", "rsv_chg_no",
+    )
+    _fields = Train._fields + _reservation_fields
+    _load = _field_loader(_fields)
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.seat_no_count = int(data.get("h_tot_seat_cnt"))
+        self.price = int(data.get("h_rsv_amt"))
+        self.journey_no = data.get("txtJrnySqno", "001")
+        self.journey_cnt = data.get("txtJrnyCnt", "01")
+        self.rsv_chg_no = data.get("hidRsvChgNo", "00000")
+
+    @classmethod
+    def from_train(cls, train, data):
+        """Build a reservation of `train` from reservation fields in `data`."""
+        info = {key: getattr(train, attr) for attr, key in Train._fields}
+        info.update(data)
+        return cls(info)
+
+    def __repr__(self):
+        repr_str = super().__repr__()
+
+        repr_str += f", {self.price}원({self.seat_no_count}석)"
+
+        buy_limit_time = f"{self.buy_limit_time[:2]}:{self.buy_limit_time[2:4]}"
+        buy_limit_date = f"{int(self.buy_limit_date[4:6])}월 {int(self.buy_limit_date[6:])}일"
+
+        repr_str += f", 구입기한 {buy_limit_date} {buy_limit_time}"
+
+        return repr_str
+
+class BatchResult:
+    """The outcome of one item of a batch call: `value` on success,
+    otherwise the `KorailError` in `error`."""
+
+    __slots__ = ("item", "value", "error")
+
+    def __init__(self, item, value=None, error=None):
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return f"BatchResult(ok, {self.value!r})"
+        return f"BatchResult(failed, {self.error!r})"
+
+class KorailSession:
+
+    def __init__(
+        self,
+        korail_id,
+        korail_pw,
+        auto_login=True,
+        session_store=None,
+        auto_relogin=True,
+        base_url=None,
+        metrics=None,
+        json_loads=None,
+        policy=None,
+        transport=None,
+    ):
+        # requests 는 RequestsTransport 를 만들 때 불러온다. import 만 하는 짧은 작업이 빨라진다.
+        self.transport = transport if transport is not None else RequestsTransport()
+        self._urls = korail_urls(base_url) if base_url else KORAIL_URLS
+        self.korail_id = korail_id
+        self.korail_pw = korail_pw
+        self._device = "AD"
+        self._version = "190617001"
+        self._key = "korail1234567890"
+        self.membership_number = None
+        self.name = None
+        self.email = None
+        self.is_login = False
+        self.session_store = session_store
+        self.auto_relogin = auto_relogin
+        self.metrics = metrics
+        self._json_loads = json_loads or default_json_loads
+        self.policy = policy if policy is not None else RequestPolicy()
+        self._login_lock = threading.Lock()
+        self._refresher = None
+
+        state = session_store.load(korail_id) if session_store is not None else None
+        if state is not None:
+            self._restore_state(state)
+        elif auto_login:
+            self.login(korail_id, korail_pw)
+
+    def _session_state(self):
+        return {
+            "key": self._key,
+            "membership_number": self.membership_number,
+            "name": self.name,
+            "email": self.email,
+            "cookies": self.transport.cookies(),
+        }
+
+    def _restore_state(self, state):
+        self._key = state["key"]
+        self.membership_number = state.get("membership_number")
+        self.name = state.get("name")
+        self.email = state.get("email")
+        for cookie in state.get("cookies", ()):
+            self.transport.set_cookie(
+                cookie["name"], cookie["value"], cookie["domain"], cookie["path"]
+            )
+        self.is_login = True
+
+    def _send(self, method, url, params=None, data=None):
+        endpoint = endpoint_name(url)
+        return self.policy.call(
+            endpoint, lambda timeout: self._send_once(method, url, params, data, endpoint, timeout)
+        )
+
+    @property
+    def _session(self):
+        # 예전처럼 login() 이 requests.Session 을 돌려주도록 남겨 둔다.
+        return getattr(self.transport, "session", self.transport)
+
+    def _fetch(self, method, url, params, data, timeout, stream=False):
+        r = self.transport.request(method, url, params, data, timeout, stream)
+        if r.status_code >= 500:
+            r.close()
+            raise NetworkError(f"HTTP {r.status_code}", r.status_code)
+        if r.status_code == 429:
+            r.close()
+            raise ServerBusyError(r.status_code)
+        return r
+
+    def _send_once(self, method, url, params, data, endpoint, timeout):
+        metrics = self.metrics
+        if metrics is None:
+            return self._json_loads(self._fetch(method, url, params, data, timeout).content)
+
+        with metrics.span(endpoint):
+            started = time.perf_counter()
+            try:
+                r = self._fetch(method, url, params, data, timeout)
+                j = self._json_loads(r.content)
+            except Exception as error:
+                metrics.record_error(endpoint, method, started, error)
+                raise
+            metrics.record_response(endpoint, method, started, r.content, r.status_code, j)
+        return j
+
+    def _stream(self, method, url, params=None, data=None, chunk_size=16384, fields=None):
+        """Yield the raw response body in chunks as it arrives.
+
+        `fields` is the dict the decoder fills with `RESULT_FIELDS` while
+        reading the chunks (see `iter_json_array`); it labels the metrics
+        event like `_send` does. The outcome goes to `policy.report` like a
+        `_send` attempt; a reader that stops early still counts as a success.
+        """
+        endpoint = endpoint_name(url)
+        if fields is None:
+            fields = {}
+        self.policy.admit(endpoint)
+        transient = True
+        try:
+            r = self._fetch(
+                method, url, params, data, self.policy.timeout_for(endpoint), stream=True
+            )
+            try:
+                yield from self._stream_body(method, endpoint, r, chunk_size, fields)
+            finally:
+                r.close()
+            transient = self.policy.is_transient(fields)
+        except GeneratorExit:
+            transient = False
+            raise
+        except KorailError as error:
+            transient = error.retryable
+            raise
+        finally:
+            self.policy.report(transient)
+
+    def _stream_body(self, method, endpoint, r, chunk_size, fields):
+        metrics = self.metrics
+        if metrics is None:
+            yield from r.iter_content(chunk_size)
+            return
+
+        with metrics.span(endpoint):
+            started = time.perf_counter()
+            size = 0
+            try:
+                for chunk in r.iter_content(chunk_size):
+                    size += len(chunk)
+                    yield chunk
+            except GeneratorExit:
+                raise
+            except Exception as error:
+                metrics.record_error(endpoint, method, started, error)
+                raise
+            metrics.record(RequestEvent(
+                endpoint, method, time.perf_counter() - started, size, r.status_code,
+                fields.get("strResult"), fields.get("h_msg_cd"),
+            ))
+
+    def _needs_relogin(self, sent_key, j):
+        return (
+            self.auto_relogin
+            and sent_key is not None
+            and j.get("h_msg_cd") in NeedToLoginError.codes
+            and self._relogin(sent_key)
+        )
+
+    def _request(self, method, url, params=None, data=None):
+        form = params if params is not None else data
+        sent_key = form.get("Key") if isinstance(form, dict) else None
+        j = self._send(method, url, params, data)
+
+        # Key 가 만료되면(P058) 다시 로그인하고 한 번만 재시도한다.
+        if self._needs_relogin(sent_key, j):
+            form["Key"] = self._key
+            j = self._send(method, url, params, data)
+        return j
+
+    def _relogin(self, expired_key):
+        with self._login_lock:
+            # 다른 스레드가 이미 새 Key 를 받아 왔다면 그대로 쓴다.
+            if self._key != expired_key and self.is_login:
+                return True
+            return self.login()[0]
+
+    def _login_params(self, korail_id=None, korail_pw=None):
+        if korail_id is None:
+            korail_id = self.korail_id
+        else:
+            self.korail_id = korail_id
+
+        if korail_pw is None:
+            korail_pw = self.korail_pw
+        else:
+            self.korail_pw = korail_pw
+
+        if EMAIL_REGEX.match(korail_id):
+            txt_input_flg = InputFlag.EMAIL.value
+        elif PHONE_NUMBER_REGEX.match(korail_id):
+            txt_input_flg = InputFlag.PHONE_NUMBER.value
+        else:
+            txt_input_flg = InputFlag.MEMBERSHIP_NUMBER.value
+
+        url = self._urls["login"]
+        data = {
+            "Device": self._device,
+            "Version": "150718001",
+            "txtInputFlg": txt_input_flg,
+            "txtMemberNo": korail_id,
+            "txtPwd": korail_pw,
+        }
+        return url, data
+
+    def _apply_login(self, j):
+        if j["strResult"] == "SUCC" and j.get("strMbCrdNo") is not None:
+            self._key = j["Key"]
+            self.membership_number = j["strMbCrdNo"]
+            self.name = j["strCustNm"]
+            self.email = j["strEmailAdr"]
+            self.is_login = True
+        else:
+            self.is_login = False
+        return self.is_login
+
+    def login(self, korail_id=None, korail_pw=None):
+        url, data = self._login_params(korail_id, korail_pw)
+        j = self._send("POST", url, data=data)
+
+        if self._apply_login(j):
+            if self.session_store is not None:
+                self.session_store.save(self.korail_id, self._session_state())
+            return True, self._session
+        else:
+            return False, None
+
+    def logout(self):
+        try:
+            self._send("GET", self._urls["logout"])
+        except ValueError:
+            # 로그아웃 응답이 JSON 이 아니어도 로그아웃은 끝난 것으로 본다.
+            pass
+        self.is_login = False
+        if self.session_store is not None:
+            self.session_store.delete(self.korail_id)
+
+    def start_key_refresher(self, interval=600):
+        """Log in again every `interval` seconds on a daemon thread so an
+        expired Key never has to be renewed on a reservation call."""
+        self.stop_key_refresher()
+        stop = threading.Event()
+
+        def refresh():
+            while not stop.wait(interval):
+                try:
+                    with self._login_lock:
+                        self.login()
+                except Exception:
+                    # 실패해도 요청 시점의 P058 재로그인이 남아 있다.
+                    pass
+
+        thread = threading.Thread(target=refresh, daemon=True)
+        self._refresher = (thread, stop)
+        thread.start()
+        return thread
+
+    def stop_key_refresher(self):
+        if self._refresher is not None:
+            thread, stop = self._refresher
+            stop.set()
+            self._refresher = None
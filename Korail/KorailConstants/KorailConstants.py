@@ -1,41 +1,66 @@
-import re
-from enum import Enum
-from typing import Dict, Pattern
-
-class InputFlag(Enum):
-    MEMBERSHIP_NUMBER = "2"
-    PHONE_NUMBER = "4"
-    EMAIL = "5"
-
-class SeatAttribute(Enum):
-    DEFAULT = "000"
-    RESERVED = "015"
-
-SCHEME = "https"
-KORAIL_HOST = "smart.letskorail.com"
-KORAIL_PORT = "443"
-
-KORAIL_DOMAIN = f"{SCHEME}://{KORAIL_HOST}:{KORAIL_PORT}"
-KORAIL_MOBILE = f"{KORAIL_DOMAIN}/classes/com.korail.mobile"
-
-EMAIL_REGEX: Pattern[str] = re.compile(r"[^@]+@[^@]+\.[^@]+")
-PHONE_NUMBER_REGEX: Pattern[str] = re.compile(r"(\d{3})-(\d{3,4})-(\d{4})")
-
-KORAIL_URLS: Dict[str, str] = {
-    "login": f"{KORAIL_MOBILE}.login.Login",
-    "logout": f"{KORAIL_MOBILE}.common.logout",
-    "search_schedule": f"{KORAIL_MOBILE}.seatMovie.ScheduleView",
-    "ticket_reservation": f"{KORAIL_MOBILE}.certification.TicketReservation",
-    "refund": f"{KORAIL_MOBILE}.refunds.RefundsRequest",
-    "my_ticket_list": f"{KORAIL_MOBILE}.myTicket.MyTicketList",
-    "my_ticket_seat": f"{KORAIL_MOBILE}.refunds.SelTicketInfo",
-    "my_reservation_list": f"{KORAIL_MOBILE}.reservation.ReservationView",
-    "cancel": f"{KORAIL_MOBILE}.reservationCancel.ReservationCancelChk",
-    "station_db": f"{KORAIL_MOBILE}.common.stationinfo?device=ip",
-    "station_db_data": f"{KORAIL_MOBILE}.common.stationdata",
-    "event": f"{KORAIL_MOBILE}.common.event",
-    "payment": f"{KORAIL_DOMAIN}/ebizmw/PrdPkgMainList.do",
-    "payment_voucher": f"{KORAIL_DOMAIN}/ebizmw/PrdPkgBoucherView.do",
-}
-
-DEFAULT_USER_AGENT: str = "Dalvik/2.1.0 (Linux; U; Android 5.1.1; Nexus 4 Build/LMY48T)"
+import re
+from enum import Enum, IntEnum
+from typing import Dict, Pattern
+
+class InputFlag(Enum):
+    MEMBERSHIP_NUMBER = "2"
+    PHONE_NUMBER = "4"
+    EMAIL = "5"
+
+class SeatAttribute(Enum):
+    DEFAULT = "000"
+    RESERVED = "015"
+
+class SeatState(IntEnum):
+    UNKNOWN = 0
+    NONE = 1  # "-"
+    AVAILABLE = 2  # "예약가능"
+    SOLD_OUT = 3  # "매진"
+    FEW = 4  # "좌석부족"
+    STANDING = 5  # "입석+좌석"
+
+    @classmethod
+    def from_text(cls, text):
+        return SEAT_STATE_TEXT.get(text, cls.UNKNOWN)
+
+SEAT_STATE_TEXT: Dict[str, SeatState] = {
+    "-": SeatState.NONE,
+    "예약가능": SeatState.AVAILABLE,
+    "매진": SeatState.SOLD_OUT,
+    "좌석부족": SeatState.FEW,
+    "입석+좌석": SeatState.STANDING,
+}
+
+SCHEME = "https"
+KORAIL_HOST = "smart.letskorail.com"
+KORAIL_PORT = "443"
+
+KORAIL_DOMAIN = f"{SCHEME}://{KORAIL_HOST}:{KORAIL_PORT}"
+KORAIL_MOBILE = f"{KORAIL_DOMAIN}/classes/com.korail.mobile"
+
+EMAIL_REGEX: Pattern[str] = re.compile(r"[^@]+@[^@]+\.[^@]+")
+PHONE_NUMBER_REGEX: Pattern[str] = re.compile(r"(\d{3})-(\d{3,4})-(\d{4})")
+
+def korail_urls(domain: str = KORAIL_DOMAIN) -> Dict[str, str]:
+    """Endpoint URLs for a Korail host, e.g. a local stand-in server."""
+    mobile = f"{domain}/classes/com.korail.mobile"
+    return {
+        "login": f"{mobile}.login.Login",
+        "logout": f"{mobile}.common.logout",
+        "search_schedule": f"{mobile}.seatMovie.ScheduleView",
+        "ticket_reservation": f"{mobile}.certification.TicketReservation",
+        "refund": f"{mobile}.refunds.RefundsRequest",
+        "my_ticket_list": f"{mobile}.myTicket.MyTicketList",
+        "my_ticket_seat": f"{mobile}.refunds.SelTicketInfo",
+        "my_reservation_list": f"{mobile}.reservation.ReservationView",
+        "cancel": f"{mobile}.reservationCancel.ReservationCancelChk",
+        "station_db": f"{mobile}.common.stationinfo?device=ip",
+        "station_db_data": f"{mobile}.common.stationdata",
+        "event": f"{mobile}.common.event",
+        "payment": f"{domain}/ebizmw/PrdPkgMainList.do",
+        "payment_voucher": f"{domain}/ebizmw/PrdPkgBoucherView.do",
+    }
+
+KORAIL_URLS: Dict[str, str] = korail_urls()
+
+DEFAULT_USER_AGENT: str = "Dalvik/2.1.0 (Linux; U; Android 5.1.1; Nexus 4 Build/LMY48T)"
@@ -0,0 +1,103 @@
+import codecs
+import json
+import re
+
+
+def _default_json_loads():
+    try:
+        import orjson
+        return orjson.loads
+    except ImportError:
+        # json.loads 도 bytes 를 그대로 받는다(UTF-8/16/32 자동 판별).
+        return json.loads
+
+
+json_loads = _default_json_loads()
+
+_WHITESPACE = re.compile(r"[\s,]*")
+
+# 스트리밍 중에도 메트릭과 서킷 브레이커가 볼 수 있게 따로 잡아 두는 응답 필드
+RESULT_FIELDS = ("strResult", "h_msg_cd")
+
+
+def _field_scanner(fields):
+    patterns = {
+        name: re.compile(r'"%s"\s*:\s*"([^"\\]*)"' % re.escape(name)) for name in fields
+    }
+
+    def scan(text):
+        for name, pattern in patterns.items():
+            match = pattern.search(text)
+            if match:
+                fields[name] = match.group(1)
+    return scan
+
+
+def iter_json_array(chunks, key, loads=json_loads, fields=None):
+    """Yield the elements of the array stored under `key` while `chunks`
+    (an iterable of bytes) is still arriving.
+
+    Only the element being parsed is kept in memory. If the document has no
+    such array (e.g. an error response) nothing is yielded and the whole
+    document is decoded with `loads` and returned as the generator's value.
+
+    `fields` is an optional dict whose keys name string fields outside the
+    array (e.g. `RESULT_FIELDS`); their values are filled in as soon as the
+    text carrying them has been read, before `chunks` is exhausted.
+    """
+    scan = _field_scanner(fields) if fields is not None else None
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    marker = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    chunks = iter(chunks)
+    head = []
+    buf = ""
+    found = None
+
+    for chunk in chunks:
+        head.append(chunk)
+        buf += utf8.decode(chunk)
+        if scan is not None:
+            scan(buf)
+        found = marker.search(buf)
+        if found:
+            break
+    else:
+        return loads(b"".join(head))
+
+    head = None
+    pos = found.end()
+    done = False
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos < len(buf):
+            if buf[pos] == "]":
+                break
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if done:
+                    raise
+            else:
+                yield item
+                buf, pos = buf[end:], 0
+                continue
+        elif done:
+            raise json.JSONDecodeError(f"Unterminated '{key}' array", buf, pos)
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            buf += utf8.decode(b"", final=True)
+            done = True
+        else:
+            buf += utf8.decode(chunk)
+            if scan is not None:
+                scan(buf)
+
+    # 배열 뒤의 나머지는 읽어서 버린다. 필드가 청크 경계에 걸쳐도 찾도록 앞 조각 끝을 붙인다.
+    rest = buf[pos:]
+    for chunk in chunks:
+        if scan is not None:
+            rest = rest[-128:] + utf8.decode(chunk)
+            scan(rest)
+    return None
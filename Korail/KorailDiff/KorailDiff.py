@@ -0,0 +1,147 @@
+import threading
+
+from ..KorailClass.KorailClass import parse_price
+from ..KorailConstants.KorailConstants import SeatState
+from ..KorailEvents.KorailEvents import EventFeed
+
+_AVAILABLE = (SeatState.AVAILABLE, SeatState.FEW, SeatState.STANDING)
+
+
+class TrainChange:
+    """One difference between two snapshots of the same query.
+
+    `kind` is APPEARED / DISAPPEARED (only `train` or `old` is set), SEAT
+    (`field` is "general" or "special", `before`/`after` are `SeatState`s)
+    or FARE (`before`/`after` are prices in won, or None).
+    """
+
+    APPEARED = "appeared"
+    DISAPPEARED = "disappeared"
+    SEAT = "seat"
+    FARE = "fare"
+
+    __slots__ = ("query", "kind", "train", "old", "field", "before", "after")
+
+    def __init__(self, query, kind, train=None, old=None, field=None, before=None, after=None):
+        self.query = query
+        self.kind = kind
+        self.train = train
+        self.old = old
+        self.field = field
+        self.before = before
+        self.after = after
+
+    def key(self):
+        return (self.train or self.old).key()
+
+    @property
+    def opened(self):
+        """A sold-out class of a known train has seats again."""
+        return self.kind == self.SEAT and self.after in _AVAILABLE and self.before not in _AVAILABLE
+
+    @property
+    def sold_out(self):
+        return self.kind == self.SEAT and self.before in _AVAILABLE and self.after not in _AVAILABLE
+
+    def __repr__(self):
+        train = self.train or self.old
+        if self.kind in (self.SEAT, self.FARE):
+            return f"TrainChange({self.kind} {self.field}: {self.before!r} -> {self.after!r}, {train!r})"
+        return f"TrainChange({self.kind}, {train!r})"
+
+
+def _seat_states(train):
+    return (
+        SeatState.from_text(train.general_seat_state),
+        SeatState.from_text(train.special_seat_state),
+    )
+
+
+def _fares(train):
+    return (
+        parse_price(train.reserve_possible_price),
+        parse_price(train.special_possible_price),
+    )
+
+
+def diff_trains(old, new, query=None):
+    """List the `TrainChange`s from snapshot `old` to `new`, matching trains
+    by `Train.key()` in one pass over each."""
+    before = {x.key(): x for x in old}
+    changes = []
+    for train in new:
+        previous = before.pop(train.key(), None)
+        if previous is None:
+            changes.append(TrainChange(query, TrainChange.APPEARED, train))
+            continue
+        for field, was, now in zip(("general", "special"), _seat_states(previous), _seat_states(train)):
+            if was != now:
+                changes.append(TrainChange(query, TrainChange.SEAT, train, previous, field, was, now))
+        for field, was, now in zip(("general", "special"), _fares(previous), _fares(train)):
+            if was != now:
+                changes.append(TrainChange(query, TrainChange.FARE, train, previous, field, was, now))
+    for previous in before.values():
+        changes.append(TrainChange(query, TrainChange.DISAPPEARED, old=previous))
+    return changes
+
+
+class SnapshotDiffer:
+    """Keep the last snapshot per query and publish only what changed.
+
+    `update(query, trains)` diffs `trains` against the previous snapshot
+    for the hashable `query` (e.g. ``(dep, arr, date, time)``) and hands
+    every `TrainChange` to `feed` (an `EventFeed`): the `on_change`
+    callbacks and `events()` / `async for`. The first snapshot of a query
+    only sets the baseline unless `emit_initial=True`. A train missing from
+    a result that covers a different time range is reported as DISAPPEARED,
+    so compare results of the same query.
+    """
+
+    def __init__(self, emit_initial=False, event_queue_size=1024):
+        self.emit_initial = emit_initial
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self.feed = EventFeed(event_queue_size)
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def on_change(self, callback):
+        return self.feed.subscribe(callback)
+
+    def update(self, query, trains):
+        """Store `trains` as the latest snapshot of `query`; returns the changes."""
+        trains = list(trains)
+        with self._lock:
+            old = self._snapshots.get(query)
+            self._snapshots[query] = trains
+        if old is None and not self.emit_initial:
+            return []
+        changes = diff_trains(old or (), trains, query)
+        for change in changes:
+            self._emit(change)
+        return changes
+
+    def snapshot(self, query):
+        return self._snapshots.get(query)
+
+    def forget(self, query):
+        with self._lock:
+            self._snapshots.pop(query, None)
+
+    def close(self):
+        """Stop `async for` consumers after the queued changes are read."""
+        self.feed.close()
+
+    def _emit(self, change):
+        self.feed.publish(change)
+
+    def events(self, timeout=None):
+        """Yield `TrainChange`s until `timeout` seconds pass without one."""
+        return self.feed.events(timeout)
+
+    def __iter__(self):
+        return self.feed.events()
+
+    def __aiter__(self):
+        return self.feed.__aiter__()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class EventFeed:
+    """Fan events out to callbacks and to a bounded queue.
+
+    `publish` hands every event to the `subscribe`d callbacks, then queues
+    it for `events()` / `async for`. A callback that raises is logged and
+    does not keep the event from the others or from the queue. A full
+    queue drops the event for the readers only: `dropped` counts those and
+    each one is logged. `async
+    for` wakes up when an event is published instead of polling, and ends
+    once `close()` was called and the queue is drained.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.dropped = 0
+        self._callbacks = []
+        self._queue = queue.Queue(maxsize)
+        self._closed = threading.Event()
+        self._waiters = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+        return callback
+
+    def publish(self, event):
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("이벤트 콜백 %r 이 실패하였습니다: %r", callback, event)
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            logger.warning("이벤트 큐가 가득 차서 이벤트를 버렸습니다 (누적 %d건): %r", dropped, event)
+            return
+        self._wake()
+
+    def open(self):
+        self._closed.clear()
+
+    def close(self):
+        """End `async for` readers once the queued events are read."""
+        self._closed.set()
+        self._wake()
+
+    @property
+    def closed(self):
+        return self._closed.is_set()
+
+    def _wake(self):
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # 이미 닫힌 이벤트 루프
+                pass
+
+    def events(self, timeout=None):
+        """Yield events until `timeout` seconds pass without one."""
+        while True:
+            try:
+                yield self._queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+
+    def __iter__(self):
+        return self.events()
+
+    async def __aiter__(self):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.append(waiter)
+        try:
+            while True:
+                try:
+                    yield self._queue.get_nowait()
+                    continue
+                except queue.Empty:
+                    pass
+                if self._closed.is_set():
+                    return
+                waiter[1].clear()
+                # clear() 와 대기 사이에 들어온 이벤트를 놓치지 않도록 다시 본다.
+                if self._queue.empty() and not self._closed.is_set():
+                    await waiter[1].wait()
+        finally:
+            with self._lock:
+                self._waiters.remove(waiter)
@@ -1,36 +1,91 @@
-from abc import ABCMeta
-
-class KorailError(Exception, metaclass=ABCMeta):
-    codes = set()
-
-    def __init__(self, msg, code):
-        self.msg = msg
-        self.code = code
-
-    def __str__(self):
-        return f"{self.msg} ({self.code})"
-
-    @classmethod
-    def __contains__(cls, item):
-        return item in cls.codes
-
-
-class NeedToLoginError(KorailError):
-    codes = {"P058"}
-
-    def __init__(self, code=None):
-        super().__init__("Need to Login", code)
-
-
-class NoResultsError(KorailError):
-    codes = {"P100", "WRG000000", "WRD000061", "WRT300005"}
-
-    def __init__(self, code=None):
-        super().__init__("No Results", code)
-
-
-class SoldOutError(KorailError):
-    codes = {"ERR211161"}
-
-    def __init__(self, code=None):
-        super().__init__("Sold out", code)
+from abc import ABCMeta
+
+class KorailError(Exception, metaclass=ABCMeta):
+    codes = set()
+    # 잠시 후 다시 보내면 성공할 수 있는 오류인지. RequestPolicy 가 재시도 여부를 정한다.
+    retryable = False
+
+    def __init__(self, msg, code):
+        self.msg = msg
+        self.code = code
+
+    def __str__(self):
+        return f"{self.msg} ({self.code})"
+
+    @classmethod
+    def __contains__(cls, item):
+        return item in cls.codes
+
+
+class NeedToLoginError(KorailError):
+    codes = {"P058"}
+
+    def __init__(self, code=None):
+        super().__init__("Need to Login", code)
+
+
+class NoResultsError(KorailError):
+    codes = {"P100", "WRG000000", "WRD000061", "WRT300005"}
+
+    def __init__(self, code=None):
+        super().__init__("No Results", code)
+
+
+class SoldOutError(KorailError):
+    codes = {"ERR211161"}
+
+    def __init__(self, code=None):
+        super().__init__("Sold out", code)
+
+
+class InvalidStationError(KorailError):
+    codes = set()
+
+    def __init__(self, name=None, suggestions=()):
+        msg = f"Unknown station '{name}'"
+        if suggestions:
+            msg += f", did you mean {', '.join(suggestions)}?"
+        super().__init__(msg, None)
+        self.name = name
+        self.suggestions = list(suggestions)
+
+
+class NetworkError(KorailError):
+    """The request did not get a usable answer: connection failure, timeout
+    or an HTTP 5xx from the server."""
+
+    codes = set()
+    retryable = True
+
+    def __init__(self, msg=None, code=None):
+        super().__init__(msg or "Network error", code)
+
+
+class ServerBusyError(KorailError):
+    """Korail asked to try again later: HTTP 429, or a FAIL response whose
+    h_msg_cd is one of the session's `RequestPolicy(transient_codes=...)`.
+
+    `ServerBusyError.codes` is the default for policies that do not pass
+    `transient_codes`, and it is empty on purpose: Korail documents no
+    such h_msg_cd, and retrying a code that is not transient would only
+    repeat a failing request. Out of the box network errors, HTTP 5xx and
+    HTTP 429 are retried and trip the circuit breaker; codes observed to
+    be transient are added per policy.
+    """
+
+    codes = set()
+    retryable = True
+
+    def __init__(self, code=None):
+        super().__init__("Server busy", code)
+
+
+class CircuitOpenError(KorailError):
+    """Raised without sending anything while the circuit breaker is open."""
+
+    codes = set()
+
+    def __init__(self, endpoint=None, retry_after=0.0):
+        super().__init__(f"Circuit open, retry after {retry_after:.1f}s", endpoint)
+        self.endpoint = endpoint
+        self.retry_after = retry_after
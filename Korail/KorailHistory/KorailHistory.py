@@ -0,0 +1,213 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from ..KorailClass.KorailClass import parse_price
+from ..KorailConstants.KorailConstants import SeatState
+from ..KorailStore.KorailStore import DEFAULT_STORE_DIR, _make_store_dir
+
+_SCHEMA = (
+    "PRAGMA journal_mode = WAL",
+    "CREATE TABLE IF NOT EXISTS trains ("
+    " id INTEGER PRIMARY KEY,"
+    " train_number TEXT NOT NULL, dep_date TEXT NOT NULL, dep_time TEXT NOT NULL,"
+    " dep_code TEXT, arr_code TEXT, dep_name TEXT, arr_name TEXT, train_type TEXT,"
+    " UNIQUE (train_number, dep_date, dep_time, dep_code, arr_code))",
+    "CREATE INDEX IF NOT EXISTS trains_route ON trains (dep_name, arr_name, dep_date)",
+    "CREATE INDEX IF NOT EXISTS trains_number ON trains (train_number, dep_date)",
+    # 기차별로 모여 있도록 (train_id, ts) 로 정렬해 저장한다.
+    "CREATE TABLE IF NOT EXISTS snapshots ("
+    " train_id INTEGER NOT NULL, ts INTEGER NOT NULL,"
+    " general INTEGER NOT NULL, special INTEGER NOT NULL,"
+    " general_fare INTEGER, special_fare INTEGER,"
+    " PRIMARY KEY (train_id, ts)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS snapshots_ts ON snapshots (ts)",
+)
+
+_SELECT = (
+    "SELECT s.ts, t.train_number, t.dep_date, t.dep_time, t.dep_name, t.arr_name,"
+    " t.train_type, s.general, s.special, s.general_fare, s.special_fare"
+)
+
+
+class SeatRecord:
+    """One recorded seat state of one train."""
+
+    __slots__ = (
+        "ts", "train_number", "dep_date", "dep_time", "dep_name", "arr_name",
+        "train_type", "general", "special", "general_fare", "special_fare",
+    )
+
+    def __init__(self, ts, train_number, dep_date, dep_time, dep_name, arr_name,
+                 train_type, general, special, general_fare, special_fare):
+        self.ts = ts
+        self.train_number = train_number
+        self.dep_date = dep_date
+        self.dep_time = dep_time
+        self.dep_name = dep_name
+        self.arr_name = arr_name
+        self.train_type = train_type
+        self.general = SeatState(general)
+        self.special = SeatState(special)
+        self.general_fare = general_fare
+        self.special_fare = special_fare
+
+    def key(self):
+        return self.train_number, self.dep_date, self.dep_time
+
+    def __repr__(self):
+        return (f"<SeatRecord {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.ts))} "
+                f"{self.train_number} {self.dep_date} {self.dep_time} "
+                f"{self.general.name}/{self.special.name}>")
+
+
+class SeatHistory:
+    """Append-only log of seat availability in a SQLite file.
+
+    Pass it as `Korail(recorder=...)` and every search response is recorded
+    with its fetch time, seat states (`SeatState`) and fares. With
+    `changes_only=True` a snapshot is only written when a train's states or
+    fares differ from the last one recorded by this process.
+
+    Queries stream rows from a cursor in `batch_size` chunks, so they can
+    walk millions of rows without loading them.
+    """
+
+    def __init__(self, path=os.path.join(DEFAULT_STORE_DIR, "history.sqlite3"), changes_only=False):
+        self.path = path
+        self.changes_only = changes_only
+        _make_store_dir(path)
+        self._db = self._connect()
+        self._lock = threading.Lock()
+        self._train_ids = {}
+        self._last = {}
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _train_id(self, train):
+        key = (train.train_number, train.dep_date, train.dep_time, train.dep_code, train.arr_code)
+        train_id = self._train_ids.get(key)
+        if train_id is None:
+            self._db.execute(
+                "INSERT OR IGNORE INTO trains (train_number, dep_date, dep_time, dep_code,"
+                " arr_code, dep_name, arr_name, train_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (train.dep_station_name, train.arr_station_name, train.train_type),
+            )
+            train_id = self._db.execute(
+                "SELECT id FROM trains WHERE train_number = ? AND dep_date = ? AND dep_time = ?"
+                " AND dep_code IS ? AND arr_code IS ?", key,
+            ).fetchone()[0]
+            self._train_ids[key] = train_id
+        return train_id
+
+    def record(self, trains, fetched_at=None):
+        """Append one snapshot of `trains`; returns the number of rows written."""
+        if fetched_at is None:
+            fetched_at = getattr(trains, "fetched_at", None) or time.time()
+        ts = int(fetched_at)
+        rows = []
+        with self._lock, self._db:
+            for train in trains:
+                train_id = self._train_id(train)
+                state = (
+                    int(SeatState.from_text(train.general_seat_state)),
+                    int(SeatState.from_text(train.special_seat_state)),
+                    parse_price(train.reserve_possible_price),
+                    parse_price(train.special_possible_price),
+                )
+                if self.changes_only and self._last.get(train_id) == state:
+                    continue
+                self._last[train_id] = state
+                rows.append((train_id, ts) + state)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO snapshots (train_id, ts, general, special,"
+                " general_fare, special_fare) VALUES (?, ?, ?, ?, ?, ?)", rows,
+            )
+        return len(rows)
+
+    def _where(self, since, until, dep, arr, dep_date, train_number):
+        clauses, args = [], []
+        for clause, value in (
+            ("s.ts >= ?", since),
+            ("s.ts < ?", until),
+            ("t.dep_name = ?", dep),
+            ("t.arr_name = ?", arr),
+            ("t.dep_date = ?", dep_date),
+            ("t.train_number = ?", train_number),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                args.append(int(value) if clause.startswith("s.ts") else value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def _rows(self, sql, args, batch_size):
+        with closing(self._connect()) as db:
+            cursor = db.execute(sql, args)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield SeatRecord(*row)
+
+    def query(self, since=None, until=None, dep=None, arr=None, dep_date=None,
+              train_number=None, batch_size=1000):
+        """Yield `SeatRecord`s matching every given filter, in time order.
+
+        `since`/`until` are unix timestamps ([since, until)); `dep`/`arr` are
+        station names and `dep_date` is YYYYMMDD.
+        """
+        where, args = self._where(since, until, dep, arr, dep_date, train_number)
+        sql = f"{_SELECT} FROM snapshots s JOIN trains t ON t.id = s.train_id{where} ORDER BY s.ts"
+        return self._rows(sql, args, batch_size)
+
+    def train(self, train_number, dep_date, batch_size=1000):
+        """The recorded history of one train, oldest first."""
+        return self.query(train_number=train_number, dep_date=dep_date, batch_size=batch_size)
+
+    def openings(self, since=None, until=None, dep=None, arr=None, dep_date=None,
+                 train_number=None, batch_size=1000):
+        """Yield the snapshots where a sold-out train had seats again, i.e.
+        cancellations and sale openings, in time order."""
+        where, args = self._where(None, None, dep, arr, dep_date, train_number)
+        window = (
+            f"SELECT s.*, lag(s.general) OVER w AS prev_general, lag(s.special) OVER w AS prev_special"
+            f" FROM snapshots s JOIN trains t ON t.id = s.train_id{where}"
+            " WINDOW w AS (PARTITION BY s.train_id ORDER BY s.ts)"
+        )
+        available = tuple(int(x) for x in (SeatState.AVAILABLE, SeatState.FEW, SeatState.STANDING))
+        opened = ", ".join("?" * len(available))
+        clauses = [
+            f"((s.general IN ({opened}) AND s.prev_general NOT IN ({opened}))"
+            f" OR (s.special IN ({opened}) AND s.prev_special NOT IN ({opened})))"
+        ]
+        args += available * 4
+        for clause, value in (("s.ts >= ?", since), ("s.ts < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                args.append(int(value))
+        sql = (
+            f"{_SELECT} FROM ({window}) s JOIN trains t ON t.id = s.train_id"
+            f" WHERE {' AND '.join(clauses)} ORDER BY s.ts"
+        )
+        return self._rows(sql, args, batch_size)
+
+    def __len__(self):
+        with closing(self._connect()) as db:
+            return db.execute("SELECT count(*) FROM snapshots").fetchone()[0]
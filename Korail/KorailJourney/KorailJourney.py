@@ -0,0 +1,203 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from ..Korail import logger, _fill_date_time
+from ..KorailExceptions.KorailExceptions import KorailError
+from ..KorailClass.KorailClass import Itinerary, TrainType, train_datetime
+
+# 걸리는 시간을 모르는 구간(노선표로만 이어진 역)은 관측된 구간보다 뒤에 놓는다.
+_UNKNOWN_MINUTES = 24 * 60
+
+
+class RouteGraph:
+    """Station graph learned from observed schedules.
+
+    Every observed train adds an edge dep -> arr that keeps the shortest
+    running time seen (minutes) and how often the pair was seen. Pass the
+    graph as `Korail(recorder=...)`, or let a `JourneyPlanner` feed it, and
+    it grows from normal searches; `from_station_db` seeds it with the
+    stations each line connects.
+
+    Transfer candidates for a pair are the stations reachable from `dep`
+    that also reach `arr`, found through the out/in adjacency index and
+    cached per pair until the graph changes. A fresh graph knows no edge
+    and so offers no candidate until it is seeded or has observed trains
+    on both legs.
+    """
+
+    def __init__(self):
+        self._out = {}
+        self._in = {}
+        self._candidates = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_station_db(cls, station_db):
+        graph = cls()
+        for line in station_db.lines():
+            names = [x.name for x in station_db.by_line(line)]
+            for dep in names:
+                for arr in names:
+                    if dep != arr:
+                        graph.add_edge(dep, arr)
+        return graph
+
+    def add_edge(self, dep, arr, minutes=None):
+        with self._lock:
+            edge = self._out.setdefault(dep, {}).get(arr)
+            if edge is None:
+                edge = self._out[dep][arr] = [minutes, 0]
+                self._in.setdefault(arr, set()).add(dep)
+                self._candidates.clear()
+            elif minutes is not None and (edge[0] is None or minutes < edge[0]):
+                edge[0] = minutes
+                self._candidates.clear()
+            if minutes is not None:
+                edge[1] += 1
+
+    def observe(self, trains, fetched_at=None):
+        for train in trains:
+            dep = train_datetime(train.dep_date, train.dep_time)
+            arr = train_datetime(train.arr_date, train.arr_time)
+            self.add_edge(
+                train.dep_station_name, train.arr_station_name,
+                int((arr - dep).total_seconds() // 60),
+            )
+
+    # Korail(recorder=graph) 로 검색 결과를 그대로 받을 수 있게 한다.
+    record = observe
+
+    def minutes(self, dep, arr):
+        edge = self._out.get(dep, {}).get(arr)
+        return edge[0] if edge is not None else None
+
+    def stations(self):
+        return sorted(set(self._out) | set(self._in))
+
+    def transfer_candidates(self, dep, arr, limit=None):
+        """Stations to change trains at between `dep` and `arr`, the
+        shortest known two-leg running time first."""
+        with self._lock:
+            ranked = self._candidates.get((dep, arr))
+            if ranked is None:
+                scored = []
+                for via in self._out.get(dep, {}).keys() & self._in.get(arr, set()):
+                    if via in (dep, arr):
+                        continue
+                    first, seen_first = self._out[dep][via]
+                    second, seen_second = self._out[via][arr]
+                    total = (first if first is not None else _UNKNOWN_MINUTES) + \
+                            (second if second is not None else _UNKNOWN_MINUTES)
+                    scored.append((total, -(seen_first + seen_second), via))
+                ranked = [via for total, seen, via in sorted(scored)]
+                self._candidates[dep, arr] = ranked
+        return ranked[:limit] if limit is not None else list(ranked)
+
+
+def join_legs(first, second, min_connection=timedelta(minutes=10),
+              max_wait=timedelta(hours=3), connections=1):
+    """Pair trains of the first leg with trains of the second leg.
+
+    Both sides are sorted once (arrivals, departures) and walked with a
+    single forward pointer: for every first-leg train the next
+    `connections` second-leg trains leaving at least `min_connection` and
+    at most `max_wait` after it arrives are joined.
+    """
+    arrivals = sorted((train_datetime(x.arr_date, x.arr_time), i, x) for i, x in enumerate(first))
+    departures = sorted((train_datetime(x.dep_date, x.dep_time), i, x) for i, x in enumerate(second))
+    itineraries = []
+    j = 0
+    for arrived, _, a in arrivals:
+        ready = arrived + min_connection
+        while j < len(departures) and departures[j][0] < ready:
+            j += 1
+        for leaves, _, b in departures[j:j + connections]:
+            if leaves - arrived > max_wait:
+                break
+            itineraries.append(Itinerary((a, b)))
+    return itineraries
+
+
+class JourneyPlanner:
+    """Find direct trains and one-transfer connections between two stations.
+
+    The direct search and both legs through every candidate transfer
+    station run concurrently on `max_workers` threads, the legs are joined
+    with `join_legs` (`min_connection` / `max_wait` in minutes) and the
+    itineraries come back ranked by arrival, then travel time, then number
+    of transfers. Every search result is fed back into `graph`.
+
+    Without `graph` the planner seeds one from `korail.station_db` when the
+    client has one; otherwise it starts from an empty `RouteGraph` and
+    finds connections only through `via` until searches have taught it
+    some.
+    """
+
+    def __init__(self, korail, graph=None, min_connection=10, max_wait=180, max_workers=8):
+        self.korail = korail
+        if graph is None:
+            station_db = getattr(korail, "station_db", None)
+            graph = RouteGraph.from_station_db(station_db) if station_db is not None else RouteGraph()
+        self.graph = graph
+        self.min_connection = timedelta(minutes=min_connection)
+        self.max_wait = timedelta(minutes=max_wait)
+        self.max_workers = max_workers
+
+    def _leg(self, dep, arr, date, time, train_type, passengers):
+        try:
+            return self.korail.search_train_allday(dep, arr, date, time, train_type, passengers)
+        except KorailError as error:
+            logger.debug("구간 %s~%s 검색에 실패하였습니다. 원인: %s", dep, arr, error)
+            return []
+
+    def plan(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        via=None,
+        max_via=3,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=True,
+        connections=1,
+        direct=True,
+        limit=10,
+    ):
+        """Ranked `Itinerary`s from `dep` to `arr` leaving after `time`.
+
+        Transfer stations are `via` when given, otherwise the graph's best
+        `max_via` candidates (none on an unseeded graph, see `RouteGraph`). With `available_only` every leg must have
+        seats, so each itinerary can go straight to `Korail.reserve`;
+        `direct=False` skips the direct search and returns connections only.
+        """
+        date, time = _fill_date_time(date, time)
+        stations = list(via) if via is not None else self.graph.transfer_candidates(dep, arr, max_via)
+        pairs = [(dep, arr)] if direct else []
+        for station in stations:
+            pairs += [(dep, station), (station, arr)]
+
+        if not pairs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pairs))) as executor:
+            futures = {
+                pair: executor.submit(self._leg, *pair, date, time, train_type, passengers)
+                for pair in pairs
+            }
+            legs = {pair: future.result() for pair, future in futures.items()}
+
+        for trains in legs.values():
+            self.graph.observe(trains)
+        if available_only:
+            legs = {pair: [x for x in trains if x.seat_available()] for pair, trains in legs.items()}
+
+        itineraries = [Itinerary((x,)) for x in legs.get((dep, arr), ())]
+        for station in stations:
+            itineraries += join_legs(
+                legs[dep, station], legs[station, arr],
+                self.min_connection, self.max_wait, connections,
+            )
+        itineraries.sort(key=lambda x: (x.arrival, x.duration, x.transfers))
+        return itineraries[:limit]
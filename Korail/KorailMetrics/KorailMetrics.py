@@ -0,0 +1,153 @@
+import bisect
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def endpoint_name(url):
+    """'.../com.korail.mobile.seatMovie.ScheduleView' -> 'ScheduleView'"""
+    return url.split("?", 1)[0].rsplit(".", 1)[-1].rsplit("/", 1)[-1]
+
+
+class RequestEvent:
+    __slots__ = ("endpoint", "method", "latency", "bytes", "status", "result", "msg_cd", "error")
+
+    def __init__(self, endpoint, method, latency, bytes=0, status=None, result=None,
+                 msg_cd=None, error=None):
+        self.endpoint = endpoint
+        self.method = method
+        self.latency = latency
+        self.bytes = bytes
+        self.status = status
+        self.result = result
+        self.msg_cd = msg_cd
+        self.error = error
+
+    def __repr__(self):
+        return (f"RequestEvent({self.method} {self.endpoint}, {self.latency * 1000:.1f}ms, "
+                f"{self.bytes}B, {self.result}, {self.msg_cd or self.error})")
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """Per-endpoint counters and latency histograms for one or more clients.
+
+    Every HTTP call produces a `RequestEvent` passed to hooks registered
+    with `add_hook`. `add_span_hook` registers a factory called with the
+    endpoint name whose context manager wraps the call, e.g. to open a
+    tracing span. `to_prometheus()` renders the text exposition format.
+    Clients without `metrics` skip all of this.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, namespace="korail"):
+        self.buckets = buckets
+        self.namespace = namespace
+        self.hooks = []
+        self.span_hooks = []
+        self.requests = {}
+        self.errors = {}
+        self.bytes = {}
+        self.latency = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def add_span_hook(self, hook):
+        self.span_hooks.append(hook)
+        return hook
+
+    @contextmanager
+    def span(self, endpoint):
+        if not self.span_hooks:
+            yield
+            return
+        with ExitStack() as stack:
+            for hook in self.span_hooks:
+                stack.enter_context(hook(endpoint))
+            yield
+
+    def record(self, event):
+        with self._lock:
+            if event.error is not None:
+                key = (event.endpoint, type(event.error).__name__)
+                self.errors[key] = self.errors.get(key, 0) + 1
+            else:
+                key = (event.endpoint, event.result or "", event.msg_cd or "")
+                self.requests[key] = self.requests.get(key, 0) + 1
+                self.bytes[event.endpoint] = self.bytes.get(event.endpoint, 0) + event.bytes
+            histogram = self.latency.get(event.endpoint)
+            if histogram is None:
+                histogram = self.latency[event.endpoint] = Histogram(self.buckets)
+            histogram.observe(event.latency)
+        for hook in self.hooks:
+            hook(event)
+
+    def record_response(self, endpoint, method, started, content, status, j):
+        self.record(RequestEvent(
+            endpoint, method, time.perf_counter() - started, len(content), status,
+            j.get("strResult"), j.get("h_msg_cd"),
+        ))
+
+    def record_error(self, endpoint, method, started, error):
+        self.record(RequestEvent(endpoint, method, time.perf_counter() - started, error=error))
+
+    def to_prometheus(self):
+        ns = self.namespace
+        with self._lock:
+            lines = [
+                f"# HELP {ns}_requests_total Korail API responses by endpoint, strResult and h_msg_cd.",
+                f"# TYPE {ns}_requests_total counter",
+            ]
+            for (endpoint, result, code), value in sorted(self.requests.items()):
+                lines.append(
+                    f'{ns}_requests_total{{endpoint="{endpoint}",result="{result}",code="{code}"}} {value}'
+                )
+            lines += [
+                f"# HELP {ns}_request_errors_total Korail API calls that raised before a response.",
+                f"# TYPE {ns}_request_errors_total counter",
+            ]
+            for (endpoint, error), value in sorted(self.errors.items()):
+                lines.append(f'{ns}_request_errors_total{{endpoint="{endpoint}",error="{error}"}} {value}')
+            lines += [
+                f"# HELP {ns}_response_bytes_total Korail API response body bytes.",
+                f"# TYPE {ns}_response_bytes_total counter",
+            ]
+            for endpoint, value in sorted(self.bytes.items()):
+                lines.append(f'{ns}_response_bytes_total{{endpoint="{endpoint}"}} {value}')
+            lines += [
+                f"# HELP {ns}_request_duration_seconds Korail API call latency.",
+                f"# TYPE {ns}_request_duration_seconds histogram",
+            ]
+            for endpoint, histogram in sorted(self.latency.items()):
+                for bound, count in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f'{ns}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{le}"}} {count}'
+                    )
+                lines.append(f'{ns}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram.sum}')
+                lines.append(f'{ns}_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,438 @@
+import json
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+STATIONS = {
+    "서울": "0001",
+    "영등포": "0002",
+    "수원": "0003",
+    "대전": "0010",
+    "동대구": "0015",
+    "부산": "0020",
+    "광주송정": "0036",
+    "목포": "0041",
+    "용산": "0104",
+    "오송": "0297",
+}
+
+# 구입기한 등 서버가 주는 시각은 한국 시간이다.
+KST = timezone(timedelta(hours=9))
+
+LINES = {
+    "경부선": ("서울", "영등포", "수원", "대전", "동대구", "부산"),
+    "호남선": ("용산", "오송", "광주송정", "목포"),
+}
+
+TRAIN_TYPES = (("100", "KTX"), ("101", "ITX-새마을"), ("102", "무궁화호"))
+
+
+def _ok(**fields):
+    return dict(strResult="SUCC", h_msg_cd="", h_msg_txt="정상 처리되었습니다.", **fields)
+
+
+def _fail(code, text):
+    return {"strResult": "FAIL", "h_msg_cd": code, "h_msg_txt": text}
+
+
+class MockTrain:
+    __slots__ = (
+        "number", "train_type", "train_name", "dep", "arr", "date",
+        "dep_time", "arr_time", "general_seats", "special_seats",
+        "general_fare", "special_fare",
+    )
+
+    def __init__(self, number, train_type, train_name, dep, arr, date, dep_time, arr_time,
+                 general_seats, special_seats, general_fare, special_fare):
+        self.number = number
+        self.train_type = train_type
+        self.train_name = train_name
+        self.dep = dep
+        self.arr = arr
+        self.date = date
+        self.dep_time = dep_time
+        self.arr_time = arr_time
+        self.general_seats = general_seats
+        self.special_seats = special_seats
+        self.general_fare = general_fare
+        self.special_fare = special_fare
+
+    def info(self):
+        general = "예약가능" if self.general_seats > 0 else "매진"
+        special = "예약가능" if self.special_seats > 0 else "매진"
+        return {
+            "h_trn_clsf_cd": self.train_type,
+            "h_trn_clsf_nm": self.train_name,
+            "h_trn_gp_cd": self.train_type,
+            "h_trn_no": self.number,
+            "h_expct_dlay_hr": "000000",
+            "h_dpt_rs_stn_nm": self.dep,
+            "h_dpt_rs_stn_cd": STATIONS[self.dep],
+            "h_dpt_dt": self.date,
+            "h_dpt_tm": self.dep_time,
+            "h_arv_rs_stn_nm": self.arr,
+            "h_arv_rs_stn_cd": STATIONS[self.arr],
+            "h_arv_dt": self.date,
+            "h_arv_tm": self.arr_time,
+            "h_run_dt": self.date,
+            "h_rsv_psb_flg": "Y" if self.general_seats or self.special_seats else "N",
+            "h_rsv_psb_nm": f"예약하기\n{self.general_fare:,}원",
+            "h_spe_rsv_psb_nm": f"예약하기\n{self.special_fare:,}원",
+            "h_gen_rsv_nm": general,
+            "h_spe_rsv_nm": special,
+        }
+
+
+class MockKorail:
+    """In-process, stateful stand-in for the Korail mobile API.
+
+    Schedules are generated on demand per (dep, arr, date) and keep their
+    seat inventory, so reservations sell seats out and cancellations give
+    them back. Any member id logs in with `password`. Keys expire after
+    `key_ttl` seconds (P058), empty results answer P100 and sold-out
+    reservations ERR211161. Every call sleeps `latency` plus up to
+    `jitter` seconds.
+    """
+
+    def __init__(
+        self,
+        password="password",
+        trains_per_day=60,
+        seats=(40, 10),
+        key_ttl=None,
+        latency=0.0,
+        jitter=0.0,
+        page_size=10,
+        ticket_page_size=20,
+        tickets_per_member=30,
+        full_reserve_response=True,
+        seed=0,
+    ):
+        self.password = password
+        self.trains_per_day = trains_per_day
+        self.seats = seats
+        self.key_ttl = key_ttl
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.ticket_page_size = ticket_page_size
+        self.tickets_per_member = tickets_per_member
+        self.full_reserve_response = full_reserve_response
+        self.random = random.Random(seed)
+        self.calls = {}
+        self._keys = {}
+        self._schedules = {}
+        self._reservations = {}
+        self._tickets = {}
+        self._pnr = 0
+        self._lock = threading.Lock()
+        self.handlers = {
+            "Login": self.login,
+            "logout": self.logout,
+            "ScheduleView": self.schedule_view,
+            "TicketReservation": self.ticket_reservation,
+            "ReservationView": self.reservation_view,
+            "MyTicketList": self.my_ticket_list,
+            "SelTicketInfo": self.sel_ticket_info,
+            "ReservationCancelChk": self.reservation_cancel,
+            "stationdata": self.station_data,
+        }
+
+    def expire_keys(self):
+        with self._lock:
+            self._keys.clear()
+
+    def handle(self, method, path, form):
+        """Answer one request; `path` is the URL path, `form` the merged query
+        and body fields."""
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self.random.uniform(0, self.jitter))
+        endpoint = path.rsplit(".", 1)[-1]
+        handler = self.handlers.get(endpoint)
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if handler is None:
+                return 404, _fail("WRG000000", f"Unknown endpoint {endpoint}")
+            return 200, handler(form)
+
+    def _member(self, form):
+        entry = self._keys.get(form.get("Key"))
+        if entry is None:
+            return None
+        member, issued = entry
+        if self.key_ttl is not None and time.time() - issued > self.key_ttl:
+            del self._keys[form["Key"]]
+            return None
+        return member
+
+    def login(self, form):
+        member = form.get("txtMemberNo")
+        if not member or form.get("txtPwd") != self.password:
+            return _fail("P109", "아이디 또는 비밀번호를 확인하세요.")
+        key = secrets.token_hex(16)
+        self._keys[key] = (member, time.time())
+        return _ok(
+            Key=key,
+            strMbCrdNo=f"{abs(hash(member)) % 10 ** 10:010d}",
+            strCustNm="홍길동",
+            strEmailAdr=member if "@" in member else "member@example.com",
+        )
+
+    def logout(self, form):
+        self._keys.pop(form.get("Key"), None)
+        return _ok()
+
+    def _schedule(self, dep, arr, date):
+        key = (dep, arr, date)
+        trains = self._schedules.get(key)
+        if trains is None:
+            rng = random.Random(f"{dep}{arr}{date}")
+            duration = 60 + rng.randrange(0, 240)
+            start, end = 5 * 60, 23 * 60 + 30
+            step = (end - start) / self.trains_per_day
+            trains = []
+            for i in range(self.trains_per_day):
+                minute = int(start + step * i)
+                arrive = min(minute + duration, 24 * 60 - 1)
+                train_type, train_name = TRAIN_TYPES[i % len(TRAIN_TYPES)]
+                fare = 8400 + duration * 180 // (1 + i % len(TRAIN_TYPES))
+                trains.append(MockTrain(
+                    f"{i + 1:03d}", train_type, train_name, dep, arr, date,
+                    f"{minute // 60:02d}{minute % 60:02d}00",
+                    f"{arrive // 60:02d}{arrive % 60:02d}00",
+                    rng.randrange(0, self.seats[0] + 1),
+                    rng.randrange(0, self.seats[1] + 1),
+                    fare // 100 * 100,
+                    fare * 14 // 1000 * 100,
+                ))
+            self._schedules[key] = trains
+        return trains
+
+    def schedule_view(self, form):
+        dep, arr = form.get("txtGoStart"), form.get("txtGoEnd")
+        if dep not in STATIONS or arr not in STATIONS or dep == arr:
+            return _fail("WRT300005", "역명을 확인하세요.")
+        train_type = form.get("selGoTrain", "109")
+        trains = [
+            x for x in self._schedule(dep, arr, form.get("txtGoAbrdDt"))
+            if x.dep_time >= form.get("txtGoHour", "000000")
+            and train_type in ("109", x.train_type)
+        ][:self.page_size]
+        if not trains:
+            return _fail("P100", "조회 결과가 없습니다.")
+        return _ok(trn_infos={"trn_info": [x.info() for x in trains]})
+
+    def _find_train(self, date, number, dep_code, arr_code=None):
+        for (dep, arr, day), trains in self._schedules.items():
+            if day == date and STATIONS[dep] == dep_code and arr_code in (None, STATIONS[arr]):
+                for train in trains:
+                    if train.number == number:
+                        return train
+        return None
+
+    def ticket_reservation(self, form):
+        member = self._member(form)
+        if member is None:
+            return _fail("P058", "로그인 후 사용하십시오.")
+        count = int(form.get("txtTotPsgCnt") or 1)
+        journeys = int(form.get("txtJrnyCnt") or 1)
+        legs = []
+        for i in range(1, journeys + 1):
+            train = self._find_train(
+                form.get(f"txtDptDt{i}"), form.get(f"txtTrnNo{i}"),
+                form.get(f"txtDptRsStnCd{i}"), form.get(f"txtArvRsStnCd{i}"),
+            )
+            if train is None:
+                return _fail("WRR800029", "열차 정보를 확인하세요.")
+            special = form.get(f"txtPsrmClCd{i}") == "2"
+            if (train.special_seats if special else train.general_seats) < count:
+                return _fail("ERR211161", "잔여석 없음")
+            legs.append((train, special))
+        # 모든 구간에 자리가 있을 때만 한꺼번에 잡는다.
+        for train, special in legs:
+            if special:
+                train.special_seats -= count
+            else:
+                train.general_seats -= count
+
+        self._pnr += 1
+        pnr = f"{self._pnr:06d}"
+        limit = datetime.now(KST) + timedelta(minutes=20)
+        amount = sum((x.special_fare if special else x.general_fare) * count for x, special in legs)
+        infos = [
+            dict(
+                train.info(),
+                h_pnr_no=pnr,
+                h_tot_seat_cnt=str(count),
+                h_ntisu_lmt_dt=limit.strftime("%Y%m%d"),
+                h_ntisu_lmt_tm=limit.strftime("%H%M%S"),
+                h_rsv_amt=str(amount),
+                txtJrnySqno=f"{i:03d}",
+                txtJrnyCnt=f"{len(legs):02d}",
+                hidRsvChgNo="00000",
+            )
+            for i, (train, special) in enumerate(legs, 1)
+        ]
+        self._reservations.setdefault(member, {})[pnr] = (infos, legs, count)
+
+        if not self.full_reserve_response:
+            return _ok(h_pnr_no=pnr)
+        return _ok(
+            h_pnr_no=pnr,
+            h_ntisu_lmt_dt=infos[0]["h_ntisu_lmt_dt"],
+            h_ntisu_lmt_tm=infos[0]["h_ntisu_lmt_tm"],
+            h_rsv_amt=infos[0]["h_rsv_amt"],
+            h_tot_seat_cnt=infos[0]["h_tot_seat_cnt"],
+        )
+
+    def reservation_view(self, form):
+        member = self._member(form)
+        if member is None:
+            return _fail("P058", "로그인 후 사용하십시오.")
+        reservations = self._reservations.get(member)
+        if not reservations:
+            return _fail("P100", "예약 내역이 없습니다.")
+        return _ok(jrny_infos={"jrny_info": [
+            {"train_infos": {"train_info": [info]}}
+            for infos, legs, count in reservations.values()
+            for info in infos
+        ]})
+
+    def reservation_cancel(self, form):
+        member = self._member(form)
+        if member is None:
+            return _fail("P058", "로그인 후 사용하십시오.")
+        entry = self._reservations.get(member, {}).pop(form.get("txtPnrNo"), None)
+        if entry is None:
+            return _fail("WRC000002", "취소할 예약이 없습니다.")
+        infos, legs, count = entry
+        for train, special in legs:
+            if special:
+                train.special_seats += count
+            else:
+                train.general_seats += count
+        return _ok()
+
+    def _member_tickets(self, member):
+        tickets = self._tickets.get(member)
+        if tickets is None:
+            rng = random.Random(member)
+            today = datetime.now()
+            tickets = []
+            for i in range(self.tickets_per_member):
+                day = (today - timedelta(days=i * 3)).strftime("%Y%m%d")
+                train = self._schedule("서울", "부산", day)[rng.randrange(self.trains_per_day)]
+                tickets.append(dict(
+                    train.info(),
+                    h_orgtk_wct_no=f"{1000 + i}",
+                    h_orgtk_ret_sale_dt=day,
+                    h_orgtk_sale_sqno=f"{i:05d}",
+                    h_orgtk_ret_pwd=f"{rng.randrange(10 ** 4):04d}",
+                    h_orgtk_sale_dt=day,
+                    h_buy_ps_nm="홍길동",
+                    h_seat_cnt="1",
+                    h_rcvd_amt=str(train.general_fare),
+                    h_srcar_no=f"{rng.randrange(1, 19)}",
+                    h_seat_no=f"{rng.randrange(1, 16)}{'ABCD'[rng.randrange(4)]}",
+                    h_seat_no_end=None,
+                ))
+            self._tickets[member] = tickets
+        return tickets
+
+    def my_ticket_list(self, form):
+        member = self._member(form)
+        if member is None:
+            return _fail("P058", "로그인 후 사용하십시오.")
+        date_from = form.get("h_abrd_dt_from") or "00000000"
+        date_to = form.get("h_abrd_dt_to") or "99999999"
+        page = int(form.get("h_page_no") or 1)
+        tickets = [x for x in self._member_tickets(member) if date_from <= x["h_dpt_dt"] <= date_to]
+        tickets = tickets[(page - 1) * self.ticket_page_size:page * self.ticket_page_size]
+        if not tickets:
+            return _fail("P100", "발권 내역이 없습니다.")
+        return _ok(reservation_list=[
+            {"ticket_list": [{"train_info": [dict(x, h_seat_no="")]}]} for x in tickets
+        ])
+
+    def sel_ticket_info(self, form):
+        member = self._member(form)
+        if member is None:
+            return _fail("P058", "로그인 후 사용하십시오.")
+        for ticket in self._member_tickets(member):
+            if ticket["h_orgtk_wct_no"] == form.get("h_orgtk_wct_no"):
+                return _ok(ticket_infos={"ticket_info": [
+                    {"tk_seat_info": [{"h_seat_no": ticket["h_seat_no"], "h_srcar_no": ticket["h_srcar_no"]}]}
+                ]})
+        return _fail("P100", "승차권 정보가 없습니다.")
+
+    def station_data(self, form):
+        return _ok(stns={"stn": [
+            {"stn_cd": STATIONS[name], "stn_nm": name, "line_nm": line}
+            for line, names in LINES.items()
+            for name in names
+        ]})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        form = dict(parse_qsl(url.query, keep_blank_values=True))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8")
+            form.update(parse_qsl(body, keep_blank_values=True))
+        status, payload = self.server.backend.handle(self.command, url.path, form)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockKorailServer(ThreadingHTTPServer):
+    """Serve a `MockKorail` over HTTP on `host:port` (port 0 picks a free one).
+
+        with MockKorailServer(MockKorail(latency=0.02)) as server:
+            korail = Korail("010-1234-5678", "password", base_url=server.url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, backend=None, host="127.0.0.1", port=0):
+        super().__init__((host, port), _Handler)
+        self.backend = backend if backend is not None else MockKorail()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,296 @@
+import os
+import random
+import threading
+import time
+
+from ..KorailExceptions.KorailExceptions import KorailError, ServerBusyError, CircuitOpenError
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity`."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take `tokens` if available, else return seconds to wait."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        import asyncio
+
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """A `TokenBucket` whose state lives in a small file, so every process
+    on the machine that opens the same `path` shares one budget.
+
+    The file is locked for the few microseconds of each refill; the clock is
+    wall time because monotonic clocks are not comparable across processes.
+    """
+
+    def __init__(self, path, rate, capacity=None):
+        super().__init__(rate, capacity, clock=time.time)
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def _lock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            self._lock_file()
+            try:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                raw = os.read(self._fd, 64).split()
+                if len(raw) == 2:
+                    self._tokens, self._updated = float(raw[0]), float(raw[1])
+                self._refill()
+                wait = 0.0
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                else:
+                    wait = (tokens - self._tokens) / self.rate
+                state = f"{self._tokens:.6f} {self._updated:.6f}".encode()
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.write(self._fd, state.ljust(64))
+                return wait
+            finally:
+                self._unlock_file()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class CircuitBreaker:
+    """Fail fast while the upstream is unhealthy.
+
+    After `failure_threshold` transient failures in a row the circuit opens
+    and requests raise `CircuitOpenError` without being sent. After
+    `reset_timeout` seconds one trial request is let through (half-open): a
+    success closes the circuit, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def before(self, endpoint=None):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_after = self._opened_at + self.reset_timeout - self.clock()
+            if self.state == self.OPEN and retry_after <= 0:
+                self.state = self.HALF_OPEN
+                self._trial = False
+            if self.state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return
+            raise CircuitOpenError(endpoint, max(retry_after, 0.0))
+
+    def success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+                self._trial = False
+
+    def __repr__(self):
+        return f"<CircuitBreaker {self.state}, failures={self.failures}>"
+
+
+class RequestPolicy:
+    """How a session sends requests: timeouts, rate limit, retries and
+    circuit breaking.
+
+    `timeout` is the default per-request timeout in seconds and `timeouts`
+    overrides it per endpoint (e.g. ``{"TicketReservation": 30}``).
+    Transient failures (`KorailError.retryable`: network errors and HTTP
+    5xx, and HTTP 429 or FAIL responses whose h_msg_cd is in
+    `transient_codes`, raised as `ServerBusyError`) are retried up to
+    `retries` times with jittered exponential backoff between `backoff`
+    and `max_backoff` seconds. `transient_codes` defaults to the empty
+    `ServerBusyError.codes` (see there); pass the h_msg_cd values that
+    should count as "busy".
+    Endpoints in `unsafe` change server state and are never retried, since a
+    timed-out reservation may still have gone through. `limiter` is a
+    `TokenBucket` (or `FileTokenBucket`) shared by everything using this
+    policy, `breaker` a `CircuitBreaker`.
+    """
+
+    UNSAFE_ENDPOINTS = frozenset({"TicketReservation", "ReservationCancelChk"})
+
+    def __init__(
+        self,
+        timeout=10.0,
+        timeouts=None,
+        retries=2,
+        backoff=0.5,
+        max_backoff=8.0,
+        limiter=None,
+        breaker=None,
+        unsafe=UNSAFE_ENDPOINTS,
+        transient_codes=None,
+    ):
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = limiter
+        self.breaker = breaker
+        self.unsafe = frozenset(unsafe)
+        self.transient_codes = frozenset(
+            ServerBusyError.codes if transient_codes is None else transient_codes
+        )
+
+    def timeout_for(self, endpoint):
+        return self.timeouts.get(endpoint, self.timeout)
+
+    def delay(self, attempt):
+        """Full-jitter backoff before retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _admit(self, endpoint):
+        if self.breaker is not None:
+            self.breaker.before(endpoint)
+
+    def is_transient(self, j):
+        """A decoded FAIL response whose h_msg_cd is in `transient_codes`."""
+        return j.get("strResult") == "FAIL" and j.get("h_msg_cd") in self.transient_codes
+
+    def report(self, transient):
+        """Tell the breaker how a request admitted with `admit` ended. Every
+        admitted request must be reported once, or a half-open trial is
+        never resolved."""
+        if self.breaker is not None:
+            if transient:
+                self.breaker.failure()
+            else:
+                self.breaker.success()
+
+    def _retry(self, endpoint, attempt, transient):
+        return transient and attempt < self.retries and endpoint not in self.unsafe
+
+    def admit(self, endpoint):
+        """Gate a request that is not sent through `call` (e.g. a stream);
+        its outcome goes to `report`."""
+        self._admit(endpoint)
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+    def call(self, endpoint, send):
+        """`send(timeout)` with this policy; returns the decoded response."""
+        attempt = 0
+        while True:
+            self.admit(endpoint)
+            # KorailError 가 아닌 예외(디코딩 실패 등)도 실패로 센다.
+            transient = True
+            try:
+                j = send(self.timeout_for(endpoint))
+                transient = self.is_transient(j)
+            except KorailError as error:
+                transient = error.retryable
+                if not self._retry(endpoint, attempt, transient):
+                    raise
+            else:
+                if not self._retry(endpoint, attempt, transient):
+                    return j
+            finally:
+                self.report(transient)
+            time.sleep(self.delay(attempt))
+            attempt += 1
+
+    async def admit_async(self, endpoint):
+        self._admit(endpoint)
+        if self.limiter is not None:
+            await self.limiter.acquire_async()
+
+    async def call_async(self, endpoint, send):
+        """`await send(timeout)` with this policy."""
+        import asyncio
+
+        attempt = 0
+        while True:
+            await self.admit_async(endpoint)
+            transient = True
+            try:
+                j = await send(self.timeout_for(endpoint))
+                transient = self.is_transient(j)
+            except KorailError as error:
+                transient = error.retryable
+                if not self._retry(endpoint, attempt, transient):
+                    raise
+            else:
+                if not self._retry(endpoint, attempt, transient):
+                    return j
+            finally:
+                self.report(transient)
+            await asyncio.sleep(self.delay(attempt))
+            attempt += 1
@@ -0,0 +1,195 @@
+import itertools
+import threading
+import time
+
+from ..Korail import Korail, _fill_date_time
+from ..KorailExceptions.KorailExceptions import (
+    KorailError, NoResultsError, NetworkError, NeedToLoginError, ServerBusyError, CircuitOpenError
+)
+from ..KorailClass.KorailClass import TrainType, ReserveOption, SearchResult
+from ..KorailPolicy.KorailPolicy import TokenBucket
+
+
+class PoolAccount:
+    __slots__ = ("korail", "bucket", "in_flight", "calls", "failures", "retry_at")
+
+    def __init__(self, korail, bucket):
+        self.korail = korail
+        self.bucket = bucket
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def __repr__(self):
+        return f"PoolAccount({self.korail.korail_id}, in_flight={self.in_flight}, failures={self.failures})"
+
+
+class KorailPool:
+    """Spread searches over several logged-in accounts.
+
+    Searches go to the next usable account, either `round_robin` or
+    `least_loaded` (fewest requests in flight). Each account has its own
+    `TokenBucket` (`rate` searches per second). An account that fails to
+    log in or hits a network or login error, an open breaker or a rate
+    limit (`BENCH_ERRORS`; HTTP 429 is a `ServerBusyError` under the
+    default policy) is taken out of rotation with exponential backoff
+    (`backoff` .. `max_backoff` seconds), the search moves to another
+    account, and the account is logged in again when it comes back. Any
+    other error (an unknown station, a bug) is raised as is. Reservations
+    always go to a named account.
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_LOADED = "least_loaded"
+    BENCH_ERRORS = (NetworkError, NeedToLoginError, ServerBusyError, CircuitOpenError)
+
+    def __init__(
+        self,
+        accounts=(),
+        strategy=ROUND_ROBIN,
+        rate=1.0,
+        burst=None,
+        backoff=30.0,
+        max_backoff=900.0,
+        max_attempts=3,
+        **korail_kwargs,
+    ):
+        self.strategy = strategy
+        self.rate = rate
+        self.burst = burst
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.korail_kwargs = korail_kwargs
+        self._accounts = {}
+        self._order = []
+        self._cursor = itertools.count()
+        self._lock = threading.Lock()
+        for account in accounts:
+            self.add(account)
+
+    def add(self, account):
+        """Add a `Korail` instance or a (korail_id, korail_pw) pair."""
+        if not isinstance(account, Korail):
+            korail_id, korail_pw = account
+            account = Korail(korail_id, korail_pw, **self.korail_kwargs)
+        entry = PoolAccount(account, TokenBucket(self.rate, self.burst))
+        if not account.is_login:
+            self._bench(entry)
+        with self._lock:
+            self._accounts[account.korail_id] = entry
+            self._order.append(entry)
+        return account
+
+    def account(self, korail_id):
+        return self._accounts[korail_id].korail
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(list(self._order))
+
+    def _bench(self, entry):
+        entry.failures += 1
+        delay = min(self.backoff * 2 ** (entry.failures - 1), self.max_backoff)
+        entry.retry_at = time.monotonic() + delay
+
+    def _revive(self, entry):
+        # 쉬고 돌아온 계정은 다시 로그인해 본다.
+        try:
+            if entry.korail.is_login or entry.korail.login()[0]:
+                return True
+        except self.BENCH_ERRORS:
+            pass
+        self._bench(entry)
+        return False
+
+    def _candidates(self):
+        now = time.monotonic()
+        with self._lock:
+            ready = [x for x in self._order if x.retry_at <= now]
+            if self.strategy == self.LEAST_LOADED:
+                ready.sort(key=lambda x: (x.in_flight, x.calls))
+            elif ready:
+                start = next(self._cursor) % len(ready)
+                ready = ready[start:] + ready[:start]
+        return ready
+
+    def _acquire(self, exclude=()):
+        while True:
+            candidates = [x for x in self._candidates() if x not in exclude]
+            if not candidates:
+                raise KorailError("No account available in the pool", None)
+            waits = []
+            for entry in candidates:
+                if entry.failures and not self._revive(entry):
+                    continue
+                wait = entry.bucket.try_acquire()
+                if not wait:
+                    with self._lock:
+                        entry.in_flight += 1
+                        entry.calls += 1
+                    return entry
+                waits.append(wait)
+            if waits:
+                time.sleep(min(waits))
+
+    def _dispatch(self, call):
+        tried = []
+        while True:
+            entry = self._acquire(tried)
+            try:
+                result = call(entry.korail)
+                entry.failures = 0
+                return result
+            except NoResultsError:
+                entry.failures = 0
+                raise
+            except self.BENCH_ERRORS:
+                self._bench(entry)
+                tried.append(entry)
+                if len(tried) >= min(self.max_attempts, len(self._order)):
+                    raise
+            finally:
+                with self._lock:
+                    entry.in_flight -= 1
+
+    def search_train(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        available_only=False,
+    ):
+        date, time = _fill_date_time(date, time)
+        try:
+            trains = self._dispatch(
+                lambda korail: korail._search(dep, arr, date, time, train_type, passengers)
+            )
+        except NoResultsError:
+            trains = SearchResult()
+        if available_only:
+            trains = trains.filter(lambda x: x.seat_available())
+        return trains
+
+    def search_train_allday(self, dep, arr, date=None, time=None, train_type=TrainType.ALL,
+                            passengers=None, available_only=False, windows=None):
+        return self._dispatch(
+            lambda korail: korail.search_train_allday(
+                dep, arr, date, time, train_type, passengers, available_only, windows
+            )
+        )
+
+    def reserve(self, korail_id, train, passengers=None, option=ReserveOption.GENERAL_FIRST):
+        return self.account(korail_id).reserve(train, passengers, option)
+
+    def reservations(self, korail_id):
+        return self.account(korail_id).reservations()
+
+    def cancel(self, korail_id, rsv):
+        return self.account(korail_id).cancel(rsv)
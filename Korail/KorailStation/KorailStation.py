@@ -0,0 +1,268 @@
+import bisect
+import difflib
+import gzip
+import json
+import os
+import threading
+
+from ..KorailConstants.KorailConstants import KORAIL_URLS
+from ..KorailExceptions.KorailExceptions import (
+    InvalidStationError, KorailError, NetworkError, ServerBusyError
+)
+from ..KorailTransport.KorailTransport import RequestsTransport
+
+DEFAULT_STATION_PATH = os.path.join(os.path.expanduser("~"), ".korail", "stations.tsv.gz")
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ",
+             "ㄾ", "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ",
+             "ㅌ", "ㅍ", "ㅎ")
+
+NAME_KEYS = ("stn_nm", "h_stn_nm", "stnNm")
+CODE_KEYS = ("stn_cd", "h_stn_cd", "stnCd")
+LINE_KEYS = ("line_nm", "h_line_nm", "rail_nm", "lineNm")
+
+
+def decompose(text):
+    """'서울' -> 'ㅅㅓㅇㅜㄹ'; other characters are kept as they are."""
+    out = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(CHOSEONG[code // 588])
+            out.append(JUNGSEONG[code % 588 // 28])
+            out.append(JONGSEONG[code % 28])
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def choseong(text):
+    """'서울' -> 'ㅅㅇ'"""
+    return "".join(
+        CHOSEONG[(ord(char) - 0xAC00) // 588] if 0 <= ord(char) - 0xAC00 < 11172 else char
+        for char in text
+    )
+
+
+def _first(info, keys):
+    for key in keys:
+        if info.get(key):
+            return info[key]
+    return None
+
+
+def parse_stations(data):
+    """Collect (code, name, line) from a station_db_data response.
+
+    The payload is walked recursively so nesting changes do not matter;
+    every object carrying a station name and code is a station.
+    """
+    stations = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            name, code = _first(node, NAME_KEYS), _first(node, CODE_KEYS)
+            if name and code:
+                stations.append((code, name, _first(node, LINE_KEYS) or ""))
+            else:
+                stack.extend(reversed(list(node.values())))
+    return stations
+
+
+class Station:
+    __slots__ = ("code", "name", "lines")
+
+    def __init__(self, code, name, lines=()):
+        self.code = code
+        self.name = name
+        self.lines = tuple(lines)
+
+    def __repr__(self):
+        return f"{self.name}({self.code})"
+
+
+class StationDB:
+    """Local station index built from the `station_db_data` endpoint.
+
+    Nothing is loaded until the first lookup. The snapshot at `path` is used
+    when it exists; otherwise the data is fetched once (through `korail`
+    when given, so its session and policies apply) and written to `path`
+    as a gzip'd ``code<TAB>name<TAB>line,line`` file. Without `korail` the
+    fetch goes through `transport` (a `RequestsTransport` by default, with
+    the client's User-Agent) and `timeout` applies to it.
+    """
+
+    def __init__(self, path=DEFAULT_STATION_PATH, korail=None, stations=None, timeout=10.0,
+                 transport=None):
+        self.path = path
+        self.korail = korail
+        self.timeout = timeout
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._loaded = False
+        if stations is not None:
+            self._index(stations)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path and os.path.exists(self.path):
+                self._index(self._read(self.path))
+            else:
+                self.refresh()
+
+    def refresh(self):
+        """Fetch the station list from Korail and rewrite the snapshot.
+
+        A failed request, a FAIL response or one without any station raises
+        `KorailError` and leaves the index and the snapshot as they were.
+        """
+        if self.korail is not None:
+            data = self.korail._request("GET", self.korail._urls["station_db_data"])
+        else:
+            data = self._fetch()
+        if data.get("strResult") == "FAIL":
+            if self.korail is not None:
+                self.korail._result_check(data)
+            raise KorailError(data.get("h_msg_txt"), data.get("h_msg_cd"))
+        stations = parse_stations(data)
+        if not stations:
+            raise KorailError("station_db_data returned no stations", data.get("h_msg_cd"))
+        self._index(stations)
+        if self.path:
+            self.save(self.path)
+
+    def _fetch(self):
+        transport = self.transport if self.transport is not None else RequestsTransport()
+        try:
+            r = transport.request("GET", KORAIL_URLS["station_db_data"], timeout=self.timeout)
+            if r.status_code >= 500:
+                raise NetworkError(f"HTTP {r.status_code}", r.status_code)
+            if r.status_code == 429:
+                raise ServerBusyError(r.status_code)
+            try:
+                data = json.loads(r.content)
+            except ValueError as error:
+                raise KorailError(f"station_db_data returned an unreadable body: {error}", None) from error
+        finally:
+            # 직접 만든 transport 만 닫는다.
+            if transport is not self.transport:
+                transport.close()
+        if not isinstance(data, dict):
+            raise KorailError("station_db_data returned an unexpected body", None)
+        return data
+
+    @staticmethod
+    def _read(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                code, name, lines = line.rstrip("\n").split("\t")
+                yield code, name, lines
+
+    def save(self, path):
+        # sqlite3 를 부르지 않도록 저장할 때만 불러온다.
+        from ..KorailStore.KorailStore import _make_store_dir
+
+        _make_store_dir(path)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for station in self._by_code.values():
+                f.write(f"{station.code}\t{station.name}\t{','.join(station.lines)}\n")
+        os.replace(tmp, path)
+
+    def _index(self, stations):
+        by_code = {}
+        for code, name, lines in stations:
+            lines = [x for x in lines.split(",") if x] if isinstance(lines, str) else list(lines)
+            station = by_code.get(code)
+            if station is None:
+                by_code[code] = Station(code, name, lines)
+            else:
+                station.lines = tuple(dict.fromkeys(station.lines + tuple(lines)))
+
+        self._by_code = by_code
+        self._by_name = {x.name: x for x in by_code.values()}
+        self._by_line = {}
+        for station in by_code.values():
+            for line in station.lines:
+                self._by_line.setdefault(line, []).append(station)
+        self._jamo = sorted((decompose(name), name) for name in self._by_name)
+        self._choseong = sorted((choseong(name), name) for name in self._by_name)
+        self._loaded = True
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._by_code)
+
+    def __contains__(self, name):
+        self._ensure_loaded()
+        return name in self._by_name
+
+    def __iter__(self):
+        self._ensure_loaded()
+        return iter(self._by_code.values())
+
+    def code(self, name):
+        return self.get(name).code
+
+    def name(self, code):
+        self._ensure_loaded()
+        return self._by_code[code].name
+
+    def get(self, name):
+        self._ensure_loaded()
+        station = self._by_name.get(name)
+        if station is None:
+            raise InvalidStationError(name, self.search(name, limit=3))
+        return station
+
+    def validate(self, *names):
+        for name in names:
+            self.get(name)
+
+    def lines(self):
+        self._ensure_loaded()
+        return sorted(self._by_line)
+
+    def by_line(self, line):
+        self._ensure_loaded()
+        return list(self._by_line.get(line, ()))
+
+    @staticmethod
+    def _prefixed(index, prefix):
+        i = bisect.bisect_left(index, (prefix,))
+        while i < len(index) and index[i][0].startswith(prefix):
+            yield index[i][1]
+            i += 1
+
+    def search(self, query, limit=10):
+        """Station names matching `query`, best first.
+
+        Matches by exact name, jamo prefix ('서ㅇ' -> 서울), initial
+        consonants ('ㄷㄷㄱ' -> 동대구), jamo substring and finally edit
+        distance.
+        """
+        self._ensure_loaded()
+        found = dict.fromkeys([query] if query in self._by_name else [])
+        jamo = decompose(query)
+        for name in self._prefixed(self._jamo, jamo):
+            found.setdefault(name)
+        if all(char in CHOSEONG for char in query):
+            for name in self._prefixed(self._choseong, query):
+                found.setdefault(name)
+        if len(found) < limit:
+            for decomposed, name in self._jamo:
+                if jamo in decomposed:
+                    found.setdefault(name)
+        if len(found) < limit:
+            for name in difflib.get_close_matches(query, self._by_name, limit, 0.5):
+                found.setdefault(name)
+        return list(found)[:limit]
@@ -0,0 +1,124 @@
+import json
+import os
+from contextlib import closing
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".korail")
+
+
+def _make_store_dir(path):
+    # 세션 파일이 들어갈 디렉터리는 본인만 열어 볼 수 있게 0700 으로 만든다.
+    os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+
+
+class SessionStore:
+    """Persists logged-in session state (Key, cookies, member info) per id.
+
+    Passwords are never stored. States older than `max_age` seconds are
+    ignored so a stale Key is not rehydrated forever.
+    """
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+
+    def _fresh(self, state):
+        if state is None:
+            return None
+        if self.max_age is not None and time.time() - state.get("saved_at", 0) > self.max_age:
+            return None
+        return state
+
+    def load(self, korail_id):
+        raise NotImplementedError
+
+    def save(self, korail_id, state):
+        raise NotImplementedError
+
+    def delete(self, korail_id):
+        raise NotImplementedError
+
+
+class FileSessionStore(SessionStore):
+    """All sessions in one JSON file, replaced atomically on every save.
+
+    Thread-safe, but not process-safe: two processes saving at once can
+    lose one another's update. Use `SQLiteSessionStore` across processes.
+    """
+
+    def __init__(self, path=os.path.join(DEFAULT_STORE_DIR, "sessions.json"), max_age=None):
+        super().__init__(max_age)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, states):
+        _make_store_dir(self.path)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        # Key 와 쿠키가 잠깐이라도 남에게 보이지 않도록 처음부터 0600 으로 만든다.
+        fd = os.open(tmp, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(states, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def load(self, korail_id):
+        with self._lock:
+            return self._fresh(self._read().get(korail_id))
+
+    def save(self, korail_id, state):
+        with self._lock:
+            states = self._read()
+            states[korail_id] = dict(state, saved_at=time.time())
+            self._write(states)
+
+    def delete(self, korail_id):
+        with self._lock:
+            states = self._read()
+            if states.pop(korail_id, None) is not None:
+                self._write(states)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a SQLite table; safe to share between worker processes."""
+
+    def __init__(self, path=os.path.join(DEFAULT_STORE_DIR, "sessions.sqlite3"), max_age=None):
+        super().__init__(max_age)
+        self.path = path
+        _make_store_dir(path)
+        # sqlite3 는 umask 대로 파일을 만들므로 먼저 0600 으로 만들어 둔다.
+        os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "korail_id TEXT PRIMARY KEY, state TEXT NOT NULL, saved_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, korail_id):
+        with closing(self._connect()) as db, db:
+            row = db.execute(
+                "SELECT state, saved_at FROM sessions WHERE korail_id = ?", (korail_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._fresh(dict(json.loads(row[0]), saved_at=row[1]))
+
+    def save(self, korail_id, state):
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (korail_id, state, saved_at) VALUES (?, ?, ?)",
+                (korail_id, json.dumps(state, ensure_ascii=False), time.time()),
+            )
+
+    def delete(self, korail_id):
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM sessions WHERE korail_id = ?", (korail_id,))
@@ -0,0 +1,194 @@
+from functools import lru_cache
+
+import numpy as np
+
+from ..KorailConstants.KorailConstants import SeatState
+from ..KorailClass.KorailClass import Train, parse_price
+
+_ATTRS = tuple(attr for attr, key in Train._fields)
+_KEYS = tuple(key for attr, key in Train._fields)
+
+
+def _int(text, default=-1):
+    return int(text) if text and text.isdigit() else default
+
+
+class _Seats:
+    __slots__ = ("general_seat_state", "special_seat_state")
+
+    def __init__(self, general_seat_state, special_seat_state):
+        self.general_seat_state = general_seat_state
+        self.special_seat_state = special_seat_state
+
+
+@lru_cache(maxsize=None)
+def _seat_flags(general_seat_state, special_seat_state):
+    # 가용 여부는 Train 의 판정 로직을 그대로 따른다.
+    seats = _Seats(general_seat_state, special_seat_state)
+    return Train.general_seat_available(seats), Train.special_seat_available(seats)
+
+
+class TrainTable:
+    """Column-oriented set of trains.
+
+    Departure/arrival dates and times, station codes, train type, seat
+    states and parsed fares are NumPy columns, so filtering and sorting
+    tens of thousands of trains is vectorized. Rows are kept as compact
+    tuples and only turned back into `Train` objects when accessed.
+
+        table = korail.search_train_allday("서울", "부산", as_table=True)
+        for train in table.filter(available_only=True, dep_to="120000").sort_by("fare"):
+            ...
+    """
+
+    def __init__(self, rows=(), stations=None):
+        self._rows = list(rows)
+        self.stations = stations if stations is not None else []
+        self._build()
+
+    @classmethod
+    def from_trains(cls, trains):
+        return cls(tuple(getattr(train, attr) for attr in _ATTRS) for train in trains)
+
+    @classmethod
+    def from_infos(cls, infos):
+        """Build straight from `trn_info` rows without creating `Train`s."""
+        return cls(tuple(map(info.get, _KEYS)) for info in infos)
+
+    @classmethod
+    def concat(cls, tables):
+        rows = []
+        for table in tables:
+            rows.extend(table._rows)
+        return cls(rows)
+
+    def _build(self):
+        n = len(self._rows)
+        index = {code: i for i, code in enumerate(self.stations)}
+        columns = {
+            "dep_date": np.empty(n, np.int32),
+            "dep_time": np.empty(n, np.int32),
+            "arr_date": np.empty(n, np.int32),
+            "arr_time": np.empty(n, np.int32),
+            "dep_code": np.empty(n, np.int16),
+            "arr_code": np.empty(n, np.int16),
+            "train_type": np.empty(n, np.int16),
+            "general_state": np.empty(n, np.int8),
+            "special_state": np.empty(n, np.int8),
+            "general_available": np.empty(n, np.bool_),
+            "special_available": np.empty(n, np.bool_),
+            "general_fare": np.empty(n, np.int32),
+            "special_fare": np.empty(n, np.int32),
+        }
+        for i, row in enumerate(self._rows):
+            train = dict(zip(_ATTRS, row))
+            columns["dep_date"][i] = _int(train["dep_date"])
+            columns["dep_time"][i] = _int(train["dep_time"])
+            columns["arr_date"][i] = _int(train["arr_date"])
+            columns["arr_time"][i] = _int(train["arr_time"])
+            columns["dep_code"][i] = index.setdefault(train["dep_code"], len(index))
+            columns["arr_code"][i] = index.setdefault(train["arr_code"], len(index))
+            columns["train_type"][i] = _int(train["train_type"])
+            columns["general_state"][i] = SeatState.from_text(train["general_seat_state"])
+            columns["special_state"][i] = SeatState.from_text(train["special_seat_state"])
+            (
+                columns["general_available"][i],
+                columns["special_available"][i],
+            ) = _seat_flags(train["general_seat_state"], train["special_seat_state"])
+            general_fare = parse_price(train["reserve_possible_price"])
+            special_fare = parse_price(train["special_possible_price"])
+            columns["general_fare"][i] = -1 if general_fare is None else general_fare
+            columns["special_fare"][i] = -1 if special_fare is None else special_fare
+
+        general = np.where(
+            columns["general_available"] & (columns["general_fare"] >= 0),
+            columns["general_fare"], np.iinfo(np.int32).max,
+        )
+        special = np.where(
+            columns["special_available"] & (columns["special_fare"] >= 0),
+            columns["special_fare"], np.iinfo(np.int32).max,
+        )
+        fare = np.minimum(general, special)
+        columns["fare"] = np.where(fare == np.iinfo(np.int32).max, -1, fare).astype(np.int32)
+
+        self.stations = sorted(index, key=index.get)
+        self.columns = columns
+
+    @staticmethod
+    def _train(row):
+        return Train(dict(zip(_KEYS, row)))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return map(self._train, self._rows)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return self._train(self._rows[item])
+        if isinstance(item, str):
+            return self.columns[item]
+        return self.take(item)
+
+    def __repr__(self):
+        return f"<TrainTable {len(self)} trains>"
+
+    def take(self, indices):
+        """New table from a boolean mask or an index array."""
+        indices = np.asarray(indices)
+        if indices.dtype == np.bool_:
+            indices = np.flatnonzero(indices)
+        table = TrainTable.__new__(TrainTable)
+        table._rows = [self._rows[i] for i in indices]
+        table.stations = self.stations
+        table.columns = {name: column[indices] for name, column in self.columns.items()}
+        return table
+
+    def to_list(self):
+        return list(self)
+
+    def available_mask(self, option=None):
+        if option == "GENERAL_ONLY":
+            return self.columns["general_available"]
+        if option == "SPECIAL_ONLY":
+            return self.columns["special_available"]
+        return self.columns["general_available"] | self.columns["special_available"]
+
+    def time_mask(self, dep_from=None, dep_to=None):
+        dep_time = self.columns["dep_time"]
+        mask = np.ones(len(self), np.bool_)
+        if dep_from is not None:
+            mask &= dep_time >= int(dep_from)
+        if dep_to is not None:
+            mask &= dep_time <= int(dep_to)
+        return mask
+
+    def train_type_mask(self, train_type):
+        types = [train_type] if isinstance(train_type, str) else train_type
+        return np.isin(self.columns["train_type"], [int(x) for x in types])
+
+    def fare_mask(self, max_fare):
+        fare = self.columns["fare"]
+        return (fare >= 0) & (fare <= max_fare)
+
+    def filter(self, available_only=False, dep_from=None, dep_to=None,
+               train_type=None, max_fare=None, option=None):
+        mask = self.time_mask(dep_from, dep_to)
+        if available_only:
+            mask &= self.available_mask(option)
+        if train_type is not None:
+            mask &= self.train_type_mask(train_type)
+        if max_fare is not None:
+            mask &= self.fare_mask(max_fare)
+        return self.take(mask)
+
+    def argsort(self, *names, descending=False):
+        if not names:
+            names = ("dep_date", "dep_time")
+        # np.lexsort 은 마지막 키를 우선으로 정렬한다.
+        order = np.lexsort([self.columns[name] for name in reversed(names)])
+        return order[::-1] if descending else order
+
+    def sort_by(self, *names, descending=False):
+        return self.take(self.argsort(*names, descending=descending))
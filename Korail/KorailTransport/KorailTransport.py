@@ -0,0 +1,242 @@
+import base64
+import json
+import os
+import threading
+from collections import deque
+from urllib.parse import parse_qsl, urlsplit
+
+from ..KorailConstants.KorailConstants import DEFAULT_USER_AGENT
+from ..KorailExceptions.KorailExceptions import NetworkError
+
+
+class TransportResponse:
+    """The part of a response the client reads: status and body bytes."""
+
+    __slots__ = ("status_code", "content")
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def iter_content(self, chunk_size=16384):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def form_items(params=None, data=None):
+    """Query and body fields as the (name, value) strings a server sees.
+    `params` may be a dict or an already encoded query string."""
+    items = []
+    for fields in (params, data):
+        if not fields:
+            continue
+        if isinstance(fields, str):
+            items.extend(parse_qsl(fields, keep_blank_values=True))
+        else:
+            # requests 와 같이 None 인 필드는 보내지 않는다.
+            items.extend((k, str(v)) for k, v in fields.items() if v is not None)
+    return items
+
+
+class Transport:
+    """Sends one HTTP request for a `KorailSession`.
+
+    `request()` returns an object with `status_code`, `content`,
+    `iter_content(chunk_size)` and `close()` and raises `NetworkError` when
+    no response was received. Cookies are exposed as plain dicts so session
+    state can be saved and restored whatever the transport.
+    """
+
+    def request(self, method, url, params=None, data=None, timeout=None, stream=False):
+        raise NotImplementedError
+
+    def cookies(self):
+        return []
+
+    def set_cookie(self, name, value, domain="", path="/"):
+        pass
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """Pooled HTTP over a `requests.Session`.
+
+    `pool_connections` hosts are kept with up to `pool_maxsize` idle
+    connections each (raise it for many threads on one host; `pool_block`
+    makes extra threads wait instead of opening throwaway connections).
+    `keep_alive=False` closes every connection after its response and
+    `gzip=False` asks for uncompressed bodies.
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=32, pool_block=False,
+                 keep_alive=True, gzip=True, headers=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": DEFAULT_USER_AGENT,
+            "Accept-Encoding": "gzip, deflate" if gzip else "identity",
+            "Connection": "keep-alive" if keep_alive else "close",
+        })
+        if headers:
+            self.session.headers.update(headers)
+        self._errors = requests.RequestException
+
+    def request(self, method, url, params=None, data=None, timeout=None, stream=False):
+        try:
+            return self.session.request(
+                method, url, params=params, data=data, timeout=timeout, stream=stream
+            )
+        except self._errors as error:
+            raise NetworkError(str(error)) from error
+
+    def cookies(self):
+        return [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in self.session.cookies
+        ]
+
+    def set_cookie(self, name, value, domain="", path="/"):
+        self.session.cookies.set(name, value, domain=domain, path=path)
+
+    def close(self):
+        self.session.close()
+
+
+class MemoryTransport(Transport):
+    """Calls `handler(method, path, form)` -> (status, dict) in process,
+    e.g. `MockKorail.handle`, and JSON-encodes the answer like a server.
+
+        korail = Korail("010-1234-5678", "password",
+                        transport=MemoryTransport(MockKorail()))
+    """
+
+    def __init__(self, handler):
+        self.handler = getattr(handler, "handle", handler)
+        self._cookies = {}
+
+    def request(self, method, url, params=None, data=None, timeout=None, stream=False):
+        form = dict(form_items(params, data))
+        status, payload = self.handler(method, urlsplit(url).path, form)
+        return TransportResponse(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def cookies(self):
+        return [dict(cookie) for cookie in self._cookies.values()]
+
+    def set_cookie(self, name, value, domain="", path="/"):
+        self._cookies[name, domain, path] = {"name": name, "value": value, "domain": domain, "path": path}
+
+
+class RecordReplayTransport(Transport):
+    """Record real exchanges to a JSON-lines file, or replay them.
+
+    In `record` mode every request goes to `transport` (a fresh
+    `RequestsTransport` by default) and the exchange is appended to `path`.
+    In `replay` mode nothing is sent: each request is answered with the
+    next recorded response for the same method, endpoint and fields, in
+    recording order (the last one repeats), with no network latency.
+
+    Fields in `ignore` are left out of the match and never written to
+    disk: the password and the session Key, which changes every login.
+    Response fields in `redact` (the Key and the member details a login
+    returns) are written as `REDACTED`; the caller still gets the real
+    response.
+    """
+
+    RECORD = "record"
+    REPLAY = "replay"
+    IGNORE = frozenset({"Key", "txtPwd"})
+    REDACT = frozenset({"Key", "strMbCrdNo", "strCustNm", "strEmailAdr"})
+
+    def __init__(self, path, mode=REPLAY, transport=None, ignore=IGNORE, redact=REDACT):
+        self.path = path
+        self.mode = mode
+        self.ignore = frozenset(ignore)
+        self.redact = frozenset(redact)
+        self._lock = threading.Lock()
+        if mode == self.RECORD:
+            self.transport = transport if transport is not None else RequestsTransport()
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        elif mode == self.REPLAY:
+            self.transport = transport
+            self._responses = {}
+            self._load()
+        else:
+            raise ValueError(f"mode must be 'record' or 'replay', not {mode!r}")
+
+    def _match_key(self, method, url, params, data):
+        fields = sorted((k, v) for k, v in form_items(params, data) if k not in self.ignore)
+        return method.upper(), urlsplit(url).path.rsplit(".", 1)[-1], tuple(fields)
+
+    def _redacted(self, value):
+        if isinstance(value, dict):
+            return {k: "REDACTED" if k in self.redact else self._redacted(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._redacted(x) for x in value]
+        return value
+
+    def _recorded_body(self, content):
+        if self.redact:
+            try:
+                body = json.loads(content)
+            except ValueError:
+                pass
+            else:
+                redacted = self._redacted(body)
+                if redacted != body:
+                    return json.dumps(redacted, ensure_ascii=False).encode("utf-8")
+        return content
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = (entry["method"], entry["endpoint"], tuple(map(tuple, entry["form"])))
+                body = base64.b64decode(entry["body"]) if entry.get("base64") else entry["body"].encode("utf-8")
+                self._responses.setdefault(key, deque()).append((entry["status"], body))
+
+    def request(self, method, url, params=None, data=None, timeout=None, stream=False):
+        key = self._match_key(method, url, params, data)
+        if self.mode == self.REPLAY:
+            with self._lock:
+                responses = self._responses.get(key)
+                if not responses:
+                    raise LookupError(f"No recorded response for {key[0]} {key[1]} {dict(key[2])}")
+                status, body = responses.popleft() if len(responses) > 1 else responses[0]
+            return TransportResponse(status, body)
+
+        r = self.transport.request(method, url, params, data, timeout)
+        entry = {"method": key[0], "endpoint": key[1], "form": key[2], "status": r.status_code}
+        body = self._recorded_body(r.content)
+        try:
+            entry["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body"] = base64.b64encode(body).decode("ascii")
+            entry["base64"] = True
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return TransportResponse(r.status_code, r.content)
+
+    def cookies(self):
+        return self.transport.cookies() if self.transport is not None else []
+
+    def set_cookie(self, name, value, domain="", path="/"):
+        if self.transport is not None:
+            self.transport.set_cookie(name, value, domain, path)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
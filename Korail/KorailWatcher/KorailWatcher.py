@@ -0,0 +1,271 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from ..Korail import KST, logger
+from ..KorailEvents.KorailEvents import EventFeed
+from ..KorailExceptions.KorailExceptions import KorailError
+from ..KorailClass.KorailClass import TrainType, ReserveOption
+from ..KorailPolicy.KorailPolicy import TokenBucket
+
+
+class WatchTarget:
+    """A route/date/time window to watch for seats.
+
+    With `reserve=True` the first train that opens up is reserved with
+    `option` and `passengers`, and the target stops being watched.
+    """
+
+    def __init__(
+        self,
+        dep,
+        arr,
+        date,
+        time_from="000000",
+        time_to=None,
+        option=ReserveOption.GENERAL_FIRST,
+        passengers=None,
+        train_type=TrainType.ALL,
+        priority=0,
+        reserve=False,
+        min_interval=2.0,
+        max_interval=300.0,
+    ):
+        self.dep = dep
+        self.arr = arr
+        self.date = date
+        self.time_from = time_from
+        self.time_to = time_to
+        self.option = option
+        self.passengers = passengers
+        self.train_type = train_type
+        self.priority = priority
+        self.reserve = reserve
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.departure = datetime.strptime(
+            date + (time_to or "235959"), "%Y%m%d%H%M%S"
+        ).replace(tzinfo=KST)
+        self.available = set()
+        self.sold_out_since = None
+        self.polls = 0
+        self.done = False
+
+    def __repr__(self):
+        time_to = self.time_to or "235959"
+        return f"WatchTarget({self.dep}~{self.arr}, {self.date} {self.time_from}~{time_to})"
+
+    def matches(self, train):
+        if self.time_to is not None and train.dep_time > self.time_to:
+            return False
+        if self.option == ReserveOption.GENERAL_ONLY:
+            return train.general_seat_available()
+        if self.option == ReserveOption.SPECIAL_ONLY:
+            return train.special_seat_available()
+        return train.seat_available()
+
+    def next_interval(self, now=None):
+        """Poll faster as departure gets closer (full speed inside 3 hours,
+        slowest from 3 days out) and back off up to 4x while sold out."""
+        now = now or time.time()
+        hours_left = (self.departure.timestamp() - now) / 3600
+        closeness = min(max((hours_left - 3) / 69, 0.0), 1.0)
+        interval = self.min_interval + (self.max_interval - self.min_interval) * closeness
+        if self.sold_out_since is not None:
+            sold_out_hours = (now - self.sold_out_since) / 3600
+            interval *= min(1 + sold_out_hours, 4)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+
+class SeatEvent:
+    def __init__(self, target, train, reservation=None, error=None):
+        self.target = target
+        self.train = train
+        self.reservation = reservation
+        self.error = error
+
+    def __repr__(self):
+        return f"SeatEvent({self.target!r}, {self.train!r}, reservation={self.reservation!r})"
+
+
+class SeatWatcher:
+    """Poll many `WatchTarget`s from one scheduler thread.
+
+    Targets are kept in a heap ordered by next poll time, priority and
+    departure. A poll pages through the whole `time_from`~`time_to`
+    window and every page request takes a token from one shared
+    `TokenBucket` (`rate` searches per second); at most `max_workers`
+    polls are in flight. Every train that
+    becomes available emits a `SeatEvent` on `feed` (an `EventFeed`): to
+    the registered callbacks and to `events()` / `async for`.
+    """
+
+    def __init__(self, korail, rate=1.0, burst=None, max_workers=4, event_queue_size=1024):
+        self.korail = korail
+        self.bucket = TokenBucket(rate, burst)
+        self.max_workers = max_workers
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self.feed = EventFeed(event_queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, target, delay=0.0):
+        with self._cond:
+            heapq.heappush(self._heap, (
+                time.monotonic() + delay,
+                -target.priority,
+                target.departure,
+                next(self._seq),
+                target,
+            ))
+            self._cond.notify()
+        return target
+
+    def remove(self, target):
+        target.done = True
+
+    def on_available(self, callback):
+        return self.feed.subscribe(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self.feed.open()
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        self._stop.set()
+        self.feed.close()
+        with self._cond:
+            self._cond.notify_all()
+        if wait and self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def run(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while not self._stop.is_set():
+                target = self._next_due()
+                if target is None:
+                    continue
+                # 첫 쪽의 토큰은 여기서 받아 우선순위 순서대로 조회한다.
+                if self._take_token():
+                    self._slots.acquire()
+                    if not self._stop.is_set():
+                        self._executor.submit(self._poll, target)
+                        continue
+                    self._slots.release()
+                # 멈춘 뒤에는 새로 조회하지 않고, 다시 start() 할 때를 위해 돌려 놓는다.
+                self.add(target)
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def _take_token(self):
+        """Wait for a token of `bucket`; False if `stop()` came first."""
+        wait = self.bucket.try_acquire()
+        while wait:
+            if self._stop.wait(wait):
+                return False
+            wait = self.bucket.try_acquire()
+        return True
+
+    def _pacer(self):
+        # 첫 쪽은 run() 이 받은 토큰으로 묻고, 다음 쪽부터 토큰을 하나씩 받는다.
+        pages = itertools.count()
+        return lambda: next(pages) == 0 or self._take_token()
+
+    def _next_due(self):
+        with self._cond:
+            while not self._stop.is_set():
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, _, _, target = self._heap[0]
+                if target.done:
+                    heapq.heappop(self._heap)
+                    continue
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._heap)
+                return target
+        return None
+
+    def _poll(self, target):
+        try:
+            self._check(target)
+        finally:
+            self._slots.release()
+            now = time.time()
+            if not target.done and target.departure.timestamp() > now:
+                self.add(target, target.next_interval(now))
+
+    def _check(self, target):
+        target.polls += 1
+        try:
+            trains = list(self.korail.iter_trains_allday(
+                target.dep,
+                target.arr,
+                target.date,
+                target.time_from,
+                target.train_type,
+                target.passengers,
+                until=target.time_to,
+                pace=self._pacer(),
+            ))
+        except KorailError as error:
+            # 이번 조회는 건너뛰고 다음 주기에 다시 본다.
+            logger.warning("%r 조회에 실패하였습니다. 원인: %s", target, error)
+            return
+        if self._stop.is_set():
+            # 멈추느라 중간에 끊긴 결과로는 빈자리를 판단하지 않는다.
+            return
+        available = [x for x in trains if target.matches(x)]
+        keys = {x.key() for x in available}
+        opened = [x for x in available if x.key() not in target.available]
+        target.available = keys
+
+        if available:
+            target.sold_out_since = None
+        elif target.sold_out_since is None:
+            target.sold_out_since = time.time()
+
+        for train in opened:
+            event = SeatEvent(target, train)
+            if target.reserve and not target.done:
+                try:
+                    event.reservation = self.korail.reserve(
+                        train, target.passengers, target.option
+                    )
+                    target.done = True
+                except KorailError as error:
+                    event.error = error
+            self._emit(event)
+
+    def _emit(self, event):
+        self.feed.publish(event)
+
+    def events(self, timeout=None):
+        """Yield `SeatEvent`s until `timeout` seconds pass without one."""
+        return self.feed.events(timeout)
+
+    def __iter__(self):
+        return self.feed.events()
+
+    def __aiter__(self):
+        return self.feed.__aiter__()
@@ -0,0 +1,226 @@
+"""Command line client.
+
+    python -m Korail search 서울 부산 --date 20231010 --time 060000
+    python -m Korail search-allday 서울 부산 --until 120000 --available
+    python -m Korail reserve 서울 부산 --date 20231010 --train 00101
+    python -m Korail reservations
+    python -m Korail tickets --from 20230101 --to 20231231
+    python -m Korail cancel <rsv_id>
+
+Every result is written to stdout as one JSON object per line (NDJSON) as
+soon as it arrives. Credentials come from --id/--pw or KORAIL_ID and
+KORAIL_PW; the logged-in session is kept in ~/.korail/sessions.json and
+reused, so the password is only needed when the session has expired.
+
+Only argparse is imported up front: `--help` and usage errors never load
+the HTTP stack.
+"""
+import argparse
+import json
+import os
+import sys
+
+SEAT_OPTIONS = {
+    "general-first": "GENERAL_FIRST",
+    "general-only": "GENERAL_ONLY",
+    "special-first": "SPECIAL_FIRST",
+    "special-only": "SPECIAL_ONLY",
+}
+
+TRAIN_TYPES = {
+    "all": "109",
+    "ktx": "100",
+    "itx-saemaeul": "101",
+    "saemaeul": "101",
+    "mugunghwa": "102",
+    "tonggeun": "103",
+    "itx-cheongchun": "104",
+    "airport": "105",
+}
+
+
+def _record(obj):
+    """The public slot attributes of a model object as a dict. A private
+    slot backing a property of the same name (Ticket.seat_no) is read
+    through the property."""
+    record = {}
+    for cls in reversed(type(obj).__mro__):
+        for name in getattr(cls, "__slots__", ()):
+            if name.startswith("_"):
+                name = name.lstrip("_")
+                if not isinstance(getattr(type(obj), name, None), property):
+                    continue
+            if hasattr(obj, name):
+                record[name] = getattr(obj, name)
+    return record
+
+
+def _emit(obj):
+    sys.stdout.write(json.dumps(_record(obj), ensure_ascii=False, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def _passengers(args):
+    from .KorailClass.KorailClass import AdultPassenger, ChildPassenger, SeniorPassenger
+
+    passengers = []
+    if args.adults:
+        passengers.append(AdultPassenger(args.adults))
+    if args.children:
+        passengers.append(ChildPassenger(args.children))
+    if args.seniors:
+        passengers.append(SeniorPassenger(args.seniors))
+    return passengers or None
+
+
+def _client(args):
+    from .Korail import Korail
+    from .KorailPolicy.KorailPolicy import RequestPolicy
+
+    korail_id = args.id or os.environ.get("KORAIL_ID")
+    korail_pw = args.pw or os.environ.get("KORAIL_PW")
+    if not korail_id:
+        raise SystemExit("korail: --id or KORAIL_ID is required")
+
+    store = None
+    if not args.no_session:
+        from .KorailStore.KorailStore import FileSessionStore
+
+        store = FileSessionStore(args.session) if args.session else FileSessionStore()
+        if store.load(korail_id) is None and not korail_pw:
+            raise SystemExit("korail: no saved session, --pw or KORAIL_PW is required")
+
+    korail = Korail(
+        korail_id,
+        korail_pw,
+        session_store=store,
+        base_url=args.base_url,
+        policy=RequestPolicy(timeout=args.timeout),
+    )
+    if not korail.is_login:
+        raise SystemExit("korail: login failed")
+    return korail
+
+
+def cmd_search(korail, args):
+    for train in korail.iter_search_train(
+        args.dep, args.arr, args.date, args.time, TRAIN_TYPES[args.type],
+        _passengers(args), args.available,
+    ):
+        _emit(train)
+
+
+def cmd_search_allday(korail, args):
+    for train in korail.iter_trains_allday(
+        args.dep, args.arr, args.date, args.time, TRAIN_TYPES[args.type],
+        _passengers(args), args.available, args.until,
+    ):
+        _emit(train)
+
+
+def cmd_reserve(korail, args):
+    passengers = _passengers(args)
+    for train in korail.iter_trains_allday(
+        args.dep, args.arr, args.date, args.time, TRAIN_TYPES[args.type],
+        passengers, available_only=True, until=args.until,
+    ):
+        if args.train and train.train_number.lstrip("0") != args.train.lstrip("0"):
+            continue
+        reservation = korail.reserve(train, passengers, SEAT_OPTIONS[args.seat])
+        if reservation is None:
+            print(f"korail: reservation of train {train.train_number} failed", file=sys.stderr)
+            return 1
+        _emit(reservation)
+        return 0
+    print("korail: no matching train with seats", file=sys.stderr)
+    return 1
+
+
+def cmd_reservations(korail, args):
+    for reservation in korail.iter_reservations():
+        _emit(reservation)
+
+
+def cmd_tickets(korail, args):
+    for ticket in korail.iter_tickets(args.date_from, args.date_to):
+        _emit(ticket)
+
+
+def cmd_cancel(korail, args):
+    for reservation in korail.reservations():
+        if reservation.rsv_id == args.rsv_id:
+            korail.cancel(reservation)
+            _emit(reservation)
+            return 0
+    print(f"korail: no reservation {args.rsv_id}", file=sys.stderr)
+    return 1
+
+
+def _add_search_arguments(parser):
+    parser.add_argument("dep", help="출발역, e.g. 서울")
+    parser.add_argument("arr", help="도착역, e.g. 부산")
+    parser.add_argument("--date", help="YYYYMMDD (default: today)")
+    parser.add_argument("--time", help="HHMMSS, earliest departure (default: now)")
+    parser.add_argument("--type", choices=TRAIN_TYPES, default="all")
+    parser.add_argument("--adults", type=int, default=0)
+    parser.add_argument("--children", type=int, default=0)
+    parser.add_argument("--seniors", type=int, default=0)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m Korail", description="Korail client")
+    parser.add_argument("--id", help="Korail id (env KORAIL_ID)")
+    parser.add_argument("--pw", help="Korail password (env KORAIL_PW)")
+    parser.add_argument("--session", help="session file (default: ~/.korail/sessions.json)")
+    parser.add_argument("--no-session", action="store_true", help="do not load or save the session")
+    parser.add_argument("--base-url", help="Korail host, e.g. a local MockKorailServer")
+    parser.add_argument("--timeout", type=float, default=10.0, help="request timeout in seconds")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="trains departing after --time")
+    _add_search_arguments(search)
+    search.add_argument("--available", action="store_true", help="only trains with seats")
+    search.set_defaults(run=cmd_search)
+
+    allday = commands.add_parser("search-allday", help="every train of the day")
+    _add_search_arguments(allday)
+    allday.add_argument("--available", action="store_true", help="only trains with seats")
+    allday.add_argument("--until", help="HHMMSS, latest departure")
+    allday.set_defaults(run=cmd_search_allday)
+
+    reserve = commands.add_parser("reserve", help="reserve the first matching train with seats")
+    _add_search_arguments(reserve)
+    reserve.add_argument("--train", help="train number")
+    reserve.add_argument("--until", help="HHMMSS, latest departure")
+    reserve.add_argument("--seat", choices=SEAT_OPTIONS, default="general-first")
+    reserve.set_defaults(run=cmd_reserve)
+
+    commands.add_parser("reservations", help="list reservations").set_defaults(run=cmd_reservations)
+    tickets = commands.add_parser("tickets", help="list tickets, every page")
+    tickets.add_argument("--from", dest="date_from", help="YYYYMMDD, earliest boarding date")
+    tickets.add_argument("--to", dest="date_to", help="YYYYMMDD, latest boarding date")
+    tickets.set_defaults(run=cmd_tickets)
+
+    cancel = commands.add_parser("cancel", help="cancel a reservation")
+    cancel.add_argument("rsv_id")
+    cancel.set_defaults(run=cmd_cancel)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from .KorailExceptions.KorailExceptions import KorailError
+
+    try:
+        return args.run(_client(args), args) or 0
+    except KorailError as error:
+        print(f"korail: {error}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # `| head` 등으로 출력이 먼저 닫혀도 조용히 끝낸다.
+        sys.stderr.close()
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
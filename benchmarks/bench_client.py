@@ -0,0 +1,116 @@
+"""Throughput and latency of the client against the local Korail stand-in.
+
+Starts a `MockKorailServer` with injected latency and measures search,
+all-day search, reserve (+ cancel) and ticket listing. Results can be
+written as JSON to compare versions. `--transport memory` answers in
+process through `MemoryTransport`, leaving only parsing and client
+overhead.
+
+    python benchmarks/bench_client.py --latency 0.02 --jitter 0.01 --json out.json
+    python benchmarks/bench_client.py --transport memory --latency 0 --jitter 0
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from Korail.Korail import Korail  # noqa: E402
+from Korail.KorailMock.KorailMock import MockKorail, MockKorailServer  # noqa: E402
+from Korail.KorailTransport.KorailTransport import MemoryTransport  # noqa: E402
+
+DATE = "20991010"
+
+
+def percentile(values, q):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def measure(name, operation, iterations, concurrency):
+    latencies = []
+
+    def timed(i):
+        start = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "throughput": iterations / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+
+def run(args):
+    backend = MockKorail(latency=args.latency, jitter=args.jitter, seats=(10 ** 6, 10 ** 6))
+    if args.transport == "memory":
+        server = contextlib.nullcontext()
+    else:
+        server = MockKorailServer(backend)
+    with server:
+        if args.transport == "memory":
+            korail = Korail("010-1234-5678", backend.password, transport=MemoryTransport(backend))
+        else:
+            korail = Korail("010-1234-5678", backend.password, base_url=server.url)
+        trains = korail.search_train_allday("서울", "부산", DATE, "000000")
+
+        def reserve(i):
+            korail.cancel(korail.reserve(trains[i % len(trains)]))
+
+        cases = (
+            ("search_train", lambda i: korail.search_train("서울", "부산", DATE, "000000")),
+            ("search_train_allday", lambda i: korail.search_train_allday("서울", "부산", DATE, "000000")),
+            ("search_train_allday[windows=8]", lambda i: korail.search_train_allday(
+                "서울", "부산", DATE, "000000", windows=8)),
+            ("reserve+cancel", reserve),
+            ("tickets", lambda i: korail.tickets()),
+        )
+        results = []
+        for name, operation in cases:
+            if args.only and name not in args.only:
+                continue
+            iterations = max(1, args.iterations // 5) if "allday" in name or name == "tickets" else args.iterations
+            results.append(measure(name, operation, iterations, args.concurrency))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds added to each call")
+    parser.add_argument("--jitter", type=float, default=0.005, help="max random extra seconds")
+    parser.add_argument("--transport", choices=("http", "memory"), default="http")
+    parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    print(f"{'benchmark':<32} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        print(f"{result['name']:<32} {result['throughput']:>9.1f} "
+              f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Per-object memory and construction time of the Train model.
+
+Compares the slots/field-map `Train` with the previous `__dict__` based
+implementation, kept below as `LegacyTrain`, and with `LoopTrain`, which
+fills the same slots from a plain `for attr, key in fields` loop instead of
+the compiled `_field_loader`.
+
+The memory column is stable. Construction time is a few hundred
+nanoseconds either way and moves with the interpreter and the machine, so
+it is reported as min / median of the repeats; on some machines Train and
+LegacyTrain come out the same.
+
+    python benchmarks/bench_models.py [count]
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import statistics  # noqa: E402
+
+from Korail.KorailClass.KorailClass import Train  # noqa: E402
+
+ROW = {
+    "h_trn_clsf_cd": "100",
+    "h_trn_clsf_nm": "KTX",
+    "h_trn_gp_cd": "100",
+    "h_trn_no": "00101",
+    "h_expct_dlay_hr": "000000",
+    "h_dpt_rs_stn_nm": "서울",
+    "h_dpt_rs_stn_cd": "0001",
+    "h_dpt_dt": "20231010",
+    "h_dpt_tm": "060000",
+    "h_arv_rs_stn_nm": "부산",
+    "h_arv_rs_stn_cd": "0020",
+    "h_arv_dt": "20231010",
+    "h_arv_tm": "083000",
+    "h_run_dt": "20231010",
+    "h_rsv_psb_flg": "Y",
+    "h_rsv_psb_nm": "예약하기\n59,800원",
+    "h_spe_rsv_psb_nm": "예약하기\n83,700원",
+    "h_spe_rsv_nm": "예약가능",
+    "h_gen_rsv_nm": "예약가능",
+}
+
+
+class LegacySchedule:
+    def __init__(self, data):
+        self.train_type = data.get("h_trn_clsf_cd")
+        self.train_name = data.get("h_trn_clsf_nm")
+        self.train_group = data.get("h_trn_gp_cd")
+        self.train_number = data.get("h_trn_no")
+        self.delay_time = data.get("h_expct_dlay_hr")
+
+        self.dep_station_name = data.get("h_dpt_rs_stn_nm")
+        self.dep_code = data.get("h_dpt_rs_stn_cd")
+        self.dep_date = data.get("h_dpt_dt")
+        self.dep_time = data.get("h_dpt_tm")
+
+        self.arr_station_name = data.get("h_arv_rs_stn_nm")
+        self.arr_code = data.get("h_arv_rs_stn_cd")
+        self.arr_date = data.get("h_arv_dt")
+        self.arr_time = data.get("h_arv_tm")
+
+        self.run_date = data.get("h_run_dt")
+
+
+class LegacyTrain(LegacySchedule):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reserve_possible = data.get("h_rsv_psb_flg")
+        self.reserve_possible_price = data.get("h_rsv_psb_nm")
+        self.special_possible_price = data.get("h_spe_rsv_psb_nm")
+
+        self.special_seat_state = data.get("h_spe_rsv_nm")
+        self.general_seat_state = data.get("h_gen_rsv_nm")
+
+
+class LoopTrain(Train):
+    __slots__ = ()
+
+    def _load(self, get):
+        for attr, key in self._fields:
+            setattr(self, attr, get(key))
+
+
+def bytes_per_object(cls, count):
+    rows = [dict(ROW) for _ in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [cls(row) for row in rows]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return size / count
+
+
+def construct_us(cls, count):
+    runs = [x / count * 1e6 for x in timeit.repeat(lambda: cls(ROW), number=count, repeat=7)]
+    return min(runs), statistics.median(runs)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{'model':<12} {'bytes/obj':>10} {'us/obj min / median':>20}")
+    for name, cls in (("LegacyTrain", LegacyTrain), ("Train", Train), ("LoopTrain", LoopTrain)):
+        best, median = construct_us(cls, count)
+        print(f"{name:<12} {bytes_per_object(cls, count):>10.1f} {best:>10.3f} / {median:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Start-up time of `python -m Korail` and of importing the client.
+
+Each case runs in a fresh interpreter `--runs` times; the median wall time
+is reported next to a bare `python -c pass` baseline. With `--budget-ms`
+the script exits non-zero when `--help` takes longer than the budget over
+the baseline, so it can guard start-up time in CI.
+
+    python benchmarks/bench_startup.py --runs 20 --budget-ms 50
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CASES = {
+    "baseline": ["-c", "pass"],
+    "cli --help": ["-m", "Korail", "--help"],
+    "cli usage error": ["-m", "Korail", "search"],
+    "import Korail.Korail": ["-c", "import Korail.Korail"],
+    "import + requests.Session": ["-c", "import Korail.Korail, requests; requests.Session()"],
+}
+
+
+def measure(args, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable] + args, cwd=ROOT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, help="max --help time over the baseline")
+    args = parser.parse_args()
+
+    results = {name: measure(case, args.runs) for name, case in CASES.items()}
+    baseline = results["baseline"]
+    print(f"{'case':<28}{'median ms':>10}{'over base':>11}")
+    for name, value in results.items():
+        print(f"{name:<28}{value:>10.1f}{value - baseline:>11.1f}")
+
+    loaded = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, Korail.__main__ as m\n"
+         "try:\n    m.main(['--help'])\nexcept SystemExit:\n    pass\n"
+         "print('requests' in sys.modules)"],
+        cwd=ROOT, capture_output=True, text=True,
+    ).stdout.split()[-1]
+    print(f"--help imports requests: {loaded}")
+
+    if args.budget_ms is not None and results["cli --help"] - baseline > args.budget_ms:
+        sys.exit(f"cli --help over budget: {results['cli --help'] - baseline:.1f} ms > {args.budget_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
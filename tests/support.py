@@ -0,0 +1,34 @@
+"""Helpers shared by the offline tests; nothing here talks to Korail."""
+from Korail.Korail import Korail
+from Korail.KorailMock.KorailMock import MockKorail, MockTrain
+from Korail.KorailTransport.KorailTransport import MemoryTransport
+
+KORAIL_ID = "010-1234-5678"
+KORAIL_PW = "password"
+DATE = "20991010"
+
+
+def mock_korail(backend=None, **kwargs):
+    """A logged-in `Korail` answered in process by `backend` (a fresh
+    `MockKorail` by default)."""
+    backend = backend if backend is not None else MockKorail()
+    return Korail(KORAIL_ID, KORAIL_PW, transport=MemoryTransport(backend), **kwargs)
+
+
+def add_train(backend, dep_time, dep="서울", arr="부산", date=DATE, number="999", seats=(5, 5)):
+    """Append a KTX leaving at `dep_time` to the mock's schedule of the day."""
+    trains = backend._schedule(dep, arr, date)
+    train = MockTrain(number, "100", "KTX", dep, arr, date, dep_time, "235959",
+                      seats[0], seats[1], 59800, 83700)
+    trains.append(train)
+    return train
+
+
+class Clock:
+    """A clock for `clock=` arguments that only moves when told to."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from Korail.Korail import Korail
+from Korail.KorailAsync.KorailAsync import AsyncKorail
+from Korail.KorailCache.KorailCache import SearchCache
+from Korail.KorailClass.KorailClass import SearchResult
+from Korail.KorailExceptions.KorailExceptions import InvalidStationError, NetworkError
+from Korail.KorailMetrics.KorailMetrics import Metrics
+from Korail.KorailMock.KorailMock import MockKorail, MockKorailServer
+from Korail.KorailStation.KorailStation import StationDB
+from Korail.KorailStore.KorailStore import FileSessionStore
+from Korail.KorailTable.KorailTable import TrainTable
+
+from .support import DATE, KORAIL_ID, KORAIL_PW
+
+
+class AsyncKorailTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail()
+        self.server = MockKorailServer(self.backend).start()
+        self.addCleanup(self.server.stop)
+
+    def calls(self, endpoint):
+        return self.backend.calls.get(endpoint, 0)
+
+    def run_async(self, test, **kwargs):
+        async def main():
+            async with AsyncKorail(KORAIL_ID, KORAIL_PW, base_url=self.server.url, **kwargs) as korail:
+                return await test(korail)
+        return asyncio.run(asyncio.wait_for(main(), 10))
+
+    def test_search_range(self):
+        async def test(korail):
+            summaries = [x async for x in korail.search_range("서울", "부산", "20991010", "20991012")]
+            self.assertEqual(sorted(x.date for x in summaries), ["20991010", "20991011", "20991012"])
+            self.assertTrue(all(x.count == 60 for x in summaries))
+        self.run_async(test)
+
+    def test_iter_search_train(self):
+        async def test(korail):
+            trains = [x async for x in korail.iter_search_train("서울", "부산", DATE, "060000")]
+            self.assertEqual(len(trains), len(await korail.search_train("서울", "부산", DATE, "060000")))
+        self.run_async(test)
+
+    def test_search_train_as_table(self):
+        async def test(korail):
+            trains = await korail.search_train("서울", "부산", DATE, "060000", available_only=True)
+            self.assertIsInstance(trains, SearchResult)
+            table = await korail.search_train("서울", "부산", DATE, "060000", available_only=True, as_table=True)
+            self.assertIsInstance(table, TrainTable)
+            self.assertEqual([x.key() for x in table], [x.key() for x in trains])
+            allday = await korail.search_train_allday("서울", "부산", DATE, "000000", as_table=True)
+            self.assertEqual(len(allday), 60)
+        self.run_async(test)
+
+    def test_cache(self):
+        async def test(korail):
+            results = await asyncio.gather(*(
+                korail.search_train("서울", "부산", DATE, "060000") for i in range(5)
+            ))
+            self.assertEqual(self.calls("ScheduleView"), 1)
+            self.assertEqual(len({len(x) for x in results}), 1)
+            results[0].clear()
+            self.assertTrue(await korail.search_train("서울", "부산", DATE, "060000"))
+            self.assertEqual(self.calls("ScheduleView"), 1)
+            await korail.search_train("서울", "부산", DATE, "060000", max_age=0)
+            self.assertEqual(self.calls("ScheduleView"), 2)
+        self.run_async(test, cache=SearchCache(ttl=60))
+
+    def test_station_db(self):
+        station_db = StationDB(path=None, stations=[("0001", "서울", "경부선"), ("0020", "부산", "경부선")])
+
+        async def test(korail):
+            with self.assertRaises(InvalidStationError):
+                await korail._search("서울", "평양", DATE, "060000")
+            self.assertEqual(self.calls("ScheduleView"), 0)
+        self.run_async(test, station_db=station_db)
+
+    def test_session_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FileSessionStore(os.path.join(tmp, "sessions.json"))
+
+            async def test(korail):
+                self.assertIsNotNone(store.load(KORAIL_ID))
+                return korail.name
+            self.assertEqual(self.run_async(test, session_store=store), "홍길동")
+            self.assertEqual(self.calls("Login"), 1)
+
+            async def restored(korail):
+                self.assertTrue(korail.is_login)
+                self.assertTrue(await korail.search_train("서울", "부산", DATE, "060000"))
+                await korail.logout()
+                self.assertIsNone(store.load(KORAIL_ID))
+            self.run_async(restored, session_store=store)
+            # 저장된 세션을 되살렸으니 다시 로그인하지 않는다.
+            self.assertEqual(self.calls("Login"), 1)
+            self.assertEqual(self.calls("logout"), 1)
+
+    def test_logout_is_measured(self):
+        metrics = Metrics()
+
+        async def test(korail):
+            await korail.logout()
+            self.assertFalse(korail.is_login)
+        self.run_async(test, metrics=metrics)
+        self.assertIn("logout", metrics.latency)
+
+    def test_sync_path_is_refused(self):
+        async def test(korail):
+            with self.assertRaises(NotImplementedError):
+                next(Korail.iter_search_train(korail, "서울", "부산", DATE, "060000"))
+        self.run_async(test)
+
+    def test_reserve_and_iter_reservations(self):
+        async def test(korail):
+            trains = [x for x in await korail.search_train("서울", "부산", DATE, "060000") if x.seat_available()]
+            results = await korail.reserve_many(trains[:2])
+            self.assertTrue(all(x.ok for x in results))
+            rsv_ids = sorted([x.rsv_id async for x in korail.iter_reservations()])
+            self.assertEqual(rsv_ids, sorted(x.value.rsv_id for x in results))
+            cancelled = await korail.cancel_many([x.value for x in results])
+            self.assertTrue(all(x.ok for x in cancelled))
+            self.assertEqual([x async for x in korail.iter_reservations()], [])
+        self.run_async(test)
+
+    def test_tickets(self):
+        async def test(korail):
+            self.assertEqual(len(await korail.tickets()), 20)
+        self.run_async(test)
+
+    def test_key_refresher(self):
+        tasks = []
+
+        async def test(korail):
+            before = self.calls("Login")
+            tasks.append(korail.start_key_refresher(0.05))
+            await asyncio.sleep(0.3)
+            self.assertGreater(self.calls("Login"), before)
+        self.run_async(test)
+        self.assertTrue(tasks[0].done())
+
+    def test_key_refresher_survives_errors(self):
+        async def test(korail):
+            login = korail.login
+            failures = []
+
+            async def flaky():
+                if len(failures) < 2:
+                    failures.append(1)
+                    raise (NetworkError() if failures == [1] else RuntimeError("bug"))
+                return await login()
+
+            korail.login = flaky
+            before = self.calls("Login")
+            task = korail.start_key_refresher(0.05)
+            await asyncio.sleep(0.4)
+            self.assertFalse(task.done())
+            self.assertEqual(len(failures), 2)
+            self.assertGreater(self.calls("Login"), before)
+        self.run_async(test)
+
+
+if __name__ == "__main__":
+    unittest.main()
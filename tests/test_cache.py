@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from Korail.KorailAsync.KorailAsync import AsyncKorail
+from Korail.KorailCache.KorailCache import SearchCache
+from Korail.KorailClass.KorailClass import SearchResult
+from Korail.KorailMock.KorailMock import MockKorail, MockKorailServer
+
+from .support import DATE, KORAIL_ID, KORAIL_PW, Clock, mock_korail
+
+FAIL = {"strResult": "FAIL", "h_msg_cd": "WRD000", "h_msg_txt": "시스템 오류"}
+
+
+class SearchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+
+    def test_ttl_and_max_age(self):
+        cache = SearchCache(ttl=10, clock=self.clock)
+        self.assertEqual(cache.get("key", lambda: "old"), "old")
+        self.assertEqual(cache.get("key", lambda: "new"), "old")
+        self.assertEqual(cache.get("key", lambda: "new", max_age=0), "new")
+        self.clock.now = 20
+        self.assertEqual(cache.get("key", lambda: "newer"), "newer")
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_concurrent_misses_share_one_call(self):
+        cache = SearchCache(ttl=10)
+        calls = []
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("key", slow))) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_lru_eviction(self):
+        cache = SearchCache(ttl=10, max_entries=2, clock=self.clock)
+        for key in "abc":
+            cache.get(key, lambda: key)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a", lambda: "again"), "again")
+
+    def test_stale_read_does_not_block(self):
+        cache = SearchCache(ttl=1, stale_ttl=100, clock=self.clock)
+        cache.get("key", lambda: "old")
+        self.clock.now = 5
+        refreshed = threading.Event()
+
+        def slow():
+            refreshed.wait(5)
+            return "new"
+
+        started = time.monotonic()
+        self.assertEqual(cache.get("key", slow), "old")
+        self.assertEqual(cache.get("key", slow), "old")
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+        refreshed.set()
+        deadline = time.monotonic() + 5
+        while cache.get("key", slow) != "new" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(cache.get("key", slow), "new")
+
+
+class CachedSearchTest(unittest.TestCase):
+    def test_search_returns_copy_of_cached_result(self):
+        backend = MockKorail()
+        korail = mock_korail(backend, cache=SearchCache(ttl=60))
+        first = korail.search_train("서울", "부산", DATE, "060000")
+        count = len(first)
+        first.clear()
+        second = korail.search_train("서울", "부산", DATE, "060000")
+        self.assertEqual(len(second), count)
+        self.assertIsNot(second, first)
+        self.assertEqual(backend.calls["ScheduleView"], 1)
+
+    def test_failed_search_returns_empty_result(self):
+        backend = MockKorail()
+        korail = mock_korail(backend)
+        backend.handlers["ScheduleView"] = lambda form: FAIL
+        with self.assertLogs("Korail.Korail", "WARNING"):
+            trains = korail.search_train("서울", "부산", DATE, "060000")
+        self.assertIsInstance(trains, SearchResult)
+        self.assertEqual(len(trains), 0)
+        self.assertIsInstance(korail.search_train("서울", "부산", DATE, "235959"), SearchResult)
+
+    def test_async_failed_search_returns_empty_result(self):
+        backend = MockKorail()
+
+        async def search(url):
+            async with AsyncKorail(KORAIL_ID, KORAIL_PW, base_url=url) as korail:
+                backend.handlers["ScheduleView"] = lambda form: FAIL
+                return await korail.search_train("서울", "부산", DATE, "060000")
+
+        with MockKorailServer(backend) as server:
+            trains = asyncio.run(asyncio.wait_for(search(server.url), 10))
+        self.assertIsInstance(trains, SearchResult)
+        self.assertEqual(len(trains), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
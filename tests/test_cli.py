@@ -0,0 +1,108 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from Korail.Korail import Korail
+from Korail.KorailMock.KorailMock import MockKorail, MockKorailServer
+from Korail.__main__ import main
+
+from .support import DATE, KORAIL_ID, KORAIL_PW
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CliTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockKorailServer(MockKorail()).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {"KORAIL_ID": KORAIL_ID, "KORAIL_PW": KORAIL_PW})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_cli(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = main(["--base-url", self.server.url, "--no-session", *argv])
+        lines = [json.loads(x) for x in stdout.getvalue().splitlines()]
+        return code, lines, stderr.getvalue()
+
+    def test_usage_errors_exit_2(self):
+        for argv in ([], ["search"], ["search", "서울", "부산", "--type", "bullet"], ["frobnicate"]):
+            with self.subTest(argv=argv), contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit) as raised:
+                    main(argv)
+                self.assertEqual(raised.exception.code, 2)
+
+    def test_missing_credentials(self):
+        os.environ.pop("KORAIL_ID")
+        with self.assertRaises(SystemExit) as raised:
+            self.run_cli("reservations")
+        self.assertIn("KORAIL_ID", str(raised.exception.code))
+
+        os.environ["KORAIL_ID"] = KORAIL_ID
+        os.environ.pop("KORAIL_PW")
+        with tempfile.TemporaryDirectory() as tmp, self.assertRaises(SystemExit) as raised:
+            main(["--base-url", self.server.url, "--session", os.path.join(tmp, "sessions.json"), "reservations"])
+        self.assertIn("KORAIL_PW", str(raised.exception.code))
+
+    def test_login_failure(self):
+        with self.assertRaises(SystemExit) as raised:
+            self.run_cli("--pw", "wrong", "reservations")
+        self.assertEqual(raised.exception.code, "korail: login failed")
+
+    def test_search_writes_ndjson(self):
+        code, lines, stderr = self.run_cli("search", "서울", "부산", "--date", DATE, "--time", "060000")
+        self.assertEqual(code, 0)
+        self.assertTrue(lines)
+        self.assertTrue(all(x["dep_time"] >= "060000" for x in lines))
+
+    def test_reserve_and_cancel(self):
+        code, lines, stderr = self.run_cli("reserve", "서울", "부산", "--date", DATE, "--time", "060000")
+        self.assertEqual(code, 0)
+        rsv_id = lines[0]["rsv_id"]
+        code, lines, stderr = self.run_cli("cancel", rsv_id)
+        self.assertEqual((code, lines[0]["rsv_id"]), (0, rsv_id))
+        code, lines, stderr = self.run_cli("cancel", rsv_id)
+        self.assertEqual(code, 1)
+        self.assertIn(rsv_id, stderr)
+
+    def test_reserve_failure_exits_1(self):
+        with mock.patch.object(Korail, "reserve", return_value=None):
+            code, lines, stderr = self.run_cli("reserve", "서울", "부산", "--date", DATE, "--time", "060000")
+        self.assertEqual((code, lines), (1, []))
+        self.assertIn("failed", stderr)
+
+    def test_no_matching_train_exits_1(self):
+        code, lines, stderr = self.run_cli("reserve", "서울", "부산", "--date", DATE, "--train", "99999")
+        self.assertEqual((code, lines), (1, []))
+        self.assertIn("no matching train", stderr)
+
+
+class CliStartupTest(unittest.TestCase):
+    def test_usage_error_does_not_load_the_http_stack(self):
+        script = (
+            "import sys\n"
+            "from Korail.__main__ import main\n"
+            "try:\n"
+            "    main(['search'])\n"
+            "except SystemExit as e:\n"
+            "    print(e.code, 'requests' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.stdout.split(), ["2", "False"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from Korail.KorailConstants.KorailConstants import SeatState
+from Korail.KorailDiff.KorailDiff import SnapshotDiffer, TrainChange
+from Korail.KorailMock.KorailMock import MockKorail
+
+from .support import DATE, add_train, mock_korail
+
+QUERY = ("서울", "부산", DATE, "000000")
+
+
+class SnapshotDifferTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail()
+        self.korail = mock_korail(self.backend)
+        self.schedule = self.backend._schedule("서울", "부산", DATE)
+        self.differ = SnapshotDiffer()
+
+    def search(self):
+        return self.korail.search_train(*QUERY)
+
+    def test_first_snapshot_is_the_baseline(self):
+        self.assertEqual(self.differ.update(QUERY, self.search()), [])
+        self.assertEqual(self.differ.update(QUERY, self.search()), [])
+        self.assertEqual(len(self.differ), 1)
+        self.assertEqual(list(self.differ.events(timeout=0)), [])
+
+        initial = SnapshotDiffer(emit_initial=True).update(QUERY, self.search())
+        self.assertTrue(initial)
+        self.assertTrue(all(x.kind == TrainChange.APPEARED for x in initial))
+
+    def test_added_removed_and_changed_trains(self):
+        first = self.search()
+        self.differ.update(QUERY, first)
+        seen = []
+        self.differ.on_change(seen.append)
+
+        removed, sold_out, opened, repriced = self.schedule[:4]
+        self.schedule.remove(removed)
+        sold_out.general_seats = 0
+        opened.general_seats = opened.special_seats = 0
+        added = add_train(self.backend, "050000", number="998")
+        self.schedule.sort(key=lambda x: x.dep_time)
+        changes = self.differ.update(QUERY, self.search())
+        opened.special_seats = 3
+        repriced.special_fare += 1000
+        changes += self.differ.update(QUERY, self.search())
+
+        summary = {(x.kind, x.train.train_number if x.train else x.old.train_number, x.field) for x in changes}
+        self.assertEqual(summary, {
+            (TrainChange.APPEARED, added.number, None),
+            (TrainChange.DISAPPEARED, removed.number, None),
+            (TrainChange.SEAT, sold_out.number, "general"),
+            (TrainChange.SEAT, opened.number, "general"),
+            (TrainChange.SEAT, opened.number, "special"),
+            (TrainChange.FARE, repriced.number, "special"),
+        })
+        by_kind = {(x.kind, x.field, (x.train or x.old).train_number): x for x in changes}
+        self.assertTrue(by_kind[(TrainChange.SEAT, "general", sold_out.number)].sold_out)
+        reopened = [x for x in changes if x.opened]
+        self.assertEqual([(x.train.train_number, x.field) for x in reopened], [(opened.number, "special")])
+        self.assertEqual(reopened[0].after, SeatState.AVAILABLE)
+        fare = by_kind[(TrainChange.FARE, "special", repriced.number)]
+        self.assertEqual(fare.after - fare.before, 1000)
+
+        self.assertEqual(seen, changes)
+        self.assertEqual(list(self.differ.events(timeout=0)), changes)
+        self.assertEqual(changes[0].query, QUERY)
+
+    def test_queries_are_kept_apart(self):
+        self.differ.update(QUERY, self.search())
+        other = ("서울", "부산", DATE, "120000")
+        self.assertEqual(self.differ.update(other, self.korail.search_train(*other)), [])
+        self.differ.forget(QUERY)
+        self.assertIsNone(self.differ.snapshot(QUERY))
+        self.assertEqual(len(self.differ), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
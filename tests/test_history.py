@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from Korail.KorailClass.KorailClass import parse_price
+from Korail.KorailConstants.KorailConstants import SeatState
+from Korail.KorailHistory.KorailHistory import SeatHistory
+from Korail.KorailMock.KorailMock import MockKorail
+
+from .support import DATE, mock_korail
+
+
+class SeatHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "history.sqlite3")
+        self.backend = MockKorail()
+        self.schedule = self.backend._schedule("서울", "부산", DATE)
+        self.first = self.schedule[0]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def search(self, korail):
+        return korail.search_train("서울", "부산", DATE, "000000")
+
+    def test_recorder_round_trip(self):
+        with SeatHistory(self.path) as history:
+            korail = mock_korail(self.backend, recorder=history)
+            trains = self.search(korail)
+            records = list(history.query(dep="서울", arr="부산", dep_date=DATE))
+        self.assertEqual(len(records), len(trains))
+        by_key = {x.key(): x for x in records}
+        for train in trains:
+            record = by_key[(train.train_number, train.dep_date, train.dep_time)]
+            self.assertEqual(record.general, SeatState.from_text(train.general_seat_state))
+            self.assertEqual(record.special, SeatState.from_text(train.special_seat_state))
+            self.assertEqual(record.general_fare, parse_price(train.reserve_possible_price))
+            self.assertEqual(record.special_fare, parse_price(train.special_possible_price))
+            self.assertEqual((record.dep_name, record.arr_name), ("서울", "부산"))
+            self.assertEqual(record.ts, int(trains.fetched_at))
+
+    def test_query_filters_and_order(self):
+        korail = mock_korail(self.backend)
+        with SeatHistory(self.path) as history:
+            trains = self.search(korail)
+            history.record(trains, fetched_at=200)
+            history.record(trains, fetched_at=100)
+            self.assertEqual(len(history), 2 * len(trains))
+            self.assertEqual([x.ts for x in history.query(batch_size=3)][::len(trains)], [100, 200])
+            self.assertEqual({x.ts for x in history.query(since=150)}, {200})
+            self.assertEqual({x.ts for x in history.query(until=150)}, {100})
+            self.assertEqual(list(history.query(dep="부산")), [])
+            self.assertEqual([x.ts for x in history.train(self.first.number, DATE)], [100, 200])
+
+    def test_changes_only(self):
+        korail = mock_korail(self.backend)
+        with SeatHistory(self.path, changes_only=True) as history:
+            count = history.record(self.search(korail), fetched_at=100)
+            self.assertEqual(history.record(self.search(korail), fetched_at=200), 0)
+            self.first.general_seats = 0
+            self.assertEqual(history.record(self.search(korail), fetched_at=300), 1)
+            self.assertEqual(len(history), count + 1)
+
+    def test_openings(self):
+        korail = mock_korail(self.backend)
+        self.first.general_seats = self.first.special_seats = 0
+        with SeatHistory(self.path) as history:
+            history.record(self.search(korail), fetched_at=100)
+            self.first.special_seats = 2
+            history.record(self.search(korail), fetched_at=200)
+            history.record(self.search(korail), fetched_at=300)
+            openings = list(history.openings(dep="서울", arr="부산"))
+            self.assertEqual([(x.train_number, x.ts) for x in openings], [(self.first.number, 200)])
+            self.assertEqual(openings[0].special, SeatState.AVAILABLE)
+            self.assertEqual(list(history.openings(since=250)), [])
+
+    def test_reopen_keeps_history(self):
+        korail = mock_korail(self.backend)
+        with SeatHistory(self.path) as history:
+            count = history.record(self.search(korail), fetched_at=100)
+        with SeatHistory(self.path) as history:
+            self.assertEqual(len(history), count)
+            history.record(self.search(korail), fetched_at=200)
+            self.assertEqual(len(history), 2 * count)
+
+
+if __name__ == "__main__":
+    unittest.main()
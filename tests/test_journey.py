@@ -0,0 +1,113 @@
+import unittest
+from datetime import timedelta
+
+from Korail.KorailJourney.KorailJourney import JourneyPlanner, RouteGraph, join_legs
+from Korail.KorailMock.KorailMock import STATIONS, MockKorail
+from Korail.KorailStation.KorailStation import StationDB
+
+from .support import DATE, mock_korail
+
+LINE = ("서울", "영등포", "수원", "대전", "동대구", "부산")
+
+
+def _station_db():
+    return StationDB(path=None, stations=[(STATIONS[x], x, "경부선") for x in LINE])
+
+
+class RouteGraphTest(unittest.TestCase):
+    def test_fresh_graph_has_no_candidates(self):
+        self.assertEqual(RouteGraph().transfer_candidates("서울", "부산"), [])
+
+    def test_seeded_graph_offers_stations_on_the_line(self):
+        graph = RouteGraph.from_station_db(_station_db())
+        self.assertEqual(sorted(graph.transfer_candidates("서울", "부산")), sorted(LINE[1:-1]))
+        self.assertEqual(len(graph.transfer_candidates("서울", "부산", limit=2)), 2)
+
+    def test_observed_running_times_rank_candidates(self):
+        graph = RouteGraph.from_station_db(_station_db())
+        graph.add_edge("서울", "대전", 60)
+        graph.add_edge("대전", "부산", 90)
+        self.assertEqual(graph.transfer_candidates("서울", "부산")[0], "대전")
+        self.assertEqual(graph.minutes("서울", "대전"), 60)
+
+
+class JoinLegsTest(unittest.TestCase):
+    def setUp(self):
+        self.korail = mock_korail(MockKorail())
+
+    def test_connections_respect_min_connection_and_max_wait(self):
+        first = self.korail.search_train_allday("서울", "대전", DATE, "000000")
+        second = self.korail.search_train_allday("대전", "부산", DATE, "000000")
+        itineraries = join_legs(first, second, timedelta(minutes=10), timedelta(hours=3), connections=2)
+        self.assertTrue(itineraries)
+        for itinerary in itineraries:
+            wait, = itinerary.transfer_waits()
+            self.assertTrue(timedelta(minutes=10) <= wait <= timedelta(hours=3))
+            self.assertEqual(itinerary.transfer_stations, ["대전"])
+
+
+class JourneyPlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail()
+        self.korail = mock_korail(self.backend)
+
+    def assertRanked(self, itineraries):
+        keys = [(x.arrival, x.duration, x.transfers) for x in itineraries]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_unseeded_planner_finds_direct_trains_only(self):
+        planner = JourneyPlanner(self.korail)
+        itineraries = planner.plan("서울", "부산", DATE, "060000")
+        self.assertTrue(itineraries)
+        self.assertTrue(all(x.transfers == 0 for x in itineraries))
+        self.assertEqual(planner.plan("서울", "부산", DATE, "060000", direct=False), [])
+
+    def test_via_finds_connections(self):
+        planner = JourneyPlanner(self.korail)
+        itineraries = planner.plan("서울", "부산", DATE, "060000", via=["대전"], direct=False)
+        self.assertTrue(itineraries)
+        self.assertRanked(itineraries)
+        for itinerary in itineraries:
+            self.assertEqual(itinerary.transfer_stations, ["대전"])
+            self.assertTrue(itinerary.seat_available())
+        # 검색한 구간은 그래프에 남아 다음 계획의 후보가 된다.
+        self.assertEqual(planner.graph.transfer_candidates("서울", "부산"), ["대전"])
+
+    def test_planner_seeds_from_station_db(self):
+        self.korail.station_db = _station_db()
+        planner = JourneyPlanner(self.korail, max_workers=4)
+        itineraries = planner.plan("서울", "부산", DATE, "060000", direct=False, max_via=2, limit=50)
+        self.assertTrue(itineraries)
+        self.assertRanked(itineraries)
+        self.assertTrue(all(x.transfers == 1 for x in itineraries))
+        self.assertLessEqual(len({x.transfer_stations[0] for x in itineraries}), 2)
+
+    def test_mixed_plan_is_ranked(self):
+        planner = JourneyPlanner(self.korail)
+        itineraries = planner.plan("서울", "부산", DATE, "060000", via=["대전", "동대구"], limit=30)
+        self.assertRanked(itineraries)
+        self.assertEqual(len(itineraries), 30)
+
+    def test_reserve_books_both_legs(self):
+        planner = JourneyPlanner(self.korail)
+        itinerary = next(
+            x for x in planner.plan("서울", "부산", DATE, "060000", via=["대전"], direct=False, limit=50)
+            if all(leg.general_seat_available() for leg in x.legs)
+        )
+        first, second = [
+            self.backend._find_train(DATE, x.train_number, STATIONS[x.dep_station_name],
+                                     STATIONS[x.arr_station_name])
+            for x in itinerary.legs
+        ]
+        seats = first.general_seats, second.general_seats
+
+        reservation = self.korail.reserve(itinerary)
+        self.assertIsNotNone(reservation)
+        self.assertEqual(reservation.journey_cnt, "02")
+        self.assertEqual(reservation.price, first.general_fare + second.general_fare)
+        self.assertEqual((first.general_seats, second.general_seats), (seats[0] - 1, seats[1] - 1))
+        self.assertIn(reservation.rsv_id, [x.rsv_id for x in self.korail.reservations()])
+
+
+if __name__ == "__main__":
+    unittest.main()
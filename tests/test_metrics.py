@@ -0,0 +1,86 @@
+import unittest
+from contextlib import contextmanager
+
+from Korail.KorailExceptions.KorailExceptions import NetworkError
+from Korail.KorailMetrics.KorailMetrics import Metrics, endpoint_name
+from Korail.KorailMock.KorailMock import MockKorail
+from Korail.KorailPolicy.KorailPolicy import RequestPolicy
+
+from .support import DATE, mock_korail
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail()
+        self.metrics = Metrics()
+        self.events = []
+        self.metrics.add_hook(self.events.append)
+        self.korail = mock_korail(self.backend, metrics=self.metrics)
+
+    def test_endpoint_name(self):
+        self.assertEqual(endpoint_name("https://x/classes/com.korail.mobile.seatMovie.ScheduleView?a=1"),
+                         "ScheduleView")
+
+    def test_every_call_is_recorded(self):
+        self.korail.search_train("서울", "부산", DATE, "060000")
+        self.korail.logout()
+        endpoints = [x.endpoint for x in self.events]
+        self.assertIn("ScheduleView", endpoints)
+        self.assertEqual(endpoints[-1], "logout")
+        for event in self.events:
+            self.assertIsNone(event.error)
+            self.assertEqual(event.result, "SUCC")
+            self.assertGreater(event.bytes, 0)
+        self.assertEqual(self.metrics.latency["ScheduleView"].count, endpoints.count("ScheduleView"))
+
+    def test_span_hooks_wrap_calls(self):
+        spans = []
+
+        @contextmanager
+        def span(endpoint):
+            spans.append(endpoint)
+            yield
+
+        self.metrics.add_span_hook(span)
+        self.korail.logout()
+        self.assertEqual(spans, ["logout"])
+
+    def test_errors_are_counted(self):
+        def down(method, path, form):
+            if path.endswith("ScheduleView"):
+                return 503, {}
+            return self.backend.handle(method, path, form)
+
+        korail = mock_korail(down, metrics=self.metrics, policy=RequestPolicy(retries=0))
+        with self.assertRaises(NetworkError):
+            korail._search("서울", "부산", DATE, "060000")
+        self.assertEqual(self.metrics.errors[("ScheduleView", "NetworkError")], 1)
+        self.assertIsInstance(self.events[-1].error, NetworkError)
+
+    def test_logout_goes_through_the_policy(self):
+        policy = RequestPolicy(retries=1, backoff=0)
+        korail = mock_korail(self.backend, policy=policy)
+        failures = [1]
+
+        def flaky(method, path, form):
+            if path.endswith("logout") and failures[0]:
+                failures[0] -= 1
+                return 503, {}
+            return self.backend.handle(method, path, form)
+
+        korail.transport.handler = flaky
+        korail.logout()
+        self.assertFalse(korail.is_login)
+        self.assertEqual(self.backend.calls["logout"], 1)
+
+    def test_prometheus(self):
+        self.korail.logout()
+        text = self.metrics.to_prometheus()
+        self.assertIn('korail_requests_total{endpoint="logout",result="SUCC",code=""} 1', text)
+        self.assertIn('korail_request_duration_seconds_count{endpoint="logout"} 1', text)
+        self.assertIn('korail_request_duration_seconds_bucket{endpoint="logout",le="+Inf"} 1', text)
+        self.assertTrue(text.endswith("\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from urllib.parse import parse_qsl
+
+from Korail.KorailClass.KorailClass import (
+    AdultPassenger, ChildPassenger, Passenger, PassengerSet, SeniorPassenger
+)
+
+from .support import DATE, mock_korail
+
+
+class PassengerReduceTest(unittest.TestCase):
+    def test_merges_regardless_of_order(self):
+        first = AdultPassenger(1)
+        merged = Passenger.reduce([first, ChildPassenger(1), AdultPassenger(2), SeniorPassenger(1)])
+        self.assertEqual([(type(x), x.count) for x in merged],
+                         [(AdultPassenger, 3), (ChildPassenger, 1), (SeniorPassenger, 1)])
+        # 합쳐도 넘겨받은 객체는 바뀌지 않는다.
+        self.assertEqual(first.count, 1)
+
+    def test_adult_and_senior_stay_apart(self):
+        # 경로는 typecode 가 어른과 같아도 할인 종류로 나뉜다.
+        merged = Passenger.reduce([AdultPassenger(), SeniorPassenger(), AdultPassenger()])
+        self.assertEqual([(type(x), x.count) for x in merged], [(AdultPassenger, 2), (SeniorPassenger, 1)])
+
+    def test_drops_zero_counts(self):
+        self.assertEqual(Passenger.reduce([ChildPassenger(0)]), [])
+
+    def test_rejects_other_types(self):
+        with self.assertRaises(TypeError):
+            Passenger.reduce([AdultPassenger(), "adult"])
+
+
+class PassengerSetTest(unittest.TestCase):
+    def test_equal_sets_hash_alike(self):
+        a = PassengerSet([AdultPassenger(), ChildPassenger(2), AdultPassenger()])
+        b = PassengerSet([ChildPassenger(1), AdultPassenger(2), ChildPassenger(1)])
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertNotEqual(a, PassengerSet([AdultPassenger(2), ChildPassenger(1)]))
+        self.assertEqual((a.adult_count, a.child_count, a.senior_count, a.total), (2, 2, 0, 4))
+
+    def test_default_and_of(self):
+        default = PassengerSet()
+        self.assertEqual((default.adult_count, default.total), (1, 1))
+        self.assertIs(PassengerSet.of(default), default)
+        self.assertEqual(PassengerSet.of(None), default)
+
+    def test_form(self):
+        form = PassengerSet([AdultPassenger(), SeniorPassenger(), AdultPassenger()]).form()
+        self.assertEqual(form["txtPsgTpCd1"], "1")
+        self.assertEqual(form["txtCompaCnt1"], 2)
+        self.assertEqual(form["txtDiscKndCd2"], "131")
+        self.assertEqual(form["txtCompaCnt2"], 1)
+        self.assertNotIn("txtPsgTpCd3", form)
+
+    def test_search_query_uses_merged_counts(self):
+        korail = mock_korail()
+        passengers = [AdultPassenger(), ChildPassenger(), AdultPassenger(), SeniorPassenger()]
+        url, query = korail._search_query("서울", "부산", DATE, "060000", "109", passengers)
+        fields = dict(parse_qsl(query, keep_blank_values=True))
+        self.assertTrue(url.endswith("ScheduleView"))
+        self.assertEqual((fields["txtPsgFlg_1"], fields["txtPsgFlg_2"], fields["txtPsgFlg_3"]), ("2", "1", "1"))
+        self.assertEqual((fields["txtGoAbrdDt"], fields["txtGoHour"]), (DATE, "060000"))
+        same = korail._search_query("서울", "부산", DATE, "060000", "109", PassengerSet(passengers[::-1]))
+        self.assertEqual(same, (url, query))
+
+
+if __name__ == "__main__":
+    unittest.main()
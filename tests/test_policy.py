@@ -0,0 +1,128 @@
+import unittest
+
+from Korail.KorailExceptions.KorailExceptions import (
+    CircuitOpenError, KorailError, NetworkError, ServerBusyError
+)
+from Korail.KorailMock.KorailMock import MockKorail
+from Korail.KorailPolicy.KorailPolicy import CircuitBreaker, RequestPolicy
+
+from .support import DATE, Clock, mock_korail
+
+BUSY = {"strResult": "FAIL", "h_msg_cd": "BUSY01", "h_msg_txt": "잠시 후 다시 시도하십시오."}
+
+
+def _busy_schedule(backend, times):
+    """A handler answering `times` ScheduleView requests with BUSY01,
+    then passing everything on to `backend`."""
+    left = [times]
+
+    def handler(method, path, form):
+        if path.endswith("ScheduleView") and left[0]:
+            left[0] -= 1
+            return 200, BUSY
+        return backend.handle(method, path, form)
+
+    handler.left = left
+    return handler
+
+
+class BreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=self.clock)
+        self.policy = RequestPolicy(retries=0, breaker=self.breaker)
+
+    def _open(self):
+        self.breaker.failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.clock.now += 10
+
+    def test_open_rejects_until_reset_timeout(self):
+        self.breaker.failure()
+        with self.assertRaises(CircuitOpenError):
+            self.policy.call("ScheduleView", lambda timeout: {"strResult": "SUCC"})
+
+    def test_half_open_trial_success_closes(self):
+        self._open()
+        self.policy.call("ScheduleView", lambda timeout: {"strResult": "SUCC"})
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_trial_failure_reopens(self):
+        self._open()
+
+        def down(timeout):
+            raise NetworkError()
+
+        with self.assertRaises(NetworkError):
+            self.policy.call("ScheduleView", down)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_half_open_trial_unexpected_error_reopens(self):
+        self._open()
+
+        def broken(timeout):
+            raise ValueError("undecodable body")
+
+        with self.assertRaises(ValueError):
+            self.policy.call("ScheduleView", broken)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        # 시험 요청이 풀려야 다음 재시도 시각에 다시 시험할 수 있다.
+        self.clock.now += 10
+        self.policy.call("ScheduleView", lambda timeout: {"strResult": "SUCC"})
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_stream_reports_trial_outcome(self):
+        korail = mock_korail(policy=self.policy)
+        self._open()
+        self.assertTrue(list(korail.iter_search_train("서울", "부산", DATE, "060000")))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+class TransientCodesTest(unittest.TestCase):
+    def test_default_policy_treats_no_code_as_transient(self):
+        self.assertEqual(RequestPolicy().transient_codes, frozenset())
+        backend = MockKorail()
+        handler = _busy_schedule(backend, 1)
+        korail = mock_korail(handler)
+        with self.assertRaises(KorailError) as raised:
+            korail._search("서울", "부산", DATE, "060000")
+        self.assertNotIsInstance(raised.exception, ServerBusyError)
+        self.assertEqual(handler.left[0], 0)
+
+    def test_configured_codes_are_retried(self):
+        backend = MockKorail()
+        handler = _busy_schedule(backend, 2)
+        policy = RequestPolicy(retries=2, backoff=0, transient_codes={"BUSY01"})
+        self.assertTrue(mock_korail(handler, policy=policy).search_train("서울", "부산", DATE, "060000"))
+        self.assertEqual(handler.left[0], 0)
+
+    def test_configured_codes_raise_server_busy(self):
+        handler = _busy_schedule(MockKorail(), 2)
+        korail = mock_korail(handler, policy=RequestPolicy(retries=0, transient_codes={"BUSY01"}))
+        with self.assertRaises(ServerBusyError):
+            korail._search("서울", "부산", DATE, "060000")
+        self.assertEqual(handler.left[0], 1)
+
+    def test_http_429_is_busy_without_configuration(self):
+        backend = MockKorail()
+        left = [1]
+
+        def handler(method, path, form):
+            if path.endswith("ScheduleView") and left[0]:
+                left[0] -= 1
+                return 429, {}
+            return backend.handle(method, path, form)
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        korail = mock_korail(handler, policy=RequestPolicy(retries=0, breaker=breaker))
+        with self.assertRaises(ServerBusyError):
+            korail._search("서울", "부산", DATE, "060000")
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        left[0] = 1
+        korail = mock_korail(handler, policy=RequestPolicy(retries=1, backoff=0))
+        self.assertTrue(korail._search("서울", "부산", DATE, "060000"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import time
+import unittest
+
+from Korail.Korail import Korail
+from Korail.KorailExceptions.KorailExceptions import InvalidStationError, KorailError
+from Korail.KorailMock.KorailMock import MockKorail
+from Korail.KorailPolicy.KorailPolicy import RequestPolicy
+from Korail.KorailPool.KorailPool import KorailPool
+from Korail.KorailStation.KorailStation import StationDB
+from Korail.KorailTransport.KorailTransport import MemoryTransport
+
+from .support import DATE, KORAIL_PW
+
+
+class Throttled:
+    """Answers ScheduleView with HTTP 429 while `busy` is set."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.busy = False
+        self.searches = 0
+
+    def __call__(self, method, path, form):
+        if path.endswith("ScheduleView"):
+            if self.busy:
+                return 429, {}
+            self.searches += 1
+        return self.backend.handle(method, path, form)
+
+
+class KorailPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail()
+        self.servers = {}
+        self.pool = KorailPool(rate=1000, backoff=0.2, max_backoff=0.2)
+        for korail_id in ("a@example.com", "b@example.com"):
+            server = self.servers[korail_id] = Throttled(self.backend)
+            # 기본 판정 그대로, 재시도 간격만 없앤다.
+            self.pool.add(Korail(korail_id, KORAIL_PW, transport=MemoryTransport(server),
+                                 policy=RequestPolicy(backoff=0)))
+
+    def entry(self, korail_id):
+        return self.pool._accounts[korail_id]
+
+    def test_round_robin(self):
+        for i in range(4):
+            self.pool.search_train("서울", "부산", DATE, "060000")
+        self.assertEqual([x.searches for x in self.servers.values()], [2, 2])
+
+    def test_throttled_account_is_benched_and_revived(self):
+        self.servers["a@example.com"].busy = True
+        self.servers["b@example.com"].busy = False
+        for i in range(3):
+            self.assertTrue(self.pool.search_train("서울", "부산", DATE, "060000"))
+        self.assertEqual(self.servers["b@example.com"].searches, 3)
+        self.assertEqual(self.entry("a@example.com").failures, 1)
+
+        self.servers["a@example.com"].busy = False
+        time.sleep(0.25)
+        for i in range(4):
+            self.pool.search_train("서울", "부산", DATE, "060000")
+        self.assertGreater(self.servers["a@example.com"].searches, 0)
+        self.assertEqual(self.entry("a@example.com").failures, 0)
+
+    def test_every_account_throttled(self):
+        for server in self.servers.values():
+            server.busy = True
+        with self.assertRaises(KorailError):
+            self.pool.search_train("서울", "부산", DATE, "060000")
+        self.assertTrue(all(x.failures for x in self.pool))
+
+    def test_account_that_cannot_log_in_is_revived_by_login(self):
+        pool = KorailPool(rate=1000, backoff=0.2, max_backoff=0.2)
+        korail = Korail("c@example.com", "wrong", transport=MemoryTransport(self.backend))
+        pool.add(korail)
+        entry = pool._accounts["c@example.com"]
+        self.assertEqual(entry.failures, 1)
+        with self.assertRaises(KorailError):
+            pool.search_train("서울", "부산", DATE, "060000")
+
+        korail.korail_pw = KORAIL_PW
+        time.sleep(0.25)
+        self.assertTrue(pool.search_train("서울", "부산", DATE, "060000"))
+        self.assertTrue(korail.is_login)
+        self.assertEqual(entry.failures, 0)
+
+    def test_other_errors_do_not_bench(self):
+        station_db = StationDB(path=None, stations=[("0001", "서울", "경부선"), ("0020", "부산", "경부선")])
+        for entry in self.pool:
+            entry.korail.station_db = station_db
+        with self.assertRaises(InvalidStationError):
+            self.pool.search_train("서울", "평양", DATE, "060000")
+        self.assertFalse(any(x.failures for x in self.pool))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import asyncio
+import time
+import unittest
+
+from Korail.KorailAsync.KorailAsync import AsyncKorail
+from Korail.KorailExceptions.KorailExceptions import NetworkError
+from Korail.KorailMock.KorailMock import MockKorail, MockKorailServer
+
+from .support import DATE, KORAIL_ID, KORAIL_PW, mock_korail
+
+
+def _available(trains, count):
+    return [x for x in trains if x.seat_available()][:count]
+
+
+class ReserveAnyTest(unittest.TestCase):
+    def setUp(self):
+        self.korail = mock_korail()
+        self.trains = _available(self.korail.search_train("서울", "부산", DATE, "060000"), 3)
+
+    def _broken_on(self, broken, delay=0.0):
+        # `broken` 열차만 예약 도중 예상치 못한 오류를 낸다.
+        reserve = self.korail.reserve
+
+        def flaky(train, *args):
+            if train is broken:
+                time.sleep(delay)
+                raise ValueError("undecodable body")
+            return reserve(train, *args)
+
+        self.korail.reserve = flaky
+
+    def test_surplus_is_cancelled(self):
+        kept = self.korail.reserve_any(self.trains, keep=1)
+        self.assertEqual(len(kept), 1)
+        self.assertEqual([x.rsv_id for x in self.korail.reservations()], [kept[0].rsv_id])
+
+    def test_failed_surplus_cancel_keeps_reservations(self):
+        def down(reservation):
+            raise NetworkError()
+
+        self.korail.cancel = down
+        with self.assertLogs("Korail.Korail", "WARNING"):
+            kept = self.korail.reserve_any(self.trains, keep=1)
+        self.assertEqual(len(kept), 1)
+        self.assertEqual(len(self.korail.reservations()), 3)
+
+    def test_sequential_stops_at_first_success(self):
+        kept = self.korail.reserve_any(self.trains, concurrent=False)
+        self.assertEqual(len(kept), 1)
+        self.assertEqual(len(self.korail.reservations()), 1)
+
+    def test_unexpected_error_cancels_holds(self):
+        self._broken_on(self.trains[2], delay=0.1)
+        with self.assertRaises(ValueError):
+            self.korail.reserve_any(self.trains, keep=3, max_workers=3)
+        self.assertEqual(self.korail.reservations(), [])
+
+    def test_sequential_unexpected_error_cancels_holds(self):
+        self._broken_on(self.trains[2])
+        with self.assertRaises(ValueError):
+            self.korail.reserve_any(self.trains, keep=3, concurrent=False)
+        self.assertEqual(self.korail.reservations(), [])
+
+
+class AsyncReserveAnyTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail()
+        self.server = MockKorailServer(self.backend).start()
+        self.addCleanup(self.server.stop)
+
+    def run_async(self, test):
+        async def main():
+            async with AsyncKorail(KORAIL_ID, KORAIL_PW, base_url=self.server.url) as korail:
+                trains = await korail.search_train("서울", "부산", DATE, "060000")
+                return await test(korail, _available(trains, 5))
+        return asyncio.run(asyncio.wait_for(main(), 10))
+
+    def test_surplus_is_cancelled(self):
+        async def test(korail, trains):
+            kept = await korail.reserve_any(trains[:3], keep=1)
+            self.assertEqual([x.rsv_id for x in await korail.reservations()], [kept[0].rsv_id])
+        self.run_async(test)
+
+    def test_failed_surplus_cancel_keeps_reservations(self):
+        async def test(korail, trains):
+            async def down(reservation):
+                raise NetworkError()
+
+            korail.cancel = down
+            with self.assertLogs("Korail.Korail", "WARNING"):
+                self.assertEqual(len(await korail.reserve_any(trains[:3], keep=1)), 1)
+        self.run_async(test)
+
+    def test_concurrency_is_bounded(self):
+        async def test(korail, trains):
+            reserve = korail.reserve
+            flight = [0, 0]
+
+            async def counted(*args):
+                flight[0] += 1
+                flight[1] = max(flight)
+                try:
+                    return await reserve(*args)
+                finally:
+                    flight[0] -= 1
+
+            korail.reserve = counted
+            kept = await korail.reserve_any(trains, keep=5, max_workers=2)
+            self.assertEqual(len(kept), 5)
+            self.assertEqual(flight[1], 2)
+        self.run_async(test)
+
+    def test_stops_at_first_success(self):
+        async def test(korail, trains):
+            kept = await korail.reserve_any(trains, concurrent=False)
+            self.assertEqual(len(kept), 1)
+            self.assertEqual(self.backend.calls["TicketReservation"], 1)
+        self.run_async(test)
+
+    def test_unexpected_error_cancels_holds(self):
+        async def test(korail, trains):
+            reserve = korail.reserve
+
+            async def flaky(train, *args):
+                if train is trains[2]:
+                    await asyncio.sleep(0.1)
+                    raise ValueError("undecodable body")
+                return await reserve(train, *args)
+
+            korail.reserve = flaky
+            with self.assertRaises(ValueError):
+                await korail.reserve_any(trains[:3], keep=3)
+            self.assertEqual(await korail.reservations(), [])
+        self.run_async(test)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import itertools
+import unittest
+
+from Korail.KorailAsync.KorailAsync import AsyncKorail
+from Korail.KorailMock.KorailMock import MockKorail, MockKorailServer
+
+from .support import DATE, KORAIL_ID, KORAIL_PW, add_train, mock_korail
+
+
+class WindowedSearchTest(unittest.TestCase):
+    def test_windows_find_every_train(self):
+        backend = MockKorail(page_size=10)
+        korail = mock_korail(backend)
+        sequential = korail.search_train_allday("서울", "부산", DATE, "000000")
+        windowed = korail.search_train_allday("서울", "부산", DATE, "000000", windows=4)
+        self.assertEqual(len(windowed), 60)
+        self.assertEqual([x.key() for x in windowed], [x.key() for x in sequential])
+
+    def test_train_before_midnight_ends_paging(self):
+        backend = MockKorail(page_size=10)
+        add_train(backend, "235930")
+        korail = mock_korail(backend)
+        trains = korail.search_train_allday("서울", "부산", DATE, "000000", windows=4)
+        self.assertEqual(len(trains), 61)
+        self.assertEqual(trains[-1].dep_time, "235930")
+        # 23:59 다음 쪽(00:00)은 묻지 않는다.
+        self.assertLessEqual(backend.calls["ScheduleView"], 12)
+
+    def test_repeated_page_ends_paging(self):
+        backend = MockKorail(page_size=10)
+        schedule_view = backend.handlers["ScheduleView"]
+        # txtGoHour 를 무시하고 늘 첫 쪽을 주는 서버
+        backend.handlers["ScheduleView"] = lambda form: schedule_view(dict(form, txtGoHour="000000"))
+        korail = mock_korail(backend)
+        trains = korail.search_train_allday("서울", "부산", DATE, "000000", windows=2)
+        self.assertEqual(len(trains), 10)
+        # 앞 시간대는 같은 쪽을 두 번 받고 멈추고, 뒤 시간대는 start 보다
+        # 이른 쪽을 받자마자 멈춘다.
+        self.assertEqual(backend.calls["ScheduleView"], 3)
+
+    def test_window_is_capped_at_max_pages(self):
+        backend = MockKorail(trains_per_day=100, page_size=1)
+        korail = mock_korail(backend)
+        trains = korail.search_train_allday("서울", "부산", DATE, "000000", windows=1)
+        self.assertEqual(len(trains), 15)
+        self.assertEqual(backend.calls["ScheduleView"], 15)
+
+
+class AsyncWindowedSearchTest(unittest.TestCase):
+    def test_train_before_midnight_ends_paging(self):
+        backend = MockKorail(page_size=10)
+        add_train(backend, "235930")
+
+        async def search(url):
+            async with AsyncKorail(KORAIL_ID, KORAIL_PW, base_url=url) as korail:
+                return await korail.search_train_allday("서울", "부산", DATE, "000000", windows=4)
+
+        with MockKorailServer(backend) as server:
+            trains = asyncio.run(asyncio.wait_for(search(server.url), 10))
+        self.assertEqual(len(trains), 61)
+        self.assertLessEqual(backend.calls["ScheduleView"], 12)
+
+
+class IterTrainsAlldayTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail(page_size=10)
+        self.korail = mock_korail(self.backend)
+
+    def test_pages_through_the_day(self):
+        trains = list(self.korail.iter_trains_allday("서울", "부산", DATE, "000000"))
+        self.assertEqual(len(trains), 60)
+        self.assertEqual(len({x.key() for x in trains}), 60)
+        # 6쪽 + P100 으로 끝난 7쪽
+        self.assertEqual(self.backend.calls["ScheduleView"], 7)
+
+    def test_next_page_only_on_demand(self):
+        trains = list(itertools.islice(self.korail.iter_trains_allday("서울", "부산", DATE, "000000"), 5))
+        self.assertEqual(len(trains), 5)
+        self.assertEqual(self.backend.calls["ScheduleView"], 1)
+
+    def test_until_stops_paging(self):
+        trains = list(self.korail.iter_trains_allday("서울", "부산", DATE, "000000", until="090000"))
+        self.assertTrue(trains)
+        self.assertTrue(all(x.dep_time <= "090000" for x in trains))
+        self.assertEqual(self.backend.calls["ScheduleView"], 2)
+
+    def test_max_pages(self):
+        trains = list(self.korail.iter_trains_allday("서울", "부산", DATE, "000000", max_pages=2))
+        self.assertEqual(len(trains), 20)
+        self.assertEqual(self.backend.calls["ScheduleView"], 2)
+
+
+class SearchRangeTest(unittest.TestCase):
+    def test_every_date_is_summarised(self):
+        korail = mock_korail(MockKorail(page_size=10))
+        summaries = list(korail.search_range("서울", "부산", "20991010", "20991013"))
+        self.assertEqual(sorted(x.date for x in summaries), ["20991010", "20991011", "20991012", "20991013"])
+        # 시간대를 나눠 검색해도 하루치 열차가 빠짐없이 모인다.
+        for summary in summaries:
+            self.assertEqual(summary.count, 60)
+
+    def test_train_before_midnight(self):
+        backend = MockKorail(page_size=10)
+        add_train(backend, "235930", date="20991011")
+        korail = mock_korail(backend)
+        summaries = {x.date: x for x in korail.search_range("서울", "부산", "20991010", "20991012")}
+        self.assertEqual(summaries["20991011"].count, 61)
+        self.assertEqual(summaries["20991010"].count, 60)
+        self.assertLessEqual(backend.calls["ScheduleView"], 3 * 12)
+
+    def test_async_train_before_midnight(self):
+        backend = MockKorail(page_size=10)
+        add_train(backend, "235930", date="20991011")
+
+        async def search(url):
+            async with AsyncKorail(KORAIL_ID, KORAIL_PW, base_url=url) as korail:
+                return [x async for x in korail.search_range("서울", "부산", "20991010", "20991012")]
+
+        with MockKorailServer(backend) as server:
+            summaries = asyncio.run(asyncio.wait_for(search(server.url), 10))
+        self.assertEqual(sorted((x.date, x.count) for x in summaries),
+                         [("20991010", 60), ("20991011", 61), ("20991012", 60)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+
+from Korail.KorailExceptions.KorailExceptions import (
+    InvalidStationError, KorailError, NetworkError, ServerBusyError
+)
+from Korail.KorailStation.KorailStation import StationDB, choseong, decompose
+from Korail.KorailTransport.KorailTransport import MemoryTransport, Transport, TransportResponse
+
+STATIONS = [
+    ("0001", "서울", "경부선"),
+    ("0002", "영등포", "경부선"),
+    ("0003", "수원", "경부선"),
+    ("0010", "대전", "경부선"),
+    ("0015", "동대구", "경부선"),
+    ("0020", "부산", "경부선"),
+    ("0104", "용산", "호남선"),
+    ("0297", "오송", "경부선,호남선"),
+]
+
+STATION_DB_DATA = {
+    "strResult": "SUCC",
+    "stns": {"stn": [{"stn_cd": code, "stn_nm": name, "line_nm": line} for code, name, line in STATIONS]},
+}
+
+
+class Raw(Transport):
+    """Answers every request with `status` and the raw `content`."""
+
+    def __init__(self, status, content):
+        self.status = status
+        self.content = content
+        self.closed = False
+
+    def request(self, method, url, params=None, data=None, timeout=None, stream=False):
+        return TransportResponse(self.status, self.content)
+
+    def close(self):
+        self.closed = True
+
+
+class JamoTest(unittest.TestCase):
+    def test_decompose(self):
+        self.assertEqual(decompose("서울"), "ㅅㅓㅇㅜㄹ")
+        self.assertEqual(decompose("KTX 서"), "KTX ㅅㅓ")
+
+    def test_choseong(self):
+        self.assertEqual(choseong("동대구"), "ㄷㄷㄱ")
+
+
+class StationSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.db = StationDB(path=None, stations=STATIONS)
+
+    def test_exact_name_comes_first(self):
+        self.assertEqual(self.db.search("수원")[0], "수원")
+
+    def test_jamo_prefix(self):
+        self.assertEqual(self.db.search("서ㅇ"), ["서울"])
+        # 이름 첫머리가 맞는 역이 중간에 들어간 역보다 앞선다.
+        self.assertEqual(self.db.search("ㅇ")[:3], ["영등포", "오송", "용산"])
+
+    def test_choseong(self):
+        self.assertEqual(self.db.search("ㄷㄷㄱ"), ["동대구"])
+
+    def test_jamo_substring(self):
+        self.assertIn("동대구", self.db.search("대구"))
+
+    def test_edit_distance(self):
+        self.assertEqual(self.db.search("부싼", limit=1), ["부산"])
+
+    def test_limit(self):
+        self.assertEqual(len(self.db.search("ㅇ", limit=2)), 2)
+
+    def test_unknown_station_suggests_names(self):
+        with self.assertRaises(InvalidStationError):
+            self.db.get("서우")
+        self.assertEqual(self.db.code("동대구"), "0015")
+        self.assertEqual(self.db.name("0297"), "오송")
+
+    def test_lines(self):
+        self.assertEqual(self.db.lines(), ["경부선", "호남선"])
+        self.assertEqual([x.name for x in self.db.by_line("호남선")], ["용산", "오송"])
+
+
+class StationRefreshTest(unittest.TestCase):
+    def test_refresh_through_transport(self):
+        paths = []
+
+        def handler(method, path, form):
+            paths.append(path)
+            return 200, STATION_DB_DATA
+
+        db = StationDB(path=None, transport=MemoryTransport(handler))
+        self.assertEqual(len(db), len(STATIONS))
+        self.assertEqual(db.search("ㄷㄷㄱ"), ["동대구"])
+        self.assertEqual(len(paths), 1)
+
+    def test_failures_raise_korail_error(self):
+        cases = [
+            (Raw(503, b""), NetworkError),
+            (Raw(429, b""), ServerBusyError),
+            (Raw(200, b"<html>"), KorailError),
+            (Raw(200, b'{"strResult": "SUCC"}'), KorailError),
+            (MemoryTransport(lambda method, path, form: (200, {
+                "strResult": "FAIL", "h_msg_cd": "P001", "h_msg_txt": "점검 중"})), KorailError),
+        ]
+        for transport, error in cases:
+            with self.subTest(error=error.__name__):
+                db = StationDB(path=None, transport=transport)
+                with self.assertRaises(error):
+                    db.refresh()
+                # 넘겨받은 transport 는 닫지 않는다.
+                self.assertFalse(getattr(transport, "closed", False))
+
+    def test_network_error_from_transport(self):
+        class Down(Transport):
+            def request(self, method, url, params=None, data=None, timeout=None, stream=False):
+                raise NetworkError("connection refused")
+
+        with self.assertRaises(NetworkError):
+            StationDB(path=None, transport=Down()).refresh()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from Korail.KorailHistory.KorailHistory import SeatHistory
+from Korail.KorailStation.KorailStation import StationDB
+from Korail.KorailStore.KorailStore import FileSessionStore, SQLiteSessionStore
+
+STATE = {"key": "KEY", "cookies": {"JSESSIONID": "abc"}}
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@unittest.skipIf(os.name != "posix", "file modes are POSIX only")
+class StoreModeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.dir = os.path.join(self.tmp, ".korail")
+        self.umask = os.umask(0o022)
+
+    def tearDown(self):
+        os.umask(self.umask)
+        shutil.rmtree(self.tmp)
+
+    def test_file_store(self):
+        store = FileSessionStore(os.path.join(self.dir, "sessions.json"))
+        store.save("id", STATE)
+        self.assertEqual(_mode(self.dir), 0o700)
+        self.assertEqual(_mode(store.path), 0o600)
+        self.assertEqual(store.load("id")["key"], "KEY")
+
+    def test_sqlite_store(self):
+        store = SQLiteSessionStore(os.path.join(self.dir, "sessions.sqlite3"))
+        self.assertEqual(_mode(self.dir), 0o700)
+        self.assertEqual(_mode(store.path), 0o600)
+        store.save("id", STATE)
+        self.assertEqual(_mode(store.path), 0o600)
+        self.assertEqual(store.load("id")["cookies"], STATE["cookies"])
+        store.delete("id")
+        self.assertIsNone(store.load("id"))
+
+    def test_other_files_in_the_store_dir(self):
+        with SeatHistory(os.path.join(self.dir, "history.sqlite3")):
+            pass
+        self.assertEqual(_mode(self.dir), 0o700)
+        shutil.rmtree(self.dir)
+        StationDB(path=None, stations=[("0001", "서울", "경부선")]).save(os.path.join(self.dir, "stations.tsv.gz"))
+        self.assertEqual(_mode(self.dir), 0o700)
+
+    def test_existing_sqlite_store_is_reopened(self):
+        path = os.path.join(self.dir, "sessions.sqlite3")
+        SQLiteSessionStore(path).save("id", STATE)
+        self.assertEqual(SQLiteSessionStore(path).load("id")["key"], "KEY")
+
+
+class StoreMaxAgeTest(unittest.TestCase):
+    def test_stale_state_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FileSessionStore(os.path.join(tmp, "sessions.json"), max_age=60)
+            store.save("id", STATE)
+            self.assertIsNotNone(store.load("id"))
+            store.max_age = -1
+            self.assertIsNone(store.load("id"))
+
+
+if __name__ == "__main__":
+    unittest.main()
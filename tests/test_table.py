@@ -0,0 +1,104 @@
+import unittest
+
+from Korail.KorailClass.KorailClass import parse_price
+from Korail.KorailMock.KorailMock import MockKorail
+from Korail.KorailTable.KorailTable import TrainTable
+
+from .support import DATE, add_train, mock_korail
+
+
+def _fare(train):
+    fares = []
+    if train.general_seat_available():
+        fares.append(parse_price(train.reserve_possible_price))
+    if train.special_seat_available():
+        fares.append(parse_price(train.special_possible_price))
+    fares = [x for x in fares if x is not None]
+    return min(fares) if fares else -1
+
+
+class TrainTableTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        backend = MockKorail(page_size=10)
+        add_train(backend, "235930", seats=(0, 0))
+        cls.korail = mock_korail(backend)
+        cls.trains = cls.korail.search_train_allday("서울", "부산", DATE, "000000")
+        cls.table = TrainTable.from_trains(cls.trains)
+
+    def keys(self, trains):
+        return [x.key() for x in trains]
+
+    def test_build(self):
+        self.assertEqual(len(self.table), len(self.trains))
+        self.assertEqual(self.keys(self.table), self.keys(self.trains))
+        self.assertEqual(self.table[3].key(), self.trains[3].key())
+        self.assertEqual(list(self.table["dep_time"]), [int(x.dep_time) for x in self.trains])
+        self.assertEqual(list(self.table["fare"]), [_fare(x) for x in self.trains])
+        self.assertEqual(list(self.table["general_available"]),
+                         [bool(x.general_seat_available()) for x in self.trains])
+
+    def test_from_infos_matches_from_trains(self):
+        table = self.korail.search_train_allday("서울", "부산", DATE, "000000", as_table=True)
+        self.assertEqual(self.keys(table), self.keys(self.table))
+        for name, column in self.table.columns.items():
+            self.assertEqual(list(table[name]), list(column), name)
+
+    def test_filter(self):
+        table = self.table.filter(available_only=True, dep_from="080000", dep_to="120000")
+        expected = [x for x in self.trains if x.seat_available() and "080000" <= x.dep_time <= "120000"]
+        self.assertTrue(expected)
+        self.assertEqual(self.keys(table), self.keys(expected))
+
+        types = self.table.filter(train_type=self.trains[0].train_type)
+        self.assertEqual(self.keys(types), self.keys(x for x in self.trains if x.train_type == self.trains[0].train_type))
+
+        fares = sorted(x for x in self.table["fare"] if x >= 0)
+        cheap = self.table.filter(max_fare=fares[len(fares) // 2])
+        self.assertEqual(self.keys(cheap),
+                         self.keys(x for x in self.trains if 0 <= _fare(x) <= fares[len(fares) // 2]))
+        self.assertNotIn("235930", [x.dep_time for x in self.table.filter(available_only=True)])
+
+    def test_sort(self):
+        by_fare = self.table.filter(available_only=True).sort_by("fare")
+        fares = list(by_fare["fare"])
+        self.assertEqual(fares, sorted(fares))
+        self.assertEqual(list(by_fare["fare"]), [_fare(x) for x in by_fare])
+
+        by_time = self.table.sort_by("dep_time", descending=True)
+        self.assertEqual([x.dep_time for x in by_time], sorted((x.dep_time for x in self.trains), reverse=True))
+
+        by_fare_time = self.table.sort_by("fare", "dep_time")
+        self.assertEqual([(_fare(x), int(x.dep_time)) for x in by_fare_time],
+                         sorted((_fare(x), int(x.dep_time)) for x in self.trains))
+
+    def test_empty(self):
+        table = TrainTable()
+        self.assertEqual(len(table), 0)
+        self.assertEqual(len(table.filter(available_only=True, max_fare=1000)), 0)
+        self.assertEqual(len(table.sort_by("fare")), 0)
+        self.assertEqual(list(table), [])
+
+
+class SearchAsTableTest(unittest.TestCase):
+    def test_failed_search_returns_empty_table(self):
+        backend = MockKorail()
+        korail = mock_korail(backend)
+        backend.handlers["ScheduleView"] = lambda form: {"strResult": "FAIL", "h_msg_cd": "WRD000", "h_msg_txt": ""}
+        with self.assertLogs("Korail.Korail", "WARNING"):
+            table = korail.search_train("서울", "부산", DATE, "060000", as_table=True)
+        self.assertIsInstance(table, TrainTable)
+        self.assertEqual(len(table), 0)
+
+        table = korail.search_train("서울", "부산", DATE, "060000", available_only=True, as_table=True)
+        self.assertIsInstance(table, TrainTable)
+
+    def test_no_results_returns_empty_table(self):
+        korail = mock_korail()
+        table = korail.search_train("서울", "부산", DATE, "235959", as_table=True)
+        self.assertIsInstance(table, TrainTable)
+        self.assertEqual(len(table), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
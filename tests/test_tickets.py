@@ -0,0 +1,108 @@
+import unittest
+
+from Korail.KorailExceptions.KorailExceptions import NetworkError
+from Korail.KorailMock.KorailMock import MockKorail
+from Korail.KorailPolicy.KorailPolicy import RequestPolicy
+
+from .support import KORAIL_ID, mock_korail
+
+
+class TicketSeatTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail(ticket_page_size=5, tickets_per_member=5)
+        self.down = [0]
+
+        def handler(method, path, form):
+            if path.endswith("SelTicketInfo") and self.down[0]:
+                self.down[0] -= 1
+                return 503, {}
+            return self.backend.handle(method, path, form)
+
+        self.korail = mock_korail(handler, policy=RequestPolicy(retries=0))
+
+    def seat(self, ticket):
+        for info in self.backend._member_tickets(KORAIL_ID):
+            if info["h_orgtk_wct_no"] == ticket.get_ticket_no().split("-")[0]:
+                return info["h_seat_no"]
+
+    def calls(self):
+        return self.backend.calls.get("SelTicketInfo", 0)
+
+    def test_seats_are_loaded_once(self):
+        tickets = self.korail.tickets()
+        self.assertEqual(self.calls(), 5)
+        self.assertEqual([x.seat_no for x in tickets], [self.seat(x) for x in tickets])
+        # 두 번째 목록은 캐시된 좌석을 쓴다.
+        self.korail.tickets()
+        self.assertEqual(self.calls(), 5)
+
+    def test_lazy_seat_loads_on_first_read(self):
+        tickets = self.korail.tickets(lazy_seat=True)
+        self.assertEqual(self.calls(), 0)
+        ticket = tickets[0]
+        self.assertEqual(ticket.seat_no, self.seat(ticket))
+        self.assertEqual(ticket.seat_no, self.seat(ticket))
+        self.assertEqual(self.calls(), 1)
+
+    def test_failed_lazy_load_is_retried(self):
+        ticket = self.korail.tickets(lazy_seat=True)[0]
+        self.down[0] = 1
+        with self.assertRaises(NetworkError):
+            ticket.seat_no
+        self.assertEqual(ticket.seat_no, self.seat(ticket))
+        self.assertEqual(self.calls(), 1)
+
+    def test_assigned_seat_cancels_lazy_load(self):
+        ticket = self.korail.tickets(lazy_seat=True)[0]
+        ticket.seat_no = "1A"
+        self.assertEqual(ticket.seat_no, "1A")
+        self.assertEqual(self.calls(), 0)
+
+
+class IterTicketsTest(unittest.TestCase):
+    def test_pages_until_no_results(self):
+        backend = MockKorail(ticket_page_size=7, tickets_per_member=30)
+        korail = mock_korail(backend)
+        tickets = list(korail.iter_tickets())
+        self.assertEqual(len(tickets), 30)
+        self.assertEqual(len({x.get_ticket_no() for x in tickets}), 30)
+        # 5쪽 + P100 으로 끝난 6쪽
+        self.assertEqual(backend.calls["MyTicketList"], 6)
+
+    def test_date_filter(self):
+        korail = mock_korail(MockKorail(ticket_page_size=7))
+        everything = list(korail.iter_tickets())
+        dates = sorted(x.dep_date for x in everything)
+        date_from, date_to = dates[5], dates[20]
+        tickets = list(korail.iter_tickets(date_from, date_to))
+        self.assertEqual(
+            sorted(x.get_ticket_no() for x in tickets),
+            sorted(x.get_ticket_no() for x in everything if date_from <= x.dep_date <= date_to),
+        )
+
+    def test_max_pages(self):
+        backend = MockKorail(ticket_page_size=7)
+        korail = mock_korail(backend)
+        self.assertEqual(len(list(korail.iter_tickets(max_pages=2))), 14)
+        self.assertEqual(backend.calls["MyTicketList"], 2)
+
+    def test_stops_on_repeated_page(self):
+        backend = MockKorail(ticket_page_size=7)
+        page_one = backend.handlers["MyTicketList"]
+        # h_page_no 를 무시하고 늘 첫 쪽을 주는 서버
+        backend.handlers["MyTicketList"] = lambda form: page_one(dict(form, h_page_no="1"))
+        korail = mock_korail(backend)
+        self.assertEqual(len(list(korail.iter_tickets())), 7)
+        self.assertEqual(backend.calls["MyTicketList"], 2)
+
+    def test_lazy_seat(self):
+        backend = MockKorail(ticket_page_size=7)
+        korail = mock_korail(backend)
+        tickets = list(korail.iter_tickets(lazy_seat=True))
+        self.assertEqual(backend.calls.get("SelTicketInfo", 0), 0)
+        self.assertTrue(tickets[0].seat_no)
+        self.assertEqual(backend.calls["SelTicketInfo"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+import unittest
+
+from Korail.Korail import Korail
+from Korail.KorailMock.KorailMock import MockKorail
+from Korail.KorailTransport.KorailTransport import MemoryTransport, RecordReplayTransport
+
+from .support import DATE, KORAIL_ID, KORAIL_PW
+
+
+class RecordReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cassette.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _record(self):
+        transport = RecordReplayTransport(self.path, RecordReplayTransport.RECORD,
+                                          transport=MemoryTransport(MockKorail()))
+        korail = Korail(KORAIL_ID, KORAIL_PW, transport=transport)
+        trains = korail.search_train("서울", "부산", DATE, "060000")
+        return korail, trains
+
+    def test_cassette_has_no_secrets(self):
+        korail, trains = self._record()
+        # 호출한 쪽은 실제 응답을 받는다.
+        self.assertEqual(korail.name, "홍길동")
+        self.assertNotEqual(korail.membership_number, "REDACTED")
+
+        with open(self.path, encoding="utf-8") as f:
+            text = f.read()
+        for secret in (KORAIL_PW, korail._key, korail.membership_number, korail.name, korail.email):
+            self.assertNotIn(secret, text)
+        entries = [json.loads(x) for x in text.splitlines()]
+        login = json.loads(next(x for x in entries if x["endpoint"] == "Login")["body"])
+        for field in ("Key", "strMbCrdNo", "strCustNm", "strEmailAdr"):
+            self.assertEqual(login[field], "REDACTED")
+        for entry in entries:
+            self.assertFalse({"Key", "txtPwd"} & {name for name, value in entry["form"]})
+
+    def test_replay(self):
+        recorded = self._record()[1]
+        korail = Korail(KORAIL_ID, KORAIL_PW, transport=RecordReplayTransport(self.path))
+        self.assertTrue(korail.is_login)
+        trains = korail.search_train("서울", "부산", DATE, "060000")
+        self.assertEqual([x.key() for x in trains], [x.key() for x in recorded])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from Korail.KorailEvents.KorailEvents import EventFeed
+from Korail.KorailMock.KorailMock import MockKorail
+from Korail.KorailPolicy.KorailPolicy import TokenBucket
+from Korail.KorailWatcher.KorailWatcher import SeatWatcher, WatchTarget
+
+from .support import DATE, mock_korail
+
+
+class CountingBucket(TokenBucket):
+    def __init__(self, rate, capacity=None):
+        super().__init__(rate, capacity)
+        self.taken = 0
+
+    def try_acquire(self, tokens=1):
+        wait = super().try_acquire(tokens)
+        if not wait:
+            self.taken += tokens
+        return wait
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class SeatWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = MockKorail(page_size=10)
+        self.korail = mock_korail(self.backend)
+
+    def calls(self):
+        return self.backend.calls.get("ScheduleView", 0)
+
+    def test_every_page_takes_a_token(self):
+        watcher = SeatWatcher(self.korail, rate=1000)
+        watcher.bucket = CountingBucket(1000)
+        target = watcher.add(WatchTarget("서울", "부산", DATE))
+        watcher.start()
+        try:
+            # 하루치는 6쪽 + P100 으로 끝난 7쪽
+            self.assertTrue(_wait_for(lambda: self.calls() == 7 and target.polls == 1))
+        finally:
+            watcher.stop()
+        self.assertEqual(watcher.bucket.taken, self.calls())
+
+    def test_stop_ends_polling(self):
+        watcher = SeatWatcher(self.korail, rate=20, burst=1)
+        watcher.add(WatchTarget("서울", "부산", DATE, min_interval=0.01, max_interval=0.01))
+        watcher.start()
+        self.assertTrue(_wait_for(lambda: self.calls() >= 2))
+        watcher.stop()
+        calls = self.calls()
+        time.sleep(0.3)
+        self.assertEqual(self.calls(), calls)
+        self.assertEqual(len(watcher), 1)
+
+    def test_failing_callback_does_not_lose_events(self):
+        watcher = SeatWatcher(self.korail)
+        seen = []
+
+        def broken(event):
+            raise RuntimeError("subscriber bug")
+
+        watcher.on_available(broken)
+        watcher.on_available(seen.append)
+        target = WatchTarget("서울", "부산", DATE, time_to="120000")
+        with self.assertLogs("Korail.KorailEvents.KorailEvents", "ERROR"):
+            watcher._check(target)
+        events = list(watcher.events(timeout=0))
+        self.assertTrue(events)
+        self.assertEqual(len(seen), len(events))
+        self.assertEqual({x.train.key() for x in events}, target.available)
+
+
+class EventFeedTest(unittest.TestCase):
+    def test_dropped_events_are_counted(self):
+        feed = EventFeed(maxsize=2)
+        with self.assertLogs("Korail.KorailEvents.KorailEvents", "WARNING"):
+            for i in range(5):
+                feed.publish(i)
+        self.assertEqual(list(feed.events(timeout=0)), [0, 1])
+        self.assertEqual(feed.dropped, 3)
+
+    def test_async_reader_ends_on_close(self):
+        feed = EventFeed()
+
+        async def read():
+            return [x async for x in feed]
+
+        def publish():
+            time.sleep(0.05)
+            feed.publish("a")
+            feed.close()
+
+        threading.Thread(target=publish).start()
+        self.assertEqual(asyncio.run(asyncio.wait_for(read(), 5)), ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()